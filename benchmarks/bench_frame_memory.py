@@ -0,0 +1,46 @@
+"""
+    Benchmark: memory of the player match dataframe.
+    Builds 100k rows with the MatchSchema dtypes and compares them with the old
+    all int64/object layout (plus the participants list column).
+
+    python benchmarks/bench_frame_memory.py
+
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from LeagueTracker import extract_match_record, build_match_frame  # noqa: E402
+from MatchSchema import memory_report  # noqa: E402
+from match_factory import make_matches, make_puuids  # noqa: E402
+
+ROWS = 100000
+CHAMPION_NAMES = {1: 'Annie', 22: 'Ashe', 51: 'Caitlyn', 103: 'Ahri', 157: 'Yasuo', 222: 'Jinx',
+                  266: 'Aatrox', 412: 'Thresh', 555: 'Pyke', 875: 'Sett'}
+
+
+def main():
+    puuids = make_puuids()
+    matches = make_matches(1000, puuids)
+    records = [extract_match_record(match, puuids[0]) for match in matches] * (ROWS // len(matches))
+
+    df = build_match_frame(records)
+    df['champion'] = df['champion'].map(CHAMPION_NAMES).astype('category')
+
+    # The old layout: pandas' default dtypes and a list of ten puuids per row
+    wide = df.astype({column: 'object' for column in df.select_dtypes('category').columns})
+    wide = wide.astype({column: 'int64' for column in wide.select_dtypes('integer').columns})
+    wide['participants'] = [list(puuids)] * len(wide)
+
+    report = memory_report(df)
+    old_total = int(wide.memory_usage(deep=True, index=False).sum())
+    new_total = int(report.loc['total', 'bytes'])
+    print(report.head(10).to_string())
+    print()
+    print(f"{len(df)} rows: {old_total / 2**20:.1f} MiB -> {new_total / 2**20:.1f} MiB "
+          f"({old_total / new_total:.1f}x smaller)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+    Benchmark: building the player match dataframe.
+    Compares the old way (a one-row DataFrame per match, then pd.concat) with
+    extract_match_record + build_match_frame at 1k and 10k matches.
+
+    python benchmarks/bench_match_frame.py
+
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from LeagueTracker import extract_match_record, build_match_frame  # noqa: E402
+from MatchSchema import MATCH_COLUMNS  # noqa: E402
+from match_factory import make_matches, make_puuids  # noqa: E402
+
+
+def one_row_frames(matches, puuid):
+    """The pre-batching way: one DataFrame per match, concatenated at the end"""
+    frames = []
+    for match in matches:
+        record = extract_match_record(match, puuid)
+        frames.append(pd.DataFrame({name: [value] for name, value in zip(MATCH_COLUMNS, record)}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def batched(matches, puuid):
+    return build_match_frame([extract_match_record(match, puuid) for match in matches])
+
+
+def best_of(func, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    puuids = make_puuids()
+    print(f"{'matches':>8} {'one-row + concat':>18} {'batched':>10} {'speedup':>8}")
+    for count in (1000, 10000):
+        matches = make_matches(count, puuids)
+        old = best_of(one_row_frames, matches, puuids[0])
+        new = best_of(batched, matches, puuids[0])
+        print(f"{count:>8} {old:>17.3f}s {new:>9.3f}s {old / new:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+    Benchmark: TrackerUI cold start.
+    Each run is a fresh interpreter (like a relaunch) that imports TrackerUI,
+    builds the window and draws it once. Reports the best of RUNS for the
+    import, the time to a drawn window and the whole process, and fails if
+    a budget is blown or if the import pulled in a heavy module that should
+    only load on the first fetch.
+
+    python benchmarks/bench_startup.py
+
+    Without a display (no $DISPLAY on Linux) only the import is measured.
+
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+RUNS = 5
+IMPORT_BUDGET_MS = 300  # import TrackerUI
+WINDOW_BUDGET_MS = 800  # import + build_ui + first draw
+HEAVY_MODULES = ('pandas', 'numpy', 'matplotlib', 'PIL', 'requests', 'aiohttp', 'scipy')
+
+# Runs in the child interpreter, prints one json line
+CHILD = f"""
+import json, sys, time
+start = time.perf_counter()
+import TrackerUI
+imported = time.perf_counter()
+result = {{'import_ms': (imported - start) * 1000,
+          'heavy': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}
+if {{with_window}}:
+    root = TrackerUI.build_ui()
+    root.update()
+    result['window_ms'] = (time.perf_counter() - start) * 1000
+    root.destroy()
+print(json.dumps(result))
+"""
+
+
+def has_display():
+    return sys.platform in ('win32', 'darwin') or bool(os.environ.get('DISPLAY'))
+
+
+def run_once(with_window):
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', CHILD.replace('{with_window}', str(with_window))],
+                         cwd=SRC_DIR, capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result['process_ms'] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def main():
+    with_window = has_display()
+    runs = [run_once(with_window) for _ in range(RUNS)]
+
+    failures = []
+    heavy = sorted({m for run in runs for m in run['heavy']})
+    if heavy:
+        failures.append(f"import TrackerUI loaded {', '.join(heavy)}")
+
+    checks = [('import', 'import_ms', IMPORT_BUDGET_MS), ('process', 'process_ms', None)]
+    if with_window:
+        checks.insert(1, ('window', 'window_ms', WINDOW_BUDGET_MS))
+    else:
+        print("No display, measuring the import only")
+
+    print(f"{'stage':>8} {'best':>9} {'budget':>9}")
+    for stage, key, budget in checks:
+        best = min(run[key] for run in runs)
+        print(f"{stage:>8} {best:>7.0f}ms {f'{budget}ms' if budget else '-':>9}")
+        if budget and best > budget:
+            failures.append(f"{stage} took {best:.0f}ms, budget is {budget}ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
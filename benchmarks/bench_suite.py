@@ -0,0 +1,207 @@
+"""
+    Benchmark suite: the whole League pipeline, offline.
+    Starts the stub server (benchmarks/stub_server.py) on its synthetic
+    fixtures and times, at 20 / 200 / 2000 matches:
+      - get_player_stats end to end on an empty store (cold) and again
+        incrementally with everything stored (warm)
+      - process_match_json + make_it_pretty per match
+      - get_images per match
+      - each graph (create_kd_graph, create_damage_graph, create_creep_graph,
+        common_item_graph) drawn into a Tk frame, or the same figures on the
+        Agg backend when there is no display
+    Results go to a json file. Pass an older one as --baseline to flag what got slower.
+
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --latency 0.02 --error-rate 0.05 --baseline benchmarks/results/old.json
+
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from stub_server import StubServer  # noqa: E402
+
+SIZES = (20, 200, 2000)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def graph_runner():
+    """
+    Picks how graphs are drawn: the real TrackerUI functions in a hidden Tk
+    window if there is a display, otherwise the same figures on Agg.
+    :return: (mode, function(name, df) that draws one graph)
+    """
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception:
+        root = None
+
+    if root is not None:
+        import TrackerUI
+        graphs = {'kd': TrackerUI.create_kd_graph, 'damage': TrackerUI.create_damage_graph,
+                  'cs': TrackerUI.create_creep_graph, 'items': TrackerUI.common_item_graph}
+
+        def draw(name, df):
+            frame = tk.Frame(root)
+            graphs[name](df, frame)
+            root.update_idletasks()
+            frame.destroy()
+        return 'tk', draw
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from Graphs import METRICS, build_item_figure, build_metric_figure, item_frequencies, metric_series
+    from StaticData import get_static_index
+
+    def draw(name, df):
+        if name == 'items':
+            _, names, counts = item_frequencies(df, get_static_index())
+            fig, _ = build_item_figure(names, counts)
+        else:
+            spec = METRICS[name]
+            x, y, win = metric_series(df, spec['value'])
+            fig, _ = build_metric_figure(x, y, win, spec['ylabel'], spec['title'], spec.get('reference'))
+        FigureCanvasAgg(fig).draw()
+    return 'agg', draw
+
+
+def run_suite(sizes, server):
+    """Runs every benchmark at every size, returns the list of result dicts"""
+    import pandas as pd
+    from LeagueTracker import get_images, get_player_stats, get_puuid, make_it_pretty, process_match_json
+    from StaticData import get_static_index
+
+    results = []
+
+    def record(name, size, seconds, per=None):
+        result = {'name': name, 'size': size, 'seconds': round(seconds, 6)}
+        if per:
+            result['per_item_ms'] = round(seconds / per * 1000, 4)
+        results.append(result)
+        print(f"{name:>28} {size:>6} {seconds:>9.3f}s" + (f" {result['per_item_ms']:>9.3f}ms/each" if per else ''))
+
+    seconds, _ = timed(get_static_index)
+    record('static_index_cold', 0, seconds)
+    mode, draw = graph_runner()
+
+    for size in sizes:
+        # A fresh Riot ID per size, so the cold run starts from an empty store
+        seconds, puuid = timed(get_puuid, gameName=f'Bench{size}', tagLine='NA1')
+        record('get_puuid', size, seconds)
+
+        seconds, df = timed(get_player_stats, puuid, match_count=size)
+        record('get_player_stats_cold', size, seconds, len(df))
+        seconds, _ = timed(get_player_stats, puuid, match_count=size, incremental=True)
+        record('get_player_stats_warm', size, seconds, size)
+
+        matches = [server.match_json(server.match_id(puuid, i)) for i in range(size)]
+        start = time.perf_counter()
+        frames = [make_it_pretty(process_match_json(match, puuid)) for match in matches]
+        record('process_match_json+pretty', size, time.perf_counter() - start, size)
+
+        df = make_it_pretty(pd.concat(frames, ignore_index=True))
+        rows = df.to_dict('records')
+        start = time.perf_counter()
+        for row in rows:
+            get_images(row)
+        record('get_images', size, time.perf_counter() - start, size)
+
+        for graph in ('kd', 'damage', 'cs', 'items'):
+            seconds, _ = timed(draw, graph, df)
+            record(f'graph_{graph}_{mode}', size, seconds)
+
+    return results
+
+
+def compare(results, baseline_path, tolerance):
+    """
+    Lists what got slower than the baseline by more than `tolerance` (0.2 = 20%).
+    Runs under 5ms are ignored, they are mostly noise.
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        report = json.load(f)
+    baseline = {(r['name'], r['size']): r['seconds'] for r in report['results']}
+
+    regressions = []
+    for result in results:
+        old = baseline.get((result['name'], result['size']))
+        if old and max(old, result['seconds']) > 0.005 and result['seconds'] > old * (1 + tolerance):
+            regressions.append(f"{result['name']} @ {result['size']}: {old:.3f}s -> {result['seconds']:.3f}s")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of the League fetch pipeline")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help="match counts to run")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every stub response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of Riot requests answered with 429")
+    parser.add_argument('--retry-after', type=float, default=0.1, help="Retry-After of the injected 429s")
+    parser.add_argument('--output', help="results json (default: benchmarks/results/suite-<time>.json)")
+    parser.add_argument('--baseline', help="an older results json to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="slowdown allowed before it is a regression")
+    args = parser.parse_args(argv)
+
+    server = StubServer(latency=args.latency, error_rate=args.error_rate, retry_after=args.retry_after).start()
+    try:
+        # Everything reads its hosts and data folder at import, so set them before importing the trackers
+        data_dir = tempfile.mkdtemp(prefix='sabre_bench_')
+        os.environ.update(server.environ())
+        os.environ['sabre_data_dir'] = data_dir
+
+        print(f"stub server {server.url}, data in {data_dir}")
+        print(f"{'benchmark':>28} {'size':>6} {'total':>10}")
+        results = run_suite(args.sizes, server)
+    finally:
+        server.stop()
+
+    import aiohttp
+    import matplotlib
+    import pandas as pd
+    import Metrics
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'settings': {'sizes': args.sizes, 'latency': args.latency, 'error_rate': args.error_rate,
+                     'retry_after': args.retry_after},
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'pandas': pd.__version__, 'matplotlib': matplotlib.__version__,
+                        'aiohttp': aiohttp.__version__},
+        'server': server.stats,
+        'results': results,
+        'metrics': Metrics.snapshot(),  # request counts, 429s, cache hits and spans behind the timings
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"suite-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"{server.stats['requests']} requests, {server.stats['injected_429']} injected 429s, results in {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline_settings = json.load(f).get('settings', {})
+        if any(baseline_settings.get(key) != value for key, value in report['settings'].items() if key != 'sizes'):
+            print(f"Note: the baseline ran with different settings {baseline_settings}")
+        regressions = compare(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"SLOWER: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
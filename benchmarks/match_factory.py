@@ -0,0 +1,210 @@
+"""
+    Synthetic match-v5 json for the benchmarks.
+    Same shape as a real match (every field process_match_json reads), with
+    seeded random values so runs are repeatable. With full=True a match also
+    gets the rest of a real response's fields (challenges, missions, pings,
+    damage breakdowns, bans, ...), so it is about the size of a real ranked
+    game. The stub server's fixtures are full matches:
+
+    python benchmarks/match_factory.py
+
+"""
+import json
+import os
+import random
+
+ROLES = ['TOP', 'JUNGLE', 'MIDDLE', 'BOTTOM', 'UTILITY']
+CHAMPIONS = [1, 22, 51, 103, 157, 222, 266, 412, 555, 875]
+ITEMS = [0, 1001, 1055, 3006, 3031, 3071, 3087, 3340, 3363, 6672]
+CHAMPION_NAMES = {1: 'Annie', 22: 'Ashe', 51: 'Caitlyn', 103: 'Ahri', 157: 'Yasuo', 222: 'Jinx',
+                  266: 'Aatrox', 412: 'Thresh', 555: 'Pyke', 875: 'Sett'}
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# The rest of a real participant, counters and stats process_match_json doesn't read
+EXTRA_COUNTERS = [
+    'allInPings', 'assistMePings', 'baronKills', 'basicPings', 'bountyLevel', 'champExperience', 'commandPings',
+    'consumablesPurchased', 'damageDealtToBuildings', 'damageDealtToObjectives', 'damageDealtToTurrets',
+    'damageSelfMitigated', 'dangerPings', 'detectorWardsPlaced', 'doubleKills', 'dragonKills', 'enemyMissingPings',
+    'enemyVisionPings', 'getBackPings', 'goldSpent', 'holdPings', 'inhibitorKills', 'inhibitorTakedowns',
+    'inhibitorsLost', 'itemsPurchased', 'killingSprees', 'largestCriticalStrike', 'largestKillingSpree',
+    'largestMultiKill', 'longestTimeSpentLiving', 'magicDamageDealt', 'magicDamageDealtToChampions',
+    'magicDamageTaken', 'needVisionPings', 'nexusKills', 'nexusLost', 'nexusTakedowns', 'onMyWayPings',
+    'pentaKills', 'physicalDamageDealt', 'physicalDamageDealtToChampions', 'physicalDamageTaken', 'placement',
+    'playerAugment1', 'playerAugment2', 'playerAugment3', 'playerAugment4', 'playerAugment5', 'playerAugment6',
+    'playerSubteamId', 'profileIcon', 'pushPings', 'quadraKills', 'retreatPings', 'sightWardsBoughtInGame',
+    'spell1Casts', 'spell2Casts', 'spell3Casts', 'spell4Casts', 'subteamPlacement', 'summoner1Casts',
+    'summoner1Id', 'summoner2Casts', 'summoner2Id', 'summonerLevel', 'timeCCingOthers', 'timePlayed',
+    'totalAllyJungleMinionsKilled', 'totalDamageDealt', 'totalEnemyJungleMinionsKilled', 'totalHeal',
+    'totalTimeSpentDead', 'totalUnitsHealed', 'tripleKills', 'trueDamageDealt', 'trueDamageDealtToChampions',
+    'trueDamageTaken', 'turretKills', 'turretTakedowns', 'turretsLost', 'unrealKills', 'visionClearedPings',
+    'visionWardsBoughtInGame',
+]
+EXTRA_FLAGS = ['eligibleForProgression', 'firstBloodAssist', 'firstTowerAssist', 'firstTowerKill',
+               'teamEarlySurrendered']
+CHALLENGE_COUNTERS = [
+    '12AssistStreakCount', 'abilityUses', 'acesBefore15Minutes', 'alliedJungleMonsterKills', 'baronTakedowns',
+    'blastConeOppositeOpponentCount', 'bountyGold', 'buffsStolen', 'completeSupportQuestInTime',
+    'controlWardsPlaced', 'dancedWithRiftHerald', 'deathsByEnemyChamps', 'dodgeSkillShotsSmallWindow',
+    'doubleAces', 'dragonTakedowns', 'elderDragonKillsWithOpposingSoul', 'elderDragonMultikills',
+    'enemyChampionImmobilizations', 'enemyJungleMonsterKills', 'epicMonsterKillsNearEnemyJungler',
+    'epicMonsterKillsWithin30SecondsOfSpawn', 'epicMonsterSteals', 'epicMonsterStolenWithoutSmite',
+    'firstTurretKilled', 'flawlessAces', 'fullTeamTakedown', 'getTakedownsInAllLanesEarlyJungleAsLaner',
+    'hadOpenNexus', 'immobilizeAndKillWithAlly', 'initialBuffCount', 'initialCrabCount',
+    'junglerTakedownsNearDamagedEpicMonster', 'kTurretsDestroyedBeforePlatesFall', 'killAfterHiddenWithAlly',
+    'killedChampTookFullTeamDamageSurvived', 'killingSprees', 'killsNearEnemyTurret',
+    'killsOnOtherLanesEarlyJungleAsLaner', 'killsOnRecentlyHealedByAramPack', 'killsUnderOwnTurret',
+    'killsWithHelpFromEpicMonster', 'knockEnemyIntoTeamAndKill', 'landSkillShotsEarlyGame',
+    'laneMinionsFirst10Minutes', 'legendaryCount', 'lostAnInhibitor', 'maxKillDeficit', 'mejaisFullStackInTime',
+    'moreEnemyJungleThanOpponent', 'multiKillOneSpell', 'multiTurretRiftHeraldCount', 'multikills',
+    'multikillsAfterAggressiveFlash', 'outerTurretExecutesBefore10Minutes', 'outnumberedKills',
+    'outnumberedNexusKill', 'perfectDragonSoulsTaken', 'perfectGame', 'pickKillWithAlly',
+    'playedChampSelectPosition', 'poroExplosions', 'quickCleanse', 'quickFirstTurret', 'quickSoloKills',
+    'riftHeraldTakedowns', 'saveAllyFromDeath', 'scuttleCrabKills', 'skillshotsDodged', 'skillshotsHit',
+    'snowballsHit', 'soloBaronKills', 'soloKills', 'stealthWardsPlaced', 'survivedSingleDigitHpCount',
+    'survivedThreeImmobilizesInFight', 'takedownOnFirstTurret', 'takedowns',
+    'takedownsAfterGainingLevelAdvantage', 'takedownsBeforeJungleMinionSpawn', 'takedownsFirstXMinutes',
+    'takedownsInAlcove', 'takedownsInEnemyFountain', 'teamBaronKills', 'teamElderDragonKills',
+    'teamRiftHeraldKills', 'tookLargeDamageSurvived', 'turretPlatesTaken', 'turretTakedowns',
+    'turretsTakenWithRiftHerald', 'twentyMinionsIn3SecondsCount', 'twoWardsOneSweeperCount', 'unseenRecalls',
+    'voidMonsterKill', 'wardTakedowns', 'wardTakedownsBefore20M', 'wardsGuarded',
+]
+CHALLENGE_RATES = [
+    'damagePerMinute', 'damageTakenOnTeamPercentage', 'earlyLaningPhaseGoldExpAdvantage',
+    'effectiveHealAndShielding', 'firstTurretKilledTime', 'gameLength', 'goldPerMinute', 'jungleCsBefore10Minutes',
+    'kda', 'killParticipation', 'laningPhaseGoldExpAdvantage', 'maxCsAdvantageOnLaneOpponent',
+    'maxLevelLeadLaneOpponent', 'teamDamagePercentage', 'visionScoreAdvantageLaneOpponent', 'visionScorePerMinute',
+]
+
+
+def make_participant(puuid, team_id, index, rnd):
+    return {
+        'puuid': puuid,
+        'teamId': team_id,
+        'perks': {
+            'statPerks': {'defense': 5001, 'offense': 5005, 'flex': 5008},
+            'styles': [
+                {'style': 8000, 'selections': [{'perk': 8005}, {'perk': 9111}, {'perk': 9104}, {'perk': 8014}]},
+                {'style': 8100, 'selections': [{'perk': 8139}, {'perk': 8135}]},
+            ],
+        },
+        'teamPosition': ROLES[index % 5],
+        'role': 'SOLO',
+        'champLevel': rnd.randint(8, 18),
+        'championId': rnd.choice(CHAMPIONS),
+        'championTransform': 0,
+        'deaths': rnd.randint(0, 12),
+        'assists': rnd.randint(0, 20),
+        'kills': rnd.randint(0, 15),
+        'firstBloodKill': rnd.random() < 0.1,
+        'gameEndedInEarlySurrender': False,
+        'gameEndedInSurrender': rnd.random() < 0.2,
+        'goldEarned': rnd.randint(5000, 18000),
+        **{f'item{k}': rnd.choice(ITEMS) for k in range(7)},
+        'neutralMinionsKilled': rnd.randint(0, 40),
+        'totalMinionsKilled': rnd.randint(20, 250),
+        'summonerId': f'summoner-{puuid}',
+        'riotIdGameName': f'Player {puuid[-4:]}',
+        'riotIdTagline': 'NA1',
+        'totalDamageDealtToChampions': rnd.randint(3000, 40000),
+        'totalDamageShieldedOnTeammates': rnd.randint(0, 3000),
+        'totalDamageTaken': rnd.randint(5000, 40000),
+        'totalHealsOnTeammates': rnd.randint(0, 3000),
+        'totalTimeCCDealt': rnd.randint(0, 500),
+        'wardsPlaced': rnd.randint(0, 30),
+        'wardsKilled': rnd.randint(0, 10),
+        'visionScore': rnd.randint(0, 80),
+        'win': team_id == 100,
+        'objectivesStolen': 0,
+        'objectivesStolenAssists': 0,
+    }
+
+
+def add_real_fields(participant, index, rnd):
+    """Fills in the fields of a real participant that make_participant leaves out"""
+    participant.update({name: rnd.randint(0, 30000) for name in EXTRA_COUNTERS})
+    participant.update({name: rnd.random() < 0.2 for name in EXTRA_FLAGS})
+    participant['challenges'] = {
+        **{name: rnd.randint(0, 40) for name in CHALLENGE_COUNTERS},
+        **{name: rnd.random() * 1000 for name in CHALLENGE_RATES},
+        'legendaryItemUsed': rnd.sample(ITEMS[1:], 3),
+    }
+    participant['missions'] = {f'playerScore{k}': rnd.random() * 100 for k in range(12)}
+    participant.update({f'playerScore{k}': rnd.random() * 100 for k in range(12)})
+    participant.update(
+        championName=CHAMPION_NAMES.get(participant['championId'], 'Annie'),
+        individualPosition=participant['teamPosition'],
+        lane=participant['teamPosition'],
+        participantId=index + 1,
+        summonerName='',
+    )
+
+
+def make_match(match_id, puuids, seed=0, full=False):
+    """
+    Builds one finished match.
+    :param match_id: the matchId to use
+    :param puuids: the ten players, the first five are blue side
+    :param seed: random seed for the stats
+    :param full: add every other field of a real match-v5 response, for a realistic payload size
+    :return: the match json
+    """
+    rnd = random.Random(seed)
+    start = 1700000000000 + seed * 3600000
+
+    def objectives():
+        return {name: {'first': False, 'kills': rnd.randint(0, 4)}
+                for name in ('baron', 'dragon', 'horde', 'riftHerald', 'tower', 'inhibitor')}
+
+    match = {
+        'metadata': {'matchId': match_id, 'participants': list(puuids)},
+        'info': {
+            'gameCreation': start,
+            'gameDuration': 1800,
+            'gameStartTimestamp': start,
+            'gameEndTimestamp': start + 1800000,
+            'gameVersion': '14.1.553.4231',
+            'participants': [make_participant(p, 100 if i < 5 else 200, i, rnd) for i, p in enumerate(puuids)],
+            'teams': [{'teamId': 100, 'objectives': objectives()}, {'teamId': 200, 'objectives': objectives()}],
+        },
+    }
+    if full:
+        # Its own random stream, so the fields above are the same with or without full
+        extra = random.Random(seed + 1000000)
+        info = match['info']
+        match['metadata']['dataVersion'] = '2'
+        info.update(endOfGameResult='GameComplete', gameId=int(match_id.rsplit('_', 1)[-1]), gameMode='CLASSIC',
+                    gameName=f'teambuilder-match-{match_id}', gameType='MATCHED_GAME', mapId=11,
+                    platformId='NA1', queueId=420, tournamentCode='')
+        for i, participant in enumerate(info['participants']):
+            add_real_fields(participant, i, extra)
+        for team in info['teams']:
+            team['win'] = team['teamId'] == 100
+            team['bans'] = [{'championId': extra.choice(CHAMPIONS), 'pickTurn': k + 1} for k in range(5)]
+            team['objectives']['champion'] = {'first': False, 'kills': extra.randint(0, 40)}
+    return match
+
+
+def make_puuids(count=10, prefix='puuid'):
+    return [f'{prefix}-{i:04d}' for i in range(count)]
+
+
+def make_matches(count, puuids=None, full=False):
+    """
+    Builds `count` matches with the same ten players, newest first like a match list.
+    """
+    puuids = puuids or make_puuids()
+    return [make_match(f'NA1_{i}', puuids, seed=i, full=full) for i in range(count - 1, -1, -1)]
+
+
+def write_fixtures(count=5, folder=os.path.join(FIXTURES_DIR, 'matches')):
+    """Writes the stub server's match fixtures, full synthetic matches with the bench-puuid players"""
+    puuids = make_puuids(prefix='bench-puuid')
+    for k in range(count):
+        match_id = f'NA1_{5000000000 + k}'
+        with open(os.path.join(folder, f'{match_id}.json'), 'w', encoding='utf-8') as f:
+            json.dump(make_match(match_id, puuids, seed=100 + k, full=True), f, indent=1)
+
+
+if __name__ == '__main__':
+    write_fixtures()
@@ -0,0 +1,234 @@
+"""
+    Local stand-in for the Riot API and CommunityDragon, for offline benchmarks.
+    Serves the json in benchmarks/fixtures: account-v1 by riot id and puuid, match-v5 id
+    lists and matches (synthetic real-size matches from match_factory, reused round robin,
+    with the matchId, timestamps and tracked puuid rewritten), and the CommunityDragon
+    static json (with ETags) and icons.
+    Latency and 429s can be injected to see how the fetch pipeline copes.
+
+    with StubServer(latency=0.02, error_rate=0.05) as server:
+        os.environ.update(server.environ())
+        ... import the trackers after this, they read the hosts at import
+
+"""
+import copy
+import glob
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from io import BytesIO
+from urllib.parse import urlsplit, parse_qs, unquote
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+NEWEST_GAME = 1760000000000  # ms, match 0 of every player starts here, each older one an hour before
+                             # (games added with play() get -1, -2, ... and are an hour newer each)
+STATIC_FILES = {
+    'content-metadata.json': 'content-metadata.json',
+    'items.json': 'items.json',
+    'champion-summary.json': 'champion-summary.json',
+    'perks.json': 'perks.json',
+}
+
+
+def _icon_png():
+    try:
+        from PIL import Image
+    except ImportError:
+        return b''
+    out = BytesIO()
+    Image.new('RGBA', (64, 64), (180, 120, 40, 255)).save(out, format='PNG')
+    return out.getvalue()
+
+
+class StubServer:
+    """
+    The stub HTTP server, run in a background thread.
+    :param latency: seconds added to every response
+    :param error_rate: share of Riot API requests answered with a 429
+    :param retry_after: Retry-After (seconds) sent with the injected 429s
+    :param app_limit: X-App-Rate-Limit sent back, high by default so the limiter doesn't dominate
+    :param games_per_player: how long every player's match history is
+    :param seed: seed for the 429 injection
+    """
+    def __init__(self, latency=0.0, error_rate=0.0, retry_after=0.1, app_limit='20000:1,1200000:120',
+                 games_per_player=5000, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.app_limit = app_limit
+        self.games_per_player = games_per_player
+        self.random = random.Random(seed)
+        self.played = {}  # puuid -> games added on top of the history with play()
+        self.unknown_names = set()  # account-v1 answers 404 for these game names
+        self.broken_matches = set()  # match-v5 answers 500 for these matchIds
+        self.stats = {'requests': 0, 'injected_429': 0, 'not_modified': 0}
+        self._lock = threading.Lock()
+
+        with open(os.path.join(FIXTURES_DIR, 'account.json'), encoding='utf-8') as f:
+            self.account = json.load(f)
+        self.matches = []
+        for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, 'matches', '*.json'))):
+            with open(path, encoding='utf-8') as f:
+                self.matches.append(json.load(f))
+        self.static = {}
+        for name, file_name in STATIC_FILES.items():
+            with open(os.path.join(FIXTURES_DIR, file_name), 'rb') as f:
+                self.static[name] = f.read()
+        self.icon = _icon_png()
+
+        self._httpd = None
+        self._thread = None
+
+    # --- match fixtures ---
+
+    def match_id(self, puuid, i):
+        """matchId of a player's i-th most recent game, the puuid is encoded so the match can be rebuilt"""
+        return f'NA1_{puuid}_{i}'
+
+    def match_json(self, match_id):
+        puuid, i = match_id.split('_', 1)[1].rsplit('_', 1)
+        i = int(i)
+        template = self.matches[i % len(self.matches)]
+        match = copy.deepcopy(template)
+        tracked = self.account['puuid']
+        start = NEWEST_GAME - i * 3600000
+        match['metadata']['matchId'] = match_id
+        match['metadata']['participants'] = [puuid if p == tracked else p for p in match['metadata']['participants']]
+        info = match['info']
+        duration = info['gameEndTimestamp'] - info['gameStartTimestamp']
+        info.update(gameCreation=start, gameStartTimestamp=start, gameEndTimestamp=start + duration)
+        for participant in info['participants']:
+            if participant['puuid'] == tracked:
+                participant['puuid'] = puuid
+                if puuid.startswith('bench-'):
+                    participant['riotIdGameName'] = puuid[len('bench-'):]
+        return match
+
+    def play(self, puuid, games=1):
+        """The player finishes `games` new games, they show up at the top of the history"""
+        with self._lock:
+            self.played[puuid] = self.played.get(puuid, 0) + games
+
+    def match_ids(self, puuid, start=0, count=20, start_time=None, end_time=None):
+        newest = -self.played.get(puuid, 0)
+        if end_time is not None:
+            # Skip the games after end_time, start counts from the first one left
+            newest = max(newest, -((end_time * 1000 - NEWEST_GAME) // 3600000))
+        ids = []
+        for i in range(newest + start, min(newest + start + count, self.games_per_player)):
+            if start_time is not None and (NEWEST_GAME - i * 3600000) // 1000 < start_time:
+                break
+            ids.append(self.match_id(puuid, i))
+        return ids
+
+    # --- server ---
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like the real hosts
+
+            def log_message(self, *args):
+                pass
+
+            def send(self, status, body=b'', headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                with server._lock:
+                    server.stats['requests'] += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                parts = urlsplit(self.path)
+                path = unquote(parts.path)
+                query = parse_qs(parts.query)
+
+                if '/latest/' in path:
+                    return self.static_file(path)
+
+                with server._lock:
+                    inject = server.error_rate and server.random.random() < server.error_rate
+                    if inject:
+                        server.stats['injected_429'] += 1
+                if inject:
+                    return self.send(429, headers={'Retry-After': str(server.retry_after),
+                                                   'X-Rate-Limit-Type': 'application'})
+
+                rate_headers = {'X-App-Rate-Limit': server.app_limit, 'Content-Type': 'application/json'}
+                if '/accounts/by-riot-id/' in path:
+                    name, tag = path.rstrip('/').split('/')[-2:]
+                    if name in server.unknown_names:
+                        return self.send(404, b'{"status": {"status_code": 404}}', rate_headers)
+                    body = dict(server.account, puuid=f'bench-{name}', gameName=name, tagLine=tag)
+                elif '/accounts/by-puuid/' in path:
+                    puuid = path.rstrip('/').rsplit('/', 1)[1]
+                    name = puuid[len('bench-'):] if puuid.startswith('bench-') else puuid
+                    body = dict(server.account, puuid=puuid, gameName=name)
+                elif path.endswith('/ids'):
+                    puuid = path.split('/')[-2]
+                    start_time = int(query['startTime'][0]) if 'startTime' in query else None
+                    end_time = int(query['endTime'][0]) if 'endTime' in query else None
+                    body = server.match_ids(puuid, int(query.get('start', ['0'])[0]),
+                                            int(query.get('count', ['20'])[0]), start_time, end_time)
+                elif '/lol/match/v5/matches/' in path:
+                    if path.rsplit('/', 1)[1] in server.broken_matches:
+                        return self.send(500, b'{"status": {"status_code": 500}}', rate_headers)
+                    body = server.match_json(path.rsplit('/', 1)[1])
+                else:
+                    return self.send(404, b'{"status": {"status_code": 404}}', rate_headers)
+                self.send(200, json.dumps(body).encode('utf-8'), rate_headers)
+
+            def static_file(self, path):
+                name = path.rsplit('/', 1)[1]
+                if name.endswith('.png'):
+                    return self.send(200, server.icon, {'Content-Type': 'image/png'})
+                body = server.static.get(name)
+                if body is None:
+                    return self.send(404)
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    with server._lock:
+                        server.stats['not_modified'] += 1
+                    return self.send(304, headers={'ETag': etag})
+                self.send(200, body, {'ETag': etag, 'Content-Type': 'application/json'})
+
+        return Handler
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address
+        return f'http://{host}:{port}'
+
+    def environ(self):
+        """The environment variables that point the trackers at this server"""
+        return {'riot_api_host': self.url, 'cdragon_host': self.url, 'riot_api_key': 'BENCH-KEY'}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,217 @@
+"""
+    Headless batch stats for whole rosters and ladders.
+    Reads a file of name#tag Riot IDs, resolves them and pulls their matches
+    on one event loop, sharing one HTTP session, one in-flight limit and the
+    Riot rate limiter between every player. Everything lands in a single
+    parquet file (one row per player per match, with a riot_id column).
+    Progress is saved as players finish, so a run that gets interrupted picks
+    up where it stopped.
+
+    python src/BatchCLI.py players.txt -o roster.parquet -n 20
+
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+
+from dotenv import load_dotenv
+
+from FrameStore import delete_player_frame, load_player_frames, save_player_frame
+from HttpClient import make_async_session, MAX_CONCURRENCY
+from LeagueTracker import get_player_stats_async
+from RiotIds import resolve_puuids_async
+
+load_dotenv()
+
+DEFAULT_WORKERS = 8  # players in flight at once, their matches share MAX_CONCURRENCY
+
+
+def read_riot_ids(path):
+    """
+    Reads name#tag entries, one per line. Blank lines and lines starting with # are skipped.
+    :param path: the file
+    :return: list of (name, tag), duplicates removed, in file order
+    """
+    riot_ids = {}
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            name, sep, tag = line.rpartition('#')
+            if not sep or not name or not tag:
+                print(f"Skipping line {line_number}, not name#tag: {line}")
+                continue
+            riot_ids[f"{name.strip()}#{tag.strip()}"] = (name.strip(), tag.strip())
+    return list(riot_ids.values())
+
+
+def load_progress(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_progress(path, progress):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(progress, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+async def run_batch(riot_ids, output, match_count=20, workers=DEFAULT_WORKERS, incremental=True, api_key=None):
+    """
+    Pulls stats for every Riot ID and writes the consolidated parquet file.
+    Players already done in the progress file (output + .progress.json) with the same
+    match_count are not fetched again, and neither are Riot IDs Riot answered 404 for.
+    Players that failed (including a Riot ID lookup that failed, or some of their
+    matches that could not be downloaded) are tried again.
+    :param riot_ids: list of (name, tag)
+    :param output: the parquet file to write
+    :param match_count: recent matches per player
+    :param workers: players fetched at the same time
+    :param incremental: only download matches newer than what the local store has
+    :param api_key: the API key, defaults to riot_api_key from the environment
+    :return: the progress of these Riot IDs, riot id -> {'status', 'puuid', 'rows', 'match_count'}.
+             The progress file can hold other players from earlier runs with the same output,
+             they are left out here and in the output
+    """
+    progress_path = output + '.progress.json'
+    parts_root = output + '.parts'  # per-player frames, the output is rebuilt from them
+    progress = load_progress(progress_path)
+
+    def finished_before(riot_id):
+        entry = progress.get(riot_id, {})
+        if entry.get('status') == 'done':
+            return entry.get('match_count') == match_count
+        return entry.get('status') == 'not_found'
+
+    todo = [(name, tag) for name, tag in riot_ids if not finished_before(f"{name}#{tag}")]
+    print(f"{len(riot_ids) - len(todo)} of {len(riot_ids)} players already done, {len(todo)} to go")
+    if todo:
+        await fetch_players(todo, progress, progress_path, parts_root, match_count, workers, incremental, api_key)
+
+    # Rewritten even when nobody was fetched, the last run with this output may have had another roster
+    progress = {f"{name}#{tag}": progress.get(f"{name}#{tag}", {'status': 'error'}) for name, tag in riot_ids}
+    write_output(output, progress, parts_root)
+    return progress
+
+
+async def fetch_players(todo, progress, progress_path, parts_root, match_count, workers, incremental, api_key):
+    """
+    Resolves and fetches the players of run_batch, saving the progress file as each one finishes.
+    :param todo: list of (name, tag) to fetch
+    :param progress: the progress dict, updated in place
+    """
+    session = make_async_session()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)  # in-flight match downloads across all players
+    players = asyncio.Semaphore(workers)
+    finished = 0
+    puuids = {}
+    failed_lookups = set()
+
+    async def run_player(name, tag):
+        nonlocal finished
+        riot_id = f"{name}#{tag}"
+        async with players:
+            entry = {'status': 'error'}
+            try:
+                puuid = progress.get(riot_id, {}).get('puuid') or puuids.get((name, tag))
+                if puuid is None and (name, tag) in failed_lookups:
+                    entry['error'] = "Riot ID lookup failed"
+                elif puuid is None:
+                    entry = {'status': 'not_found'}  # Riot answered 404
+                else:
+                    df, missing = await get_player_stats_async(puuid, match_count, session, semaphore,
+                                                               incremental=incremental, return_missing=True)
+                    if missing:
+                        # Not done, the next run fetches the player again and only downloads what is missing
+                        entry = {'status': 'error', 'puuid': puuid,
+                                 'error': f"{len(missing)} matches could not be fetched"}
+                    else:
+                        # Replace the whole part, a smaller match_count than last time must not keep older months
+                        await asyncio.to_thread(delete_player_frame, puuid, parts_root)
+                        await asyncio.to_thread(save_player_frame, puuid, df, parts_root)
+                        entry = {'status': 'done', 'puuid': puuid, 'rows': len(df), 'match_count': match_count}
+            except Exception as e:
+                print(f"Error fetching {riot_id}: {e}")
+                entry['error'] = str(e)
+
+            progress[riot_id] = entry
+            save_progress(progress_path, progress)
+            finished += 1
+            print(f"[{finished}/{len(todo)}] {riot_id}: {entry['status']}"
+                  + (f", {entry['rows']} matches" if 'rows' in entry else '')
+                  + (f", {entry['error']}" if 'error' in entry else ''))
+
+    try:
+        # Every Riot ID up front in one concurrent batch, the known ones come from the match store
+        unresolved = [(name, tag) for name, tag in todo if not progress.get(f"{name}#{tag}", {}).get('puuid')]
+        if unresolved:
+            puuids, failed_lookups = await resolve_puuids_async(unresolved, session, key=api_key)
+        # One player going wrong in a way run_player didn't expect must not cancel the others
+        results = await asyncio.gather(*(run_player(name, tag) for name, tag in todo), return_exceptions=True)
+        for (name, tag), result in zip(todo, results):
+            if isinstance(result, Exception):
+                print(f"Error fetching {name}#{tag}: {result}")
+                progress[f"{name}#{tag}"] = {'status': 'error', 'error': str(result)}
+        save_progress(progress_path, progress)
+    finally:
+        await session.close()
+
+
+def write_output(output, progress, parts_root):
+    """Consolidates the per-player frames of the done players in progress into the output parquet file"""
+    riot_ids = {entry['puuid']: riot_id for riot_id, entry in progress.items() if entry.get('status') == 'done'}
+    if not riot_ids or not os.path.isdir(parts_root):
+        print("Nothing to write")
+        return
+
+    df = load_player_frames(puuids=list(riot_ids), root=parts_root)
+    df['puuid'] = df['puuid'].astype(str)
+    df.insert(0, 'riot_id', df['puuid'].map(riot_ids).astype('category'))
+    tmp_path = output + '.tmp'
+    df.to_parquet(tmp_path, engine='pyarrow', index=False)
+    os.replace(tmp_path, output)
+    print(f"Wrote {len(df)} matches for {len(riot_ids)} players to {output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pull League stats for a list of Riot IDs into one parquet file.")
+    parser.add_argument('players', help="file with one name#tag per line")
+    parser.add_argument('-o', '--output', default='batch_stats.parquet', help="parquet file to write")
+    parser.add_argument('-n', '--matches', type=int, default=20, help="recent matches per player")
+    parser.add_argument('-w', '--workers', type=int, default=DEFAULT_WORKERS, help="players fetched at once")
+    parser.add_argument('--full', action='store_true', help="download every match again instead of only new ones")
+    parser.add_argument('--restart', action='store_true', help="ignore the progress of a previous run")
+    parser.add_argument('--api-key', default=None, help="Riot API key (default: riot_api_key from the environment)")
+    args = parser.parse_args(argv)
+
+    riot_ids = read_riot_ids(args.players)
+    if not riot_ids:
+        print("No Riot IDs in", args.players)
+        return 1
+
+    if args.restart:
+        for path in (args.output + '.progress.json', args.output + '.parts'):
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            elif os.path.exists(path):
+                os.remove(path)
+
+    progress = asyncio.run(run_batch(riot_ids, args.output, args.matches, args.workers,
+                                     incremental=not args.full, api_key=args.api_key))
+    failed = [riot_id for riot_id, entry in progress.items() if entry.get('status') == 'error']
+    if failed:
+        print(f"{len(failed)} players failed, run the same command again to retry them")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+    Parquet storage for the player match dataframes.
+    Frames are saved with the compact MatchSchema dtypes and partitioned by puuid and month
+    (parquet/puuid=.../month=YYYY-MM/data.parquet), so loading a few players or
+    a few months only reads those files, and only the columns asked for.
+
+"""
+import os
+import shutil
+
+import pandas as pd
+
+from MatchSchema import apply_schema
+from MatchStore import DATA_DIR
+
+FRAMES_ROOT = os.path.join(DATA_DIR, 'parquet')
+
+def _month_of(df):
+    return pd.to_datetime(df['game_start_time'], unit='ms', utc=True).dt.strftime('%Y-%m')
+
+
+def frame_months(df):
+    """The months ('YYYY-MM') a match dataframe has games in"""
+    return set(_month_of(df)) if not df.empty else set()
+
+
+def save_player_frame(puuid, df, root=FRAMES_ROOT, months=None):
+    """
+    Saves a player's matches, one parquet file per month. Months in the frame
+    replace what was stored for them.
+    :param puuid: the player's puuid
+    :param df: the match dataframe (get_player_stats output)
+    :param root: the dataset folder
+    :param months: only write these months ('YYYY-MM', ex. frame_months of the new games), None for all
+    """
+    if df.empty:
+        return
+
+    df = apply_schema(df.drop(columns=['puuid'], errors='ignore'))
+    player_dir = os.path.join(root, f'puuid={puuid}')
+    df_months = _month_of(df)
+    if months is not None:
+        df, df_months = df[df_months.isin(months)], df_months[df_months.isin(months)]
+    for month, part in df.groupby(df_months, observed=True):
+        month_dir = os.path.join(player_dir, f'month={month}')
+        os.makedirs(month_dir, exist_ok=True)
+        path = os.path.join(month_dir, 'data.parquet')
+        tmp_path = path + '.tmp'
+        part.to_parquet(tmp_path, engine='pyarrow', index=False)
+        os.replace(tmp_path, path)
+
+
+def load_player_frames(puuids=None, months=None, columns=None, root=FRAMES_ROOT):
+    """
+    Loads stored matches for many players at once.
+    :param puuids: only these players, None for all
+    :param months: only these months ('YYYY-MM'), None for all
+    :param columns: only these columns, None for all
+    :param root: the dataset folder
+    :return: the dataframe, newest first (puuid comes back as a category)
+    """
+    if not os.path.isdir(root):
+        return pd.DataFrame()
+
+    filters = []
+    if puuids is not None:
+        filters.append(('puuid', 'in', list(puuids)))
+    if months is not None:
+        filters.append(('month', 'in', list(months)))
+
+    read_columns = None
+    if columns is not None:
+        read_columns = list(dict.fromkeys(list(columns) + ['game_start_time']))
+
+    df = pd.read_parquet(root, engine='pyarrow', columns=read_columns, filters=filters or None,
+                         partitioning='hive')
+    if df.empty:
+        return df
+
+    df = df.sort_values('game_start_time', ascending=False, ignore_index=True)
+    if columns is not None:
+        df = df[list(columns)]
+    elif 'month' in df:
+        df = df.drop(columns=['month'])
+    return df
+
+
+def load_player_frame(puuid, root=FRAMES_ROOT):
+    """
+    Loads everything stored for one player.
+    :param puuid: the player's puuid
+    :param root: the dataset folder
+    :return: the dataframe, or None if we have nothing stored
+    """
+    # Only this player's folder, discovering the whole dataset gets slower with every player stored
+    player_dir = os.path.join(root, f'puuid={puuid}')
+    if not os.path.isdir(player_dir):
+        return None
+    try:
+        df = pd.read_parquet(player_dir, engine='pyarrow', partitioning='hive')
+    except Exception as e:
+        print(f"Could not read stored matches for {puuid}: {e}")
+        return None
+    if df.empty:
+        return None
+
+    # Frames saved before participants moved to their own table still have the list column
+    df = df.drop(columns=['month', 'participants'], errors='ignore')
+    df = df.sort_values('game_start_time', ascending=False, ignore_index=True)
+    df['puuid'] = puuid  # the puuid is the folder, like the puuid partition of load_player_frames
+    return apply_schema(df)
+
+
+def delete_player_frame(puuid, root=FRAMES_ROOT):
+    """Removes everything stored for a player"""
+    shutil.rmtree(os.path.join(root, f'puuid={puuid}'), ignore_errors=True)
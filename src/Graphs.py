@@ -0,0 +1,278 @@
+"""
+    Matplotlib figures for the tracker graphs, built from whole columns at once.
+    A metric graph is one scatter collection for the points and one
+    LineCollection for the segments between them, colored by win / loss, so a
+    long history is two artists instead of two per game.
+    Nothing in here touches Tk, TrackerUI embeds the figures.
+
+"""
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
+
+WIN_COLOR = '#6fff6f'
+LOSS_COLOR = '#ff6f6f'
+MAX_X_TICKS = 30  # past this many games the x axis picks its own integer ticks
+
+
+def kd_ratio(df):
+    """Kills / deaths per game, a deathless game counts as one death"""
+    return df['kills'] / df['deaths'].clip(lower=1)
+
+
+# The graphs TrackerUI knows about. value is a column name or a function of the dataframe.
+METRICS = {
+    'kd': {'value': kd_ratio, 'ylabel': 'K/D Ratio', 'title': 'K/D Performance', 'label': 'K/D',
+           'fmt': '.2f', 'reference': 1.0},
+    'damage': {'value': 'total_damage_dealt', 'ylabel': 'Damage to Champions', 'title': 'Damage Performance',
+               'label': 'DMG', 'fmt': ',.0f'},
+    'cs': {'value': 'minions', 'ylabel': 'Creep Score', 'title': 'CS per Game', 'label': 'CS', 'fmt': '.0f'},
+    'gold': {'value': 'gold_earned', 'ylabel': 'Gold Earned', 'title': 'Gold per Game', 'label': 'Gold',
+             'fmt': ',.0f'},
+    'vision': {'value': 'vision_score', 'ylabel': 'Vision Score', 'title': 'Vision per Game', 'label': 'Vision',
+               'fmt': '.0f'},
+    'damage_taken': {'value': 'total_damage_taken', 'ylabel': 'Damage Taken', 'title': 'Damage Taken',
+                     'label': 'Taken', 'fmt': ',.0f'},
+}
+
+
+def metric_series(df, value):
+    """
+    Gets a metric for every game, oldest first (the dataframe is newest first).
+    :param df: the player match dataframe
+    :param value: a column name, or a function of the dataframe returning a series
+    :return: (game numbers, values, wins) as numpy arrays
+    """
+    y = value(df) if callable(value) else df[value]
+    y = y.to_numpy(dtype=float)[::-1]
+    win = df['win'].to_numpy(dtype=bool)[::-1]
+    x = np.arange(1, len(y) + 1)
+    return x, y, win
+
+
+def build_metric_figure(x, y, win, ylabel, title, reference=None):
+    """
+    Builds the dark themed line + scatter figure for one metric.
+    :param x: game numbers
+    :param y: the values
+    :param win: True for the games that were won
+    :param ylabel: y axis label
+    :param title: figure title
+    :param reference: draws a dashed horizontal line at this value (ex. K/D = 1.0)
+    :return: (figure, axes)
+    """
+    fig = Figure(figsize=(5, 6), facecolor='#1c1c1c')
+    ax = fig.add_subplot(111)
+    ax.set_facecolor('#2b2b2b')
+
+    colors = np.where(win, WIN_COLOR, LOSS_COLOR)
+    if len(x) > 1:
+        # Segment i goes from game i to game i + 1 and takes game i's color
+        points = np.column_stack([x, y])
+        segments = np.stack([points[:-1], points[1:]], axis=1)
+        ax.add_collection(LineCollection(segments, colors=colors[:-1], linewidths=2, alpha=0.6))
+
+    size = 64 if len(x) <= 100 else 16
+    ax.scatter(x, y, s=size, c=colors, edgecolors='#ffffff', linewidths=1.5 if len(x) <= 100 else 0.5,
+               zorder=5)
+
+    if reference is not None:
+        ax.axhline(y=reference, color=LOSS_COLOR, linestyle='--', linewidth=1, alpha=0.5)
+
+    # Styling
+    ax.set_xlabel('Game Number\n(Oldest → Most Recent)', color='#f8f8f8', fontsize=9)
+    ax.set_ylabel(ylabel, color='#f8f8f8', fontsize=10)
+    ax.set_title(title, color='#f8f8f8', fontsize=11, fontweight='bold')
+    ax.tick_params(colors='#d0d0d0', labelsize=8)
+    ax.grid(True, alpha=0.2, color='#ffffff')
+    if len(x) <= MAX_X_TICKS:
+        ax.set_xticks(x)
+    else:
+        ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+
+    # Style the spines
+    for spine in ax.spines.values():
+        spine.set_edgecolor('#3c3c3c')
+
+    fig.tight_layout()
+    return fig, ax
+
+
+def item_frequencies(df, index, top=15):
+    """
+    Counts how often each item was bought, with the names already looked up.
+    :param df: the player match dataframe
+    :param index: the StaticData index, for the names
+    :param top: how many items to keep
+    :return: (item ids, names, counts), most bought first
+    """
+    item_columns = [f'item{i}' for i in range(7) if f'item{i}' in df]
+    if df.empty or not item_columns:
+        return [], [], []
+
+    item_ids = df[item_columns].to_numpy(dtype='int64').ravel()
+    unique, counts = np.unique(item_ids[item_ids != 0], return_counts=True)
+    order = np.argsort(-counts, kind='stable')[:top]
+    item_ids = unique[order].tolist()
+    return item_ids, [index.item_name(item_id) for item_id in item_ids], counts[order].tolist()
+
+
+def summarize_matches(df, index, metrics=tuple(METRICS)):
+    """
+    Everything the graphs need, computed in one go so it can run in the fetch
+    thread and the Tk thread only has to draw.
+    :param df: the player match dataframe
+    :param index: the StaticData index
+    :param metrics: the METRICS keys to compute series for
+    :return: dict with 'series' (metric -> (x, y, win)) and 'items' ((ids, names, counts))
+    """
+    return {
+        'series': {metric: metric_series(df, METRICS[metric]['value']) for metric in metrics},
+        'items': item_frequencies(df, index),
+    }
+
+
+def build_item_figure(names, counts):
+    """
+    Builds the horizontal bar graph of the most bought items.
+    :param names: item names, most bought first
+    :param counts: how many times each was bought
+    :return: (figure, axes)
+    """
+    # Truncate long names
+    names = [name[:20] + '...' if len(name) > 20 else name for name in names]
+
+    # Create figure with dark theme
+    fig = Figure(figsize=(5, 6), facecolor='#1c1c1c')
+    ax = fig.add_subplot(111)
+    ax.set_facecolor('#2b2b2b')
+
+    # Create bar chart
+    positions = np.arange(len(names))
+    ax.barh(positions, counts, color=WIN_COLOR, edgecolor='#ffffff', linewidth=1)
+
+    # Styling
+    ax.set_yticks(positions)
+    ax.set_yticklabels(names, color='#f8f8f8', fontsize=8)
+    ax.set_xlabel('Times Purchased', color='#f8f8f8', fontsize=10)
+    ax.set_title('Most Bought Items', color='#f8f8f8', fontsize=11, fontweight='bold')
+    ax.tick_params(colors='#d0d0d0', labelsize=8)
+    ax.grid(True, alpha=0.2, color='#ffffff', axis='x')
+
+    # Add value labels on bars
+    for i, count in enumerate(counts):
+        ax.text(count + 0.1, i, str(count), va='center', color='#f8f8f8', fontsize=8)
+
+    for spine in ax.spines.values():
+        spine.set_edgecolor('#3c3c3c')
+
+    # Invert y-axis so highest is on top
+    ax.invert_yaxis()
+
+    fig.tight_layout()
+    return fig, ax
+
+
+class PointHover:
+    """
+    Highlight + annotation for the point under the mouse.
+    The games are plotted left to right, so the points' display x is sorted and
+    a motion event is a binary search for the points within reach plus a
+    distance check on those few, not a transform of every point. The display
+    coordinates are only recomputed after a draw (resize, zoom, pan). The
+    highlight and annotation are blitted over the saved background, and only
+    when the point under the mouse changes.
+    """
+    radius = 20  # pixels
+
+    def __init__(self, fig, ax, x, y, win, label, fmt='.2f'):
+        """
+        :param fig: the figure
+        :param ax: its axes
+        :param x: game numbers, ascending
+        :param y: the values
+        :param win: True for the games that were won
+        :param label: name of the value in the annotation (ex. K/D)
+        :param fmt: format spec of the value
+        """
+        self.fig = fig
+        self.ax = ax
+        self.x = x
+        self.y = y
+        self.win = win
+        self.label = label
+        self.fmt = fmt
+        self.points = np.column_stack([x, y]).astype(float)
+
+        # Animated artists are left out of normal draws, we blit them ourselves
+        self.highlight = ax.scatter([], [], s=200, c='yellow', alpha=0.5, zorder=10, animated=True)
+        self.annot = ax.annotate("", xy=(0, 0), xytext=(10, 10),
+                                 textcoords="offset points",
+                                 bbox=dict(boxstyle="round,pad=0.5", fc="#3c3c3c", ec="#ffffff", alpha=0.9),
+                                 color='#ffffff', fontsize=9, zorder=11, animated=True)
+
+        self.current = None  # index of the highlighted point
+        self._display = None  # points in display coordinates, None until the next hover after a draw
+        self._background = None
+
+    def connect(self, canvas):
+        """Hooks the hover up to the figure's canvas, which keeps it alive from then on"""
+        # mpl_connect only keeps weak references to bound methods, without this the
+        # hover is collected as soon as the caller's local goes out of scope
+        canvas.point_hover = self
+        canvas.mpl_connect('draw_event', self.on_draw)
+        canvas.mpl_connect('motion_notify_event', self.on_hover)
+
+    def on_draw(self, event):
+        # A draw means the axes may have been resized or rescaled
+        self._display = None
+        self._background = event.canvas.copy_from_bbox(self.fig.bbox)
+        if self.current is not None:
+            self._blit()
+
+    def pick(self, mouse_x, mouse_y):
+        """
+        Finds the point closest to the mouse.
+        :return: its index, or None if no point is within radius pixels
+        """
+        if not len(self.points):
+            return None
+        if self._display is None:
+            self._display = self.ax.transData.transform(self.points)
+
+        display_x = self._display[:, 0]
+        lo = np.searchsorted(display_x, mouse_x - self.radius, side='left')
+        hi = np.searchsorted(display_x, mouse_x + self.radius, side='right')
+        if lo >= hi:
+            return None
+
+        near = self._display[lo:hi]
+        dist = np.hypot(near[:, 0] - mouse_x, near[:, 1] - mouse_y)
+        i = int(np.argmin(dist))
+        return lo + i if dist[i] < self.radius else None
+
+    def on_hover(self, event):
+        i = self.pick(event.x, event.y) if event.inaxes == self.ax else None
+        if i == self.current:
+            return  # same point (or still none), nothing to redraw
+        self.current = i
+
+        if i is not None:
+            self.highlight.set_offsets([self.points[i]])
+            result = "Win" if self.win[i] else "Loss"
+            self.annot.xy = tuple(self.points[i])
+            self.annot.set_text(f"Game {self.x[i]}\n{self.label}: {self.y[i]:{self.fmt}}\n{result}")
+            self.annot.set_position((-40, 10) if self.x[i] > len(self.points) * 0.7 else (10, 10))
+        self._blit()
+
+    def _blit(self):
+        canvas = self.fig.canvas
+        if self._background is None:
+            canvas.draw_idle()  # not drawn yet, on_draw will blit
+            return
+        canvas.restore_region(self._background)
+        if self.current is not None:
+            self.ax.draw_artist(self.highlight)
+            self.ax.draw_artist(self.annot)
+        canvas.blit(self.fig.bbox)
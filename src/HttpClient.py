@@ -0,0 +1,76 @@
+"""
+    Shared HTTP client for the trackers.
+    One requests.Session per host (Riot, CommunityDragon, ...) so connections
+    are kept alive and reused instead of paying a fresh TCP+TLS handshake on
+    every match, json file and item icon.
+
+"""
+import threading
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+MAX_WORKERS = 20  # size of the fetch thread pools, each host pool matches it
+MAX_CONCURRENCY = 200  # in-flight requests for the asyncio fetcher
+DEFAULT_TIMEOUT = (5, 10)  # (connect, read) seconds
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def get_session(url):
+    """
+    Gets the pooled session for the host of a url, creating it on first use.
+    :param url: any url on the host
+    :return: the requests.Session for that host
+    """
+    parts = urlsplit(url)
+    host = f"{parts.scheme}://{parts.netloc}"
+
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS)
+            session.mount(host, adapter)
+            session.headers.update({
+                'Accept-Encoding': 'gzip, deflate',
+                'Connection': 'keep-alive',
+            })
+            _sessions[host] = session
+    return session
+
+
+def http_get(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    GET through the pooled session for the url's host.
+    :param url: the url
+    :param timeout: (connect, read) timeout, defaults to DEFAULT_TIMEOUT
+    :return: the response
+    """
+    return get_session(url).get(url, timeout=timeout, **kwargs)
+
+
+def close_sessions():
+    """Closes every pooled connection (ex. on app exit)"""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def make_async_session(concurrency=MAX_CONCURRENCY):
+    """
+    Creates an aiohttp session for the asyncio fetcher, with the same keep-alive,
+    gzip and timeouts as the pooled requests sessions. The caller closes it.
+    :param concurrency: max open connections
+    :return: the aiohttp.ClientSession
+    """
+    connect, read = DEFAULT_TIMEOUT
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=concurrency),
+        timeout=aiohttp.ClientTimeout(connect=connect, sock_read=read),
+        headers={'Accept-Encoding': 'gzip, deflate'},
+    )
@@ -0,0 +1,177 @@
+"""
+    Two-tier cache for item and champion icons.
+    On disk we keep the raw download and a pre-resized PNG per url + size, so a
+    warm start never touches the network and never resizes again. In memory
+    the UI keeps a bounded LRU of decoded images, so long sessions browsing many
+    players don't grow without limit.
+
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from PIL import Image
+
+import Metrics
+from HttpClient import http_get
+from MatchStore import DATA_DIR
+
+IMAGE_DIR = os.path.join(DATA_DIR, 'images')
+
+
+class LRUCache:
+    """
+    Dict-like cache that forgets the least recently used entry past maxsize.
+    Anything still on screen must be referenced by its widget, eviction only
+    drops the cache's own reference.
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _path_for(url, size=None):
+    name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    if size is None:
+        return os.path.join(IMAGE_DIR, f'{name}.raw')
+    return os.path.join(IMAGE_DIR, f'{name}_{size[0]}x{size[1]}.png')
+
+
+def _write(path, data):
+    os.makedirs(IMAGE_DIR, exist_ok=True)
+    tmp_path = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _read(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def get_raw_image(url):
+    """
+    Gets the original image bytes, from disk if we have downloaded it before.
+    :param url: the image url
+    :return: the bytes, or None if it could not be downloaded
+    """
+    path = _path_for(url)
+    data = _read(path)
+    if data is not None:
+        return data
+
+    with Metrics.span('icon_download'):
+        response = http_get(url)
+    if response.status_code != 200:
+        Metrics.incr('errors_total', stage='icon_download')
+        return None
+    _write(path, response.content)
+    return response.content
+
+
+def get_resized_image(url, size=(40, 40)):
+    """
+    Gets an icon resized to `size` as PNG bytes. The resize is done once and
+    stored, so this is a file read after the first time. Safe to call from a
+    worker thread.
+    :param url: the image url
+    :param size: (width, height)
+    :return: PNG bytes, or None if the image could not be downloaded
+    """
+    path = _path_for(url, size)
+    data = _read(path)
+    if data is not None:
+        Metrics.incr('cache_hits_total', cache='icon_disk')
+        return data
+    Metrics.incr('cache_misses_total', cache='icon_disk')
+
+    raw = get_raw_image(url)
+    if raw is None:
+        return None
+
+    img = Image.open(BytesIO(raw)).convert('RGBA')
+    img = img.resize(size, Image.Resampling.LANCZOS)
+    out = BytesIO()
+    img.save(out, format='PNG')
+    data = out.getvalue()
+    _write(path, data)
+    return data
+
+
+def load_image(url, size=(40, 40)):
+    """
+    Gets an icon as a decoded PIL image at `size`. Safe to call from a worker
+    thread, turn it into a PhotoImage on the Tk thread.
+    :param url: the image url
+    :param size: (width, height)
+    :return: the PIL image, or None if it could not be downloaded
+    """
+    data = get_resized_image(url, size)
+    if data is None:
+        return None
+    img = Image.open(BytesIO(data))
+    img.load()
+    return img
+
+
+def compose_strip(images, size=(40, 40), gap=6):
+    """
+    Pastes icons side by side into one image, so a row of items can be a single widget.
+    :param images: PIL images (None gets a gray placeholder)
+    :param size: (width, height) of each icon
+    :param gap: pixels between icons
+    :return: the strip as a PIL image
+    """
+    width = max(len(images) * (size[0] + gap) - gap, 1)
+    strip = Image.new('RGBA', (width, size[1]), (0, 0, 0, 0))
+    for i, img in enumerate(images):
+        if img is None:
+            img = Image.new('RGBA', size, (60, 60, 60, 255))
+        strip.paste(img, (i * (size[0] + gap), 0))
+    return strip
+
+
+def load_item_strip(urls, size=(40, 40), gap=6):
+    """
+    Loads icons and composes them into one strip. Safe to call from a worker thread.
+    :param urls: the icon urls, left to right
+    :param size: (width, height) of each icon
+    :param gap: pixels between icons
+    :return: the strip as a PIL image, an icon that fails to load is left gray
+    """
+    images = []
+    for url in urls:
+        try:
+            images.append(load_image(url, size))
+        except Exception as e:
+            print(f"Failed to load image: {url} -> {e}")
+            images.append(None)
+    return compose_strip(images, size, gap)
@@ -5,19 +5,24 @@
 
 """
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 import os
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import Metrics
+from HttpClient import make_async_session, MAX_CONCURRENCY
+from FrameStore import load_player_frame, save_player_frame, delete_player_frame, frame_months
+from MatchSchema import MATCH_SCHEMA, PARTICIPANT_SCHEMA, build_frame, apply_schema
+from MatchStore import (get_match, save_match, missing_match_ids, is_finished_match, get_sync_state,
+                        save_sync_state, get_stored_match_ids, save_participant_records, get_participant_records,
+                        missing_participant_match_ids)
+from RiotScheduler import riot_get, riot_get_async, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+from StaticData import get_static_index
 
 load_dotenv()
 
 api_key = os.environ.get('riot_api_key')
-character = 'https://raw.communitydragon.org/latest/plugins/rcp-be-lol-game-data/global/default/v1/champion-summary.json'
-items = 'https://raw.communitydragon.org/latest/plugins/rcp-be-lol-game-data/global/default/v1/items.json'
 
-_item_data_cache = None  # cache globally so we only fetch once
-_character_data_cache = None  # cache character data
+MATCH_PAGE_SIZE = 100  # Riot's max count per match list request
 
 def get_puuid(summonerId=None, gameName=None, tagLine=None, api_key=None):
     """
@@ -28,11 +33,13 @@ def get_puuid(summonerId=None, gameName=None, tagLine=None, api_key=None):
     :return: the puuid
     """
     if summonerId is not None:
-        link = f"https://americas.api.riotgames.com/lol/summoner/v4/summoners/{summonerId}?api_key={api_key}"
+        path = f"lol/summoner/v4/summoners/{summonerId}"
+        method = 'summoner-v4.by-id'
     else:
-        link = f"https://americas.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{gameName}/{tagLine}?api_key={api_key}"
+        path = f"riot/account/v1/accounts/by-riot-id/{gameName}/{tagLine}"
+        method = 'account-v1.by-riot-id'
 
-    response = requests.get(link)
+    response = riot_get(path, method, key=api_key, priority=PRIORITY_HIGH)
 
     # If response isn't 200 OK, handle gracefully
     if response.status_code != 200:
@@ -46,180 +53,314 @@ def get_puuid(summonerId=None, gameName=None, tagLine=None, api_key=None):
 
     return data["puuid"]
 
-def get_match_history(puuid=None,start=0, count=20):
-    root_url = f'https://americas.api.riotgames.com/'
+def get_match_history(puuid=None,start=0, count=20, start_time=None, end_time=None, queue=None,
+                      priority=PRIORITY_HIGH):
+    """
+    Gets one page of matchIds, newest first. Riot caps a page at 100, use
+    iter_match_ids to go further back.
+    :param start: index of the first match to return
+    :param count: page size (max 100)
+    :param start_time: only matches after this epoch time in seconds
+    :param end_time: only matches before this epoch time in seconds
+    :param queue: only this queue id (ex. 420 for ranked solo)
+    :return: list of matchIds
+    """
     endpoint = f'lol/match/v5/matches/by-puuid/{puuid}/ids'
-    query_params = f'?start={start}&count={count}'
-    response = requests.get(root_url + endpoint + query_params +"&api_key=" + api_key, timeout=10)
+    params = {'start': start, 'count': min(count, MATCH_PAGE_SIZE)}
+    if start_time is not None:
+        params['startTime'] = int(start_time)
+    if end_time is not None:
+        params['endTime'] = int(end_time)
+    if queue is not None:
+        params['queue'] = queue
+    response = riot_get(endpoint, 'match-v5.ids', params=params, key=api_key, priority=priority)
 
     return response.json()
 
+def iter_match_id_pages(puuid, max_count=None, start_time=None, end_time=None, queue=None,
+                        stop_at_stored=False, priority=PRIORITY_HIGH):
+    """
+    Pages through a player's whole match history, one request per 100 ids.
+    Pages are only requested when the caller asks for the next one.
+    :param puuid: the player's puuid
+    :param max_count: stop after this many ids, None for everything Riot has
+    :param start_time: only matches after this epoch time in seconds
+    :param end_time: only matches before this epoch time in seconds
+    :param queue: only this queue id
+    :param stop_at_stored: stop at the first id already in the match store
+    :param priority: scheduler priority, use PRIORITY_LOW for backfills
+    :return: generator of lists of matchIds, newest first
+    """
+    start = 0
+    found = 0
+    while max_count is None or found < max_count:
+        page_size = MATCH_PAGE_SIZE if max_count is None else min(MATCH_PAGE_SIZE, max_count - found)
+        page = get_match_history(puuid, start=start, count=page_size, start_time=start_time,
+                                 end_time=end_time, queue=queue, priority=priority)
+        if not isinstance(page, list):
+            print(f"Riot API error getting match history for {puuid}: {page}")
+            return
+        if not page:
+            return
+
+        if stop_at_stored:
+            # History is newest first, everything after the first stored id is stored too
+            new_ids = set(missing_match_ids(page))
+            stored_at = next((i for i, mid in enumerate(page) if mid not in new_ids), None)
+            if stored_at is not None:
+                if stored_at:
+                    yield page[:stored_at]
+                return
+
+        yield page
+        found += len(page)
+        if len(page) < page_size:
+            return
+        start += len(page)
+
+def iter_match_ids(puuid, **kwargs):
+    """
+    Same as iter_match_id_pages but yields one matchId at a time.
+    """
+    for page in iter_match_id_pages(puuid, **kwargs):
+        yield from page
+
+def backfill_match_history(puuid, start_time=None, end_time=None, queue=None):
+    """
+    Downloads every match in a time range into the match store, page by page,
+    at low priority. Matches already stored cost nothing, so this can be run
+    again and again to grow a season of history incrementally.
+    :param puuid: the player's puuid
+    :param start_time: epoch seconds, ex. the start of the season
+    :param end_time: epoch seconds, None for now
+    :param queue: only this queue id
+    :return: how many new matches were stored
+    """
+    async def run():
+        stored = 0
+        async with make_async_session() as session:
+            semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+            pages = iter_match_id_pages(puuid, start_time=start_time, end_time=end_time, queue=queue,
+                                        priority=PRIORITY_LOW)
+            while (page := await asyncio.to_thread(next, pages, None)) is not None:
+                async for _, game in stream_match_data(missing_match_ids(page), session, semaphore,
+                                                       priority=PRIORITY_LOW):
+                    stored += is_finished_match(game)
+        return stored
+
+    return asyncio.run(run())
+
 def get_match_data_from_id(matchId = None):
-    root_url = f'https://americas.api.riotgames.com/'
+    """
+    Gets the match json for a matchId. Finished matches never change, so we
+    read them from the local match store and only hit Riot for new ones.
+    :param matchId: the Riot matchId
+    :return: the match json
+    """
+    stored = get_match(matchId)
+    if stored is not None:
+        Metrics.incr('cache_hits_total', cache='match_store')
+        return stored
+    Metrics.incr('cache_misses_total', cache='match_store')
+
     endpoint = f'lol/match/v5/matches/{matchId}'
-    response = requests.get(root_url+endpoint+'?api_key=' +api_key, timeout=10)
+    response = riot_get(endpoint, 'match-v5.match', key=api_key)
 
-    return response.json()
+    match_json = response.json()
+    if response.status_code == 200:
+        save_match(match_json)
+    return match_json
 
-def process_match_json(match_json, puuid):
-    metadata= match_json['metadata']
+SIDES = {
+    100: 'Blue',
+    200: 'Red'
+}
 
-    match_id = metadata['matchId']
+
+def extract_match_record(match_json, puuid):
+    """
+    Pulls the player's row out of a match json as a plain tuple, in MATCH_COLUMNS order.
+    Building one dataframe from many of these is much faster than a dataframe per match.
+    :param match_json: the match-v5 json
+    :param puuid: the player we want the row for
+    :return: tuple of values
+    """
+    metadata = match_json['metadata']
     info = match_json['info']
-    players = info['participants']
     participants = metadata['participants']
-    teams = info['teams']
-    player = players[participants.index(puuid)]
+    player = info['participants'][participants.index(puuid)]
     perks = player['perks']
     stats = perks['statPerks']
-    styles = perks['styles']
-
-    side_dict = {
-        100:'Blue',
-        200:'Red'
-    }
+    primary, secondary = perks['styles'][0], perks['styles'][1]
+    primary_selections = primary['selections']
+    secondary_selections = secondary['selections']
+
+    return (
+        metadata['matchId'],
+        info['gameCreation'],
+        info['gameDuration'],
+        info['gameStartTimestamp'],
+        info['gameEndTimestamp'],
+        info['gameVersion'],
+        puuid,
+        player['win'],
+        SIDES[player['teamId']],
+        player['teamPosition'],
+        player['champLevel'],
+        player['championId'],
+        player['championTransform'],
+        player['deaths'],
+        player['assists'],
+        player['kills'],
+        player['firstBloodKill'],
+        player['gameEndedInEarlySurrender'],
+        player['gameEndedInSurrender'],
+        player['goldEarned'],
+        player['item0'],
+        player['item1'],
+        player['item2'],
+        player['item3'],
+        player['item4'],
+        player['item5'],
+        player['item6'],
+        player['summonerId'],
+        player['riotIdGameName'],
+        player['totalDamageDealtToChampions'],
+        player['totalDamageShieldedOnTeammates'],
+        player['totalDamageTaken'],
+        player['totalHealsOnTeammates'],
+        player['totalTimeCCDealt'],
+        player['totalMinionsKilled'],
+        player['wardsPlaced'],
+        player['wardsKilled'],
+        player['visionScore'],
+        player['role'],
+        stats['defense'],
+        stats['offense'],
+        stats['flex'],
+        player['totalMinionsKilled'] + player['neutralMinionsKilled'],
+        primary['style'],
+        secondary['style'],
+        primary_selections[0]['perk'],
+        primary_selections[1]['perk'],
+        primary_selections[2]['perk'],
+        primary_selections[3]['perk'],
+        secondary_selections[0]['perk'],
+        secondary_selections[1]['perk'],
+        player['objectivesStolen'],
+        player['objectivesStolenAssists'],
+    )
+
+
+def build_match_frame(records):
+    """
+    Builds the match dataframe in one go from extract_match_record tuples.
+    :param records: list of tuples in MATCH_COLUMNS order
+    :return: the dataframe with MATCH_SCHEMA dtypes
+    """
+    return build_frame(records, MATCH_SCHEMA)
 
-    side = side_dict[player['teamId']]
 
-    game_creation = info['gameCreation']
+def extract_participant_records(match_json):
+    """
+    Every player of a match as plain tuples, in PARTICIPANT_COLUMNS order.
+    :param match_json: the match-v5 json
+    :return: list of ten tuples
+    """
+    match_id = match_json['metadata']['matchId']
+    info = match_json['info']
+    game_start = info['gameStartTimestamp']
     game_duration = info['gameDuration']
-    game_start_time = info['gameStartTimestamp']
-    game_end = info['gameEndTimestamp']
     patch = info['gameVersion']
 
+    return [(
+        match_id,
+        player['puuid'],
+        game_start,
+        game_duration,
+        patch,
+        player.get('riotIdGameName'),
+        player.get('riotIdTagline'),
+        player['win'],
+        SIDES[player['teamId']],
+        player['teamPosition'],
+        player['champLevel'],
+        player['championId'],
+        player['kills'],
+        player['deaths'],
+        player['assists'],
+        player['goldEarned'],
+        player['item0'],
+        player['item1'],
+        player['item2'],
+        player['item3'],
+        player['item4'],
+        player['item5'],
+        player['item6'],
+        player['totalDamageDealtToChampions'],
+        player['totalDamageTaken'],
+        player['totalMinionsKilled'] + player['neutralMinionsKilled'],
+        player['visionScore'],
+        player['wardsPlaced'],
+        player['wardsKilled'],
+    ) for player in info['participants']]
+
+
+def build_participant_frame(records):
+    """
+    Builds the participant dataframe in one go from extract_participant_records tuples.
+    :param records: list of tuples in PARTICIPANT_COLUMNS order
+    :return: the dataframe with PARTICIPANT_SCHEMA dtypes
+    """
+    return build_frame(records, PARTICIPANT_SCHEMA)
 
-    role = player['teamPosition']
-    game_queue = player['role']
-    champ_lvl = player['champLevel']
-    champ_id = player['championId']
-    champ_transform = player['championTransform']
-    deaths = player['deaths']
-    assists = player['assists']
-    kills = player['kills']
-
-    first_blood = player['firstBloodKill']
-    early_surrender = player['gameEndedInEarlySurrender']
-    surrender = player['gameEndedInSurrender']
-
-    gold_earned = player['goldEarned']
-
-    item0 = player['item0']
-    item1 = player['item1']
-    item2 = player['item2']
-    item3 = player['item3']
-    item4 = player['item4']
-    item5 = player['item5']
-    item6 = player['item6']
-
-    neutral_minions_killed = player['neutralMinionsKilled']
-    minions = player['totalMinionsKilled']
-    minions += neutral_minions_killed
-    summoner_id = player['summonerId']
-    summoner_name = player['riotIdGameName']
-
-    total_damage_dealt = player['totalDamageDealtToChampions']
-    total_damage_shielded = player['totalDamageShieldedOnTeammates']
-    total_damage_taken = player['totalDamageTaken']
-    total_damage_healed = player['totalHealsOnTeammates']
-    total_time_cc_dealt = player['totalTimeCCDealt']
-    total_minions_killed = player['totalMinionsKilled']
-
-
-    wards_placed = player['wardsPlaced']
-    wards_killed = player['wardsKilled']
-    vision_score = player['visionScore']
-    win = player['win']
-
-
-    primary = styles[0]
-    secondary = styles[1]
-
-    defense = stats['defense']
-    offense = stats['offense']
-    flex = stats['flex']
-
-    primary_style = primary['style']
-    secondary_style = secondary['style']
-
-    primary_keystone = primary['selections'][0]['perk']
-    primary_perk1 = primary['selections'][1]['perk']
-    primary_perk2 = primary['selections'][2]['perk']
-    primary_perk3 = primary['selections'][3]['perk']
-
-
-    secondary_perk1 = secondary['selections'][0]['perk']
-    secondary_perk2 = secondary['selections'][1]['perk']
-
-
-    objectives_stolen = player['objectivesStolen']
-    objectives_stolen_assists = player['objectivesStolenAssists']
-    for team in teams:
-        if team['teamId'] == player['teamId']:
-            objs = team['objectives']
-            baron = objs['baron']
-            dragon = objs['dragon']
-            grubs = objs['horde']
-            rift_harold = objs['riftHerald']
-            tower = objs['tower']
-            inhibitor = objs['inhibitor']
-
-    matchDF = pd.DataFrame({
-        'match_id': [match_id],
-        'participants': [participants],
-        'game_creation': [game_creation],
-        'game_duration': [game_duration],
-        'game_start_time' : [game_start_time],
-        'game_end' : [game_end],
-        'patch' : [patch],
-        'puuid': [puuid],
-        'win': [win],
-        'side': [side],
-        'role': [role],
-        'champ_lvl':[champ_lvl],
-        'champion':[champ_id],
-        'champ_transform':[champ_transform],
-        'deaths': [deaths],
-        'assists':[assists],
-        'kills':[kills],
-        'first_blood':[first_blood],
-        'early_surrender':[early_surrender],
-        'surrender':[surrender],
-        'gold_earned':[gold_earned],
-        'item0':[item0],
-        'item1':[item1],
-        'item2':[item2],
-        'item3':[item3],
-        'item4':[item4],
-        'item5':[item5],
-        'item6':[item6],
-        'summoner_id': [summoner_id],
-        'summoner_name':[summoner_name],
-        'total_damage_dealt': [total_damage_dealt],
-        'total_damage_shielded': [total_damage_shielded],
-        'total_damage_taken': [total_damage_taken],
-        'total_damage_healed': [total_damage_healed],
-        'total_time_cc_dealt': [total_time_cc_dealt],
-        'total_minions_killed': [total_minions_killed],
-        'wards_placed': [wards_placed],
-        'wards_killed': [wards_killed],
-        'vision_score': [vision_score],
-        'queue': [game_queue],
-        'defense': [defense],
-        'offense':[offense],
-        'flex':[flex],
-        'minions':[minions],
-        'primary_style':[primary_style],
-        'secondary_style':[secondary_style],
-        'primary_keystone':[primary_keystone],
-        'primary_perk1':[primary_perk1],
-        'primary_perk2':[primary_perk2],
-        'primary_perk3':[primary_perk3],
-        'secondary_perk1':[secondary_perk1],
-        'secondary_perk2':[secondary_perk2],
-        'objectives_stolen':[objectives_stolen],
-        'objectives_stolen_assists':[objectives_stolen_assists],
-    })
-    return matchDF
+
+def get_participant_table(match_ids=None, puuid=None):
+    """
+    All ten players of stored matches, straight from the match store (no API calls).
+    Use it to scout teammates and opponents of anyone we have already looked up.
+    The rows are stored when build_player_frame reads the match, so this
+    doesn't parse match json again.
+    :param match_ids: only these matches (ex. df['match_id'] from get_player_stats)
+    :param puuid: only matches this player was in
+    :return: the participant dataframe
+    """
+    if match_ids is None:
+        match_ids = get_stored_match_ids(puuid)
+    match_ids = list(match_ids)
+
+    # Matches stored without their participant rows (ex. by a backfill) get them now, once
+    missing = {}
+    for mid in missing_participant_match_ids(match_ids):
+        game = get_match(mid)
+        if game is not None:
+            missing[mid] = extract_participant_records(game)
+    save_participant_records(missing)
+
+    stored = get_participant_records(match_ids)
+    records = [record for mid in match_ids for record in stored.get(mid, [])]
+    df = build_participant_frame(records)
+    df = make_it_pretty(df)
+    return df
+
+
+def get_stored_player_stats(puuid, match_count=None):
+    """
+    Builds the get_player_stats dataframe for any player found in stored matches,
+    without asking Riot for anything.
+    :param puuid: the player's puuid
+    :param match_count: only the newest n matches, None for all
+    :return: the dataframe
+    """
+    match_ids = get_stored_match_ids(puuid)[:match_count]
+    return build_player_frame(match_ids, [get_match(mid) for mid in match_ids], puuid)
+
+
+def process_match_json(match_json, puuid):
+    """
+    One match as a one-row dataframe. Prefer extract_match_record + build_match_frame for many matches.
+    """
+    return build_match_frame([extract_match_record(match_json, puuid)])
 
 def make_it_pretty(df):
     """
@@ -229,16 +370,18 @@ def make_it_pretty(df):
     :param df: the user dataframe
     :return: an updated user dataframe that will have champion names instead of ids
     """
-    global _character_data_cache
+    index = get_static_index()
 
-    # Cache character data
-    if _character_data_cache is None:
-        character_json = requests.get(character, timeout=10).json()
-        character_names = json_extract(character_json, 'name')
-        character_ids = json_extract(character_json, 'id')
-        _character_data_cache = dict(map(lambda i, j: (int(i), j), character_ids, character_names))
+    def champion_name(champion):
+        try:
+            return index.champion_name(int(champion), str(champion))
+        except (TypeError, ValueError):
+            return str(champion)  # already a name
 
-    df['champion'] = df['champion'].replace(_character_data_cache)
+    # Look up each distinct champion once, names repeat a lot so keep them as a category
+    with Metrics.span('make_it_pretty'):
+        names = {champion: champion_name(champion) for champion in df['champion'].unique()}
+        df['champion'] = df['champion'].map(names).astype('category')
 
     return df
 
@@ -250,33 +393,7 @@ def get_images(data_frame):
     return a list of valid CommunityDragon item URLs using item_id.
     Skips missing or zero items.
     """
-    global _item_data_cache
-
-    if _item_data_cache is None:
-        items_url = "https://raw.communitydragon.org/latest/plugins/rcp-be-lol-game-data/global/default/v1/items.json"
-        try:
-            _item_data_cache = requests.get(items_url, timeout=10).json()
-        except Exception as e:
-            print(f"Error fetching item JSON: {e}")
-            return []
-
-    # Build item_id -> icon_path dict from the JSON
-    image_dict = {}
-    for item in _item_data_cache:
-        try:
-            item_id = int(item["id"])
-            # The iconPath in the JSON looks like: "/lol-game-data/assets/ASSETS/Items/Icons2D/1001_healthpotion.png"
-            icon_path = item.get("iconPath", "")
-            if not icon_path:
-                continue
-
-            # Remove the /lol-game-data/assets/ prefix and convert to lowercase
-            # CommunityDragon URLs are case-sensitive and all lowercase
-            icon_path = icon_path.replace("/lol-game-data/assets/", "").lstrip('/').lower()
-            url = f"https://raw.communitydragon.org/latest/plugins/rcp-be-lol-game-data/global/default/{icon_path}"
-            image_dict[item_id] = url
-        except (ValueError, KeyError, TypeError):
-            continue
+    index = get_static_index()
 
     # Extract valid item IDs from row
     image_paths = []
@@ -284,21 +401,207 @@ def get_images(data_frame):
         try:
             item_val = data_frame.get(f"item{i}") if isinstance(data_frame, dict) else data_frame[f"item{i}"]
             item_id = int(item_val)
-            if item_id != 0 and item_id in image_dict:
-                image_paths.append(image_dict[item_id])
+            url = index.item_icon(item_id) if item_id != 0 else None
+            if url:
+                image_paths.append(url)
         except (ValueError, TypeError, KeyError):
             continue
 
     return image_paths
 
-def get_player_stats(puuid, match_count=1):
-    match_ids = get_match_history(puuid, start=0, count=match_count)
+async def _fetch_match_async(session, semaphore, match_id, priority=PRIORITY_NORMAL):
+    # A match that can't be fetched or stored is left out (build_player_frame skips it), the
+    # exception would otherwise cancel the rest of the player's downloads
+    try:
+        async with semaphore:
+            with Metrics.span('match_download'):
+                status, match_json = await riot_get_async(session, f'lol/match/v5/matches/{match_id}',
+                                                          'match-v5.match', key=api_key, priority=priority)
+        if status == 200:
+            await asyncio.to_thread(save_match, match_json)
+    except Exception as e:
+        print(f"Error fetching match {match_id}: {e}")
+        return match_id, None
+    return match_id, match_json
+
+
+async def stream_match_data(match_ids, session, semaphore=None, priority=PRIORITY_NORMAL):
+    """
+    Yields (matchId, match json) as each match becomes available instead of in
+    submission order. Stored matches come out first, the rest as their
+    downloads finish.
+    :param match_ids: list of matchIds
+    :param session: the aiohttp session to fetch on
+    :param semaphore: bounds the in-flight requests, share one across players to bound them all
+    :param priority: scheduler priority of the downloads, use PRIORITY_LOW for backfills
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+    # The store is read and written in worker threads, the event loop keeps the downloads going
+    new_ids = await asyncio.to_thread(missing_match_ids, match_ids)
+    new_set = set(new_ids)
+    Metrics.incr('cache_hits_total', len(match_ids) - len(new_ids), cache='match_store')
+    Metrics.incr('cache_misses_total', len(new_ids), cache='match_store')
+    stored_ids = [mid for mid in match_ids if mid not in new_set]
+    stored = await asyncio.to_thread(lambda: [get_match(mid) for mid in stored_ids])
+    for mid, game in zip(stored_ids, stored):
+        yield mid, game
+
+    tasks = [asyncio.create_task(_fetch_match_async(session, semaphore, mid, priority)) for mid in new_ids]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def get_player_stats_async(puuid, match_count=1, session=None, semaphore=None, incremental=False,
+                                 return_missing=False):
+    """
+    Pulls the match list and every match on one event loop.
+    In incremental mode only matches newer than the last sync are requested and
+    added to the player's stored dataframe, so a refresh after one new game is
+    two API calls (the id list and that match).
+    The stored dataframe is always an unbroken run of the player's newest
+    games. When more than match_count games were played since the last sync
+    (or a full fetch doesn't reach the stored games) the new games can't be
+    joined up with it, so it is replaced by what was just fetched.
+    :param puuid: the player's puuid
+    :param match_count: how many recent matches, more than 100 is paged
+    :param session: optional aiohttp session, pass one in to share it across many players
+    :param semaphore: optional semaphore to share the in-flight limit across many players
+    :param incremental: only fetch what is newer than the stored watermark
+    :param return_missing: also return the matchIds that could not be downloaded
+    :return: the player's match dataframe, or (dataframe, missing matchIds) with return_missing.
+             A match that failed after the retries is left out of the dataframe
+    """
+    stored_df = await asyncio.to_thread(load_player_frame, puuid)
+    state = await asyncio.to_thread(get_sync_state, puuid)
+    start_time = None
+    known_ids = set()
+    if incremental and state and stored_df is not None and len(stored_df) >= match_count:
+        start_time = state['newest_timestamp'] // 1000
+        known_ids = set(stored_df['match_id'])
+    else:
+        incremental = False
+
+    own_session = session is None
+    if own_session:
+        session = make_async_session()
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    downloads = []
+    try:
+        match_ids = []
+        games = {}
+
+        async def collect(page):
+            async for mid, game in stream_match_data(page, session, semaphore):
+                games[mid] = game
+
+        # Matches of a page start downloading while the next page of ids is requested.
+        # Incremental asks for one id more than it needs, to tell if the new games reach the stored ones
+        max_count = match_count + 1 if incremental else match_count
+        pages = iter_match_id_pages(puuid, max_count=max_count, start_time=start_time)
+        gap = False
+        while (page := await asyncio.to_thread(next, pages, None)) is not None:
+            page = [mid for mid in page if mid not in known_ids]
+            if len(match_ids) + len(page) > match_count:
+                gap = True  # more new games than asked for, the extra one isn't downloaded
+                page = page[:match_count - len(match_ids)]
+            match_ids.extend(page)
+            downloads.append(asyncio.create_task(collect(page)))
+        await asyncio.gather(*downloads)
+    finally:
+        for task in downloads:
+            task.cancel()  # after an error, don't leave the other pages downloading on a shared session
+        if own_session:
+            await session.close()
+
+    df = await asyncio.to_thread(build_player_frame, match_ids, [games.get(mid) for mid in match_ids], puuid)
+
+    if not incremental and state and stored_df is not None:
+        # A full fetch joins up with the stored games if it got to the newest of them, or to the end of the history
+        gap = len(match_ids) >= match_count and state['newest_match_id'] not in match_ids
+
+    merged = await asyncio.to_thread(_store_player_frame, puuid, df, stored_df, gap, len(df) == len(match_ids))
+    if incremental and not gap:
+        df = merged.head(match_count).reset_index(drop=True)
+    if return_missing:
+        return df, [mid for mid in match_ids if not is_finished_match(games.get(mid))]
+    return df
+
 
-    with ThreadPoolExecutor(max_workers=20) as executor:
-        futures = [executor.submit(get_match_data_from_id, mid) for mid in match_ids]
-        match_data = [f.result() for f in futures]
+def _store_player_frame(puuid, df, stored_df, gap, complete):
+    """
+    Adds the freshly built games to the player's stored frame and sync watermark.
+    :param puuid: the player's puuid
+    :param df: the games just built, newest first
+    :param stored_df: what was stored before, or None
+    :param gap: the new games don't join up with the stored ones, replace them
+    :param complete: every requested match was built, otherwise nothing is saved
+    :return: the merged frame, newest first
+    """
+    # Keep every match we have ever built for this player, newest first
+    with Metrics.span('merge_player_frame'):
+        merged = df
+        changed_months = None  # None: write every month
+        if not gap and stored_df is not None and not stored_df.empty:
+            changed_months = frame_months(df)  # the other months are already stored as they are
+            merged = pd.concat([df, stored_df], ignore_index=True) if not df.empty else stored_df
+            merged = merged.drop_duplicates('match_id').sort_values('game_start_time', ascending=False,
+                                                                    ignore_index=True)
+            merged = apply_schema(merged)
+        # A match that failed to download would leave a hole, keep the stored games as they were
+        # and fetch the same ids again next time (the ones that did download come from the store)
+        if not merged.empty and complete:
+            if gap:
+                delete_player_frame(puuid)
+            if merged is not stored_df:
+                save_player_frame(puuid, merged, months=changed_months)
+            save_sync_state(puuid, merged['match_id'].iloc[0], merged['game_start_time'].iloc[0])
+    return merged
+
+
+def get_player_stats(puuid, match_count=1, incremental=False):
+    """
+    Sync wrapper around get_player_stats_async, for the UI's fetch thread.
+    """
+    return asyncio.run(get_player_stats_async(puuid, match_count, incremental=incremental))
 
-    df = pd.concat([process_match_json(game, puuid) for game in match_data], ignore_index=True)
+
+def build_player_frame(match_ids, match_data, puuid):
+    """
+    Turns the match jsons into the player's dataframe, newest first.
+    :param match_ids: the matchIds, in history order
+    :param match_data: the match jsons, same order as match_ids
+    :param puuid: the player's puuid
+    :return: the dataframe
+    """
+    # A match that still failed after the scheduler's retries is skipped instead of breaking the concat
+    failed = [mid for mid, game in zip(match_ids, match_data) if not is_finished_match(game)]
+    if failed:
+        print(f"Skipping {len(failed)} match(es) that could not be fetched: {failed}")
+        Metrics.incr('errors_total', len(failed), stage='match_download')
+    match_data = [game for game in match_data if is_finished_match(game)]
+    if not match_data:
+        return pd.DataFrame()
+
+    # The other nine players come out of the same pass, for matches whose rows aren't stored yet
+    new_participants = set(missing_participant_match_ids([game['metadata']['matchId'] for game in match_data]))
+    records = []
+    participants = {}
+    with Metrics.span('build_player_frame'):
+        for game in match_data:
+            records.append(extract_match_record(game, puuid))
+            match_id = game['metadata']['matchId']
+            if match_id in new_participants:
+                participants[match_id] = extract_participant_records(game)
+        df = build_match_frame(records)
+    save_participant_records(participants)
+    Metrics.incr('rows_processed_total', len(df))
     df = make_it_pretty(df)
     return df
 
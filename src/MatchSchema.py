@@ -0,0 +1,170 @@
+"""
+    Column schemas for the match dataframes.
+    Every column has a fixed, compact dtype applied when the frame is built:
+    categories for repeated strings, small ints for counters, ids and perks,
+    bools for flags. The ten participants of a match live in the participant
+    table (PARTICIPANT_SCHEMA) instead of a list per row.
+
+"""
+import numpy as np
+import pandas as pd
+
+# Player match dataframe, one row per match (get_player_stats)
+MATCH_SCHEMA = [
+    ('match_id', 'object'),
+    ('game_creation', 'int64'),
+    ('game_duration', 'int32'),
+    ('game_start_time', 'int64'),
+    ('game_end', 'int64'),
+    ('patch', 'category'),
+    ('puuid', 'category'),
+    ('win', 'bool'),
+    ('side', 'category'),
+    ('role', 'category'),
+    ('champ_lvl', 'int16'),
+    ('champion', 'int16'),  # a category of names after make_it_pretty
+    ('champ_transform', 'int8'),
+    ('deaths', 'int16'),
+    ('assists', 'int16'),
+    ('kills', 'int16'),
+    ('first_blood', 'bool'),
+    ('early_surrender', 'bool'),
+    ('surrender', 'bool'),
+    ('gold_earned', 'int32'),
+    ('item0', 'int32'),
+    ('item1', 'int32'),
+    ('item2', 'int32'),
+    ('item3', 'int32'),
+    ('item4', 'int32'),
+    ('item5', 'int32'),
+    ('item6', 'int32'),
+    ('summoner_id', 'category'),
+    ('summoner_name', 'category'),
+    ('total_damage_dealt', 'int32'),
+    ('total_damage_shielded', 'int32'),
+    ('total_damage_taken', 'int32'),
+    ('total_damage_healed', 'int32'),
+    ('total_time_cc_dealt', 'int32'),
+    ('total_minions_killed', 'int16'),
+    ('wards_placed', 'int16'),
+    ('wards_killed', 'int16'),
+    ('vision_score', 'int16'),
+    ('queue', 'category'),
+    ('defense', 'int16'),
+    ('offense', 'int16'),
+    ('flex', 'int16'),
+    ('minions', 'int16'),
+    ('primary_style', 'int16'),
+    ('secondary_style', 'int16'),
+    ('primary_keystone', 'int16'),
+    ('primary_perk1', 'int16'),
+    ('primary_perk2', 'int16'),
+    ('primary_perk3', 'int16'),
+    ('secondary_perk1', 'int16'),
+    ('secondary_perk2', 'int16'),
+    ('objectives_stolen', 'int8'),
+    ('objectives_stolen_assists', 'int8'),
+]
+MATCH_COLUMNS = [name for name, _ in MATCH_SCHEMA]
+
+# One row per player per match, all ten players
+PARTICIPANT_SCHEMA = [
+    ('match_id', 'category'),
+    ('puuid', 'category'),
+    ('game_start_time', 'int64'),
+    ('game_duration', 'int32'),
+    ('patch', 'category'),
+    ('summoner_name', 'category'),
+    ('tag_line', 'category'),
+    ('win', 'bool'),
+    ('side', 'category'),
+    ('role', 'category'),
+    ('champ_lvl', 'int16'),
+    ('champion', 'int16'),
+    ('kills', 'int16'),
+    ('deaths', 'int16'),
+    ('assists', 'int16'),
+    ('gold_earned', 'int32'),
+    ('item0', 'int32'),
+    ('item1', 'int32'),
+    ('item2', 'int32'),
+    ('item3', 'int32'),
+    ('item4', 'int32'),
+    ('item5', 'int32'),
+    ('item6', 'int32'),
+    ('total_damage_dealt', 'int32'),
+    ('total_damage_taken', 'int32'),
+    ('minions', 'int16'),
+    ('vision_score', 'int16'),
+    ('wards_placed', 'int16'),
+    ('wards_killed', 'int16'),
+]
+PARTICIPANT_COLUMNS = [name for name, _ in PARTICIPANT_SCHEMA]
+
+
+def _column(values, dtype):
+    try:
+        return pd.Series(values, dtype=dtype)
+    except (OverflowError, ValueError, TypeError):
+        # A value that doesn't fit the small int (ex. a new item id) keeps the column wide
+        return pd.Series(values)
+
+
+def build_frame(records, schema):
+    """
+    Builds a dataframe in one go from record tuples, with the schema's dtypes.
+    :param records: list of tuples in schema order
+    :param schema: MATCH_SCHEMA or PARTICIPANT_SCHEMA
+    :return: the dataframe
+    """
+    columns = list(zip(*records)) if records else [()] * len(schema)
+    return pd.DataFrame({
+        name: _column(values, dtype)
+        for (name, dtype), values in zip(schema, columns)
+    })
+
+
+def apply_schema(df, schema=MATCH_SCHEMA):
+    """
+    Casts an existing frame (ex. a concat or an older stored frame) back to the
+    schema's dtypes. Columns not in the schema are left alone, and a column whose
+    values don't fit its small int is left as it is.
+    :param df: the dataframe
+    :param schema: MATCH_SCHEMA or PARTICIPANT_SCHEMA
+    :return: a new dataframe
+    """
+    df = df.copy()
+    for name, dtype in schema:
+        if name not in df or df[name].dtype == dtype:
+            continue
+        column = df[name]
+        if dtype == 'category' or name == 'champion' and not pd.api.types.is_integer_dtype(column):
+            # champion can mix names and ids that had no name, categories need one type
+            df[name] = column.where(column.isna(), column.astype(str)).astype('category')
+        elif dtype == 'bool':
+            if not column.isna().any():
+                df[name] = column.astype(bool)
+        elif dtype.startswith('int') and pd.api.types.is_integer_dtype(column):
+            info = np.iinfo(dtype)
+            if column.empty or (info.min <= column.min() and column.max() <= info.max):
+                df[name] = column.astype(dtype)
+    return df
+
+
+def memory_report(df):
+    """
+    How much memory each column of a dataframe takes.
+    :param df: the dataframe
+    :return: dataframe of dtype, bytes and share of the total per column, biggest first,
+             with a 'total' row at the end
+    """
+    sizes = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'bytes': sizes,
+    })
+    total = int(sizes.sum())
+    report['percent'] = (report['bytes'] / total * 100).round(1) if total else 0.0
+    report = report.sort_values('bytes', ascending=False)
+    report.loc['total'] = ['', total, 100.0]
+    return report
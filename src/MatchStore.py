@@ -0,0 +1,359 @@
+"""
+    Local match store for the trackers.
+    A finished match-v5 game never changes, so every match we download is
+    kept in a small SQLite file keyed by matchId (zlib compressed JSON) and
+    read back from disk instead of asking Riot for it again.
+    It also keeps a sync watermark per player, so a refresh only has to ask
+    for games newer than the last one we saw, and the Riot ID (name#tag) of
+    every puuid we have come across, so names resolve without asking Riot.
+
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+DATA_DIR = os.environ.get('sabre_data_dir', os.path.join(os.path.expanduser('~'), '.sabre_tracker'))
+DB_PATH = os.path.join(DATA_DIR, 'matches.db')
+
+_connection = None
+_lock = threading.Lock()  # one shared connection, used from the fetch threads
+
+
+def _get_connection():
+    """
+    Opens the store on first use and creates the tables if they don't exist yet.
+    Callers must hold _lock.
+    :return: the sqlite connection
+    """
+    global _connection
+
+    if _connection is None:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        _connection = sqlite3.connect(DB_PATH, check_same_thread=False)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS matches (
+                match_id TEXT PRIMARY KEY,
+                game_start INTEGER,
+                data BLOB NOT NULL
+            )
+        """)
+        new_index = _connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'match_players'"
+        ).fetchone() is None
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS match_players (
+                puuid TEXT NOT NULL,
+                match_id TEXT NOT NULL,
+                PRIMARY KEY (puuid, match_id)
+            )
+        """)
+        if new_index:
+            # Stores from before the player index existed, index what is already in there
+            for match_id, data in _connection.execute("SELECT match_id, data FROM matches").fetchall():
+                puuids = json.loads(zlib.decompress(data))['metadata']['participants']
+                _connection.executemany("INSERT OR IGNORE INTO match_players (puuid, match_id) VALUES (?, ?)",
+                                        [(puuid, match_id) for puuid in puuids])
+        # The participant rows of a match (LeagueTracker.extract_participant_records), so
+        # participant tables don't have to parse the whole match json again
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS participant_records (
+                match_id TEXT PRIMARY KEY,
+                records BLOB NOT NULL
+            )
+        """)
+        new_riot_ids = _connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'riot_ids'"
+        ).fetchone() is None
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS riot_ids (
+                puuid TEXT PRIMARY KEY,
+                game_name TEXT NOT NULL,
+                tag_line TEXT NOT NULL,
+                riot_id_key TEXT NOT NULL,
+                seen_at REAL NOT NULL
+            )
+        """)
+        _connection.execute("CREATE INDEX IF NOT EXISTS riot_ids_by_key ON riot_ids (riot_id_key, seen_at)")
+        if new_riot_ids:
+            # Every stored match names its ten players, learn them from what is already in there
+            for (data,) in _connection.execute("SELECT data FROM matches").fetchall():
+                _save_riot_ids(_connection, match_riot_ids(json.loads(zlib.decompress(data))))
+        _connection.execute("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                puuid TEXT PRIMARY KEY,
+                newest_match_id TEXT,
+                newest_timestamp INTEGER,
+                synced_at REAL
+            )
+        """)
+        _connection.commit()
+    return _connection
+
+
+def is_finished_match(match_json):
+    """
+    Only completed games are worth keeping, error bodies ({"status": ...}) and
+    anything without an end timestamp get fetched again next time.
+    :param match_json: the match-v5 response
+    :return: True if the match can be stored forever
+    """
+    if not isinstance(match_json, dict):
+        return False
+    info = match_json.get('info')
+    metadata = match_json.get('metadata')
+    if not info or not metadata or 'matchId' not in metadata:
+        return False
+    return bool(info.get('gameEndTimestamp'))
+
+
+def get_match(match_id):
+    """
+    Reads a stored match.
+    :param match_id: the Riot matchId (ex. NA1_1234567890)
+    :return: the match json, or None if we have never downloaded it
+    """
+    with _lock:
+        row = _get_connection().execute(
+            "SELECT data FROM matches WHERE match_id = ?", (match_id,)
+        ).fetchone()
+
+    if row is None:
+        return None
+    return json.loads(zlib.decompress(row[0]))
+
+
+def save_match(match_json):
+    """
+    Stores a finished match. Unfinished games and error responses are ignored.
+    :param match_json: the match-v5 response
+    :return: True if it was stored
+    """
+    if not is_finished_match(match_json):
+        return False
+
+    match_id = match_json['metadata']['matchId']
+    game_start = match_json['info'].get('gameStartTimestamp')
+    blob = zlib.compress(json.dumps(match_json, separators=(',', ':')).encode('utf-8'))
+
+    with _lock:
+        connection = _get_connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO matches (match_id, game_start, data) VALUES (?, ?, ?)",
+            (match_id, game_start, blob)
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO match_players (puuid, match_id) VALUES (?, ?)",
+            [(puuid, match_id) for puuid in match_json['metadata']['participants']]
+        )
+        _save_riot_ids(connection, match_riot_ids(match_json))
+        connection.commit()
+    return True
+
+
+def get_stored_match_ids(puuid=None):
+    """
+    Lists stored matches, newest first.
+    :param puuid: only matches this player was in (any of the ten), None for all
+    :return: list of matchIds
+    """
+    with _lock:
+        connection = _get_connection()
+        if puuid is None:
+            rows = connection.execute("SELECT match_id FROM matches ORDER BY game_start DESC").fetchall()
+        else:
+            rows = connection.execute(
+                "SELECT m.match_id FROM matches m JOIN match_players p ON p.match_id = m.match_id "
+                "WHERE p.puuid = ? ORDER BY m.game_start DESC", (puuid,)
+            ).fetchall()
+    return [row[0] for row in rows]
+
+
+def _chunked_select(connection, sql, keys, params=()):
+    """
+    Runs a SELECT ... IN ({}) query for many keys. sqlite caps the number of
+    bound parameters, so they are looked up in chunks.
+    :param sql: the query, {} is filled with the chunk's placeholders
+    :param keys: the values for the IN list
+    :param params: bound after each chunk, for placeholders that come after the IN list
+    :return: all the rows
+    """
+    rows = []
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        rows.extend(connection.execute(sql.format(','.join('?' * len(chunk))), chunk + list(params)).fetchall())
+    return rows
+
+
+def missing_match_ids(match_ids):
+    """
+    Filters a list of matchIds down to the ones we still have to download.
+    :param match_ids: list of matchIds
+    :return: the matchIds that are not in the store, in the same order
+    """
+    match_ids = list(match_ids)
+    if not match_ids:
+        return []
+
+    with _lock:
+        rows = _chunked_select(_get_connection(), "SELECT match_id FROM matches WHERE match_id IN ({})", match_ids)
+    stored = {row[0] for row in rows}
+    return [mid for mid in match_ids if mid not in stored]
+
+
+def save_participant_records(records_by_match):
+    """
+    Stores the participant rows of matches, matches that already have theirs are left alone.
+    :param records_by_match: dict matchId -> list of record tuples
+    """
+    rows = [(match_id, zlib.compress(json.dumps(records, separators=(',', ':')).encode('utf-8')))
+            for match_id, records in records_by_match.items()]
+    if not rows:
+        return
+    with _lock:
+        connection = _get_connection()
+        connection.executemany("INSERT OR IGNORE INTO participant_records (match_id, records) VALUES (?, ?)", rows)
+        connection.commit()
+
+
+def get_participant_records(match_ids):
+    """
+    Reads stored participant rows.
+    :param match_ids: list of matchIds
+    :return: dict matchId -> list of record lists, only for the matches that have them
+    """
+    match_ids = list(match_ids)
+    with _lock:
+        rows = _chunked_select(_get_connection(),
+                               "SELECT match_id, records FROM participant_records WHERE match_id IN ({})", match_ids)
+    return {match_id: json.loads(zlib.decompress(data)) for match_id, data in rows}
+
+
+def missing_participant_match_ids(match_ids):
+    """
+    Filters matchIds down to the ones without stored participant rows.
+    :param match_ids: list of matchIds
+    :return: those matchIds, in the same order
+    """
+    match_ids = list(match_ids)
+    with _lock:
+        rows = _chunked_select(_get_connection(),
+                               "SELECT match_id FROM participant_records WHERE match_id IN ({})", match_ids)
+    stored = {row[0] for row in rows}
+    return [mid for mid in match_ids if mid not in stored]
+
+
+def get_sync_state(puuid):
+    """
+    Gets the watermark of the last sync for a player.
+    :param puuid: the player's puuid
+    :return: dict with newest_match_id, newest_timestamp (ms) and synced_at, or None if never synced
+    """
+    with _lock:
+        row = _get_connection().execute(
+            "SELECT newest_match_id, newest_timestamp, synced_at FROM sync_state WHERE puuid = ?", (puuid,)
+        ).fetchone()
+
+    if row is None:
+        return None
+    return {'newest_match_id': row[0], 'newest_timestamp': row[1], 'synced_at': row[2]}
+
+
+def save_sync_state(puuid, newest_match_id, newest_timestamp):
+    """
+    Records the newest match we have for a player.
+    :param puuid: the player's puuid
+    :param newest_match_id: matchId of the newest stored match
+    :param newest_timestamp: its gameStartTimestamp in ms
+    """
+    with _lock:
+        connection = _get_connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO sync_state (puuid, newest_match_id, newest_timestamp, synced_at) "
+            "VALUES (?, ?, ?, ?)",
+            (puuid, newest_match_id, int(newest_timestamp), time.time())
+        )
+        connection.commit()
+
+
+def riot_id_key(game_name, tag_line):
+    """Riot IDs are case insensitive, this is what they are looked up by"""
+    return f"{game_name}#{tag_line}".casefold()
+
+
+def match_riot_ids(match_json):
+    """
+    The Riot IDs a match shows for its players, as of when it was played.
+    :param match_json: the match-v5 json
+    :return: list of (puuid, game name, tag line, seen_at epoch seconds)
+    """
+    seen_at = (match_json['info'].get('gameEndTimestamp') or 0) / 1000
+    entries = []
+    for participant in match_json['info'].get('participants', []):
+        puuid = participant.get('puuid')
+        game_name = participant.get('riotIdGameName')
+        tag_line = participant.get('riotIdTagline')
+        if puuid and game_name and tag_line:
+            entries.append((puuid, game_name, tag_line, seen_at))
+    return entries
+
+
+def _save_riot_ids(connection, entries):
+    # An older sighting (ex. a match from before a name change) never replaces a newer one
+    connection.executemany(
+        "INSERT INTO riot_ids (puuid, game_name, tag_line, riot_id_key, seen_at) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(puuid) DO UPDATE SET game_name = excluded.game_name, tag_line = excluded.tag_line, "
+        "riot_id_key = excluded.riot_id_key, seen_at = excluded.seen_at WHERE excluded.seen_at >= riot_ids.seen_at",
+        [(puuid, game_name, tag_line, riot_id_key(game_name, tag_line), seen_at)
+         for puuid, game_name, tag_line, seen_at in entries]
+    )
+
+
+def save_riot_ids(entries):
+    """
+    Remembers puuid <-> Riot ID pairs.
+    :param entries: list of (puuid, game name, tag line, seen_at epoch seconds), seen_at None for now
+    """
+    now = time.time()
+    with _lock:
+        connection = _get_connection()
+        _save_riot_ids(connection, [(puuid, game_name, tag_line, now if seen_at is None else seen_at)
+                                    for puuid, game_name, tag_line, seen_at in entries])
+        connection.commit()
+
+
+def get_riot_ids(puuids, max_age=None):
+    """
+    Looks up the Riot IDs of players.
+    :param puuids: list of puuids
+    :param max_age: ignore what was last seen more than this many seconds ago, None for any age
+    :return: dict puuid -> (game name, tag line) for the ones we know
+    """
+    puuids = list(puuids)
+    oldest = 0 if max_age is None else time.time() - max_age
+    with _lock:
+        rows = _chunked_select(_get_connection(),
+                               "SELECT puuid, game_name, tag_line FROM riot_ids WHERE puuid IN ({}) AND seen_at >= ?",
+                               puuids, [oldest])
+    return {puuid: (game_name, tag_line) for puuid, game_name, tag_line in rows}
+
+
+def get_riot_id_puuid(game_name, tag_line, max_age=None):
+    """
+    Looks up the puuid behind a Riot ID. If the name moved between players the
+    most recent sighting wins.
+    :param game_name: the in game name
+    :param tag_line: the tag line
+    :param max_age: ignore what was last seen more than this many seconds ago, None for any age
+    :return: the puuid, or None if we don't know it
+    """
+    oldest = 0 if max_age is None else time.time() - max_age
+    with _lock:
+        row = _get_connection().execute(
+            "SELECT puuid FROM riot_ids WHERE riot_id_key = ? AND seen_at >= ? ORDER BY seen_at DESC LIMIT 1",
+            (riot_id_key(game_name, tag_line), oldest)
+        ).fetchone()
+    return row[0] if row else None
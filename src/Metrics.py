@@ -0,0 +1,249 @@
+"""
+    Counters, timings and histograms for the fetch pipeline and the UI.
+    Everything goes into one in-process registry: requests per endpoint,
+    latency histograms, 429s, cache hits and misses, rows processed and
+    render time. Read it with snapshot(), dump it as json or Prometheus text,
+    or look at summary() (the TrackerUI status bar).
+    Set sabre_metrics=0 in the environment (or call enable(False)) to turn it
+    off, every call then returns straight away.
+
+    with span('match_download'):
+        ...
+    incr('cache_hits_total', cache='match_store')
+
+"""
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+ENABLED = os.environ.get('sabre_metrics', '1') != '0'
+
+# Histogram bucket upper bounds in seconds, the Prometheus defaults
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_counters = {}  # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [bucket counts..., +Inf count, sum]
+_lock = threading.Lock()
+
+
+def enable(flag=True):
+    """Turns collection on or off, what was collected so far is kept"""
+    global ENABLED
+    ENABLED = flag
+
+
+def reset():
+    """Forgets everything collected"""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items())) if labels else ()
+
+
+def incr(name, value=1, **labels):
+    """
+    Adds to a counter.
+    :param name: the counter (ex. riot_requests_total)
+    :param value: how much to add
+    :param labels: label values (ex. method='match-v5.match')
+    """
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    """
+    Records one value (usually seconds) in a histogram.
+    :param name: the histogram (ex. riot_request_seconds)
+    :param value: the value
+    :param labels: label values
+    """
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        histogram[bisect.bisect_left(BUCKETS, value)] += 1
+        histogram[-1] += value
+
+
+@contextmanager
+def _timed(name, labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+@contextmanager
+def _nothing():
+    yield
+
+
+def span(name, **labels):
+    """
+    Times a block into the histogram `name`_seconds.
+    :param name: what is being timed (ex. match_download)
+    :param labels: label values
+    :return: a context manager
+    """
+    if not ENABLED:
+        return _nothing()
+    return _timed(f'{name}_seconds', labels)
+
+
+def timed(name, **labels):
+    """Decorator version of span, for whole functions"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with _timed(f'{name}_seconds', labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def counter(name, **labels):
+    """Current value of a counter, summed over label values not given"""
+    with _lock:
+        return sum(value for (key_name, key_labels), value in _counters.items()
+                   if key_name == name and set(labels.items()) <= set(key_labels))
+
+
+def histogram(name, **labels):
+    """
+    (count, total) of a histogram, summed over label values not given.
+    :return: how many values were recorded and their sum
+    """
+    count = total = 0
+    with _lock:
+        for (key_name, key_labels), buckets in _histograms.items():
+            if key_name == name and set(labels.items()) <= set(key_labels):
+                count += sum(buckets[:-1])
+                total += buckets[-1]
+    return count, total
+
+
+def cache_hit_ratio(cache=None):
+    """
+    Share of cache lookups that were hits.
+    :param cache: one cache (match_store, static_data, icon_disk, icon_memory), None for all
+    :return: 0..1, or None if nothing was looked up yet
+    """
+    labels = {'cache': cache} if cache else {}
+    hits = counter('cache_hits_total', **labels)
+    misses = counter('cache_misses_total', **labels)
+    return hits / (hits + misses) if hits + misses else None
+
+
+def snapshot():
+    """
+    Everything collected so far.
+    :return: {'counters': [{'name', 'labels', 'value'}], 'histograms': [{'name', 'labels', 'count', 'sum', 'buckets'}]}
+    """
+    with _lock:
+        counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(_counters.items())]
+        histograms = []
+        for (name, labels), buckets in sorted(_histograms.items()):
+            cumulative, running = {}, 0
+            for bound, count in zip(BUCKETS + ('+Inf',), buckets[:-1]):
+                running += count
+                cumulative[str(bound)] = running
+            histograms.append({'name': name, 'labels': dict(labels), 'count': running,
+                               'sum': buckets[-1], 'buckets': cumulative})
+    return {'counters': counters, 'histograms': histograms}
+
+
+def to_json():
+    return json.dumps(snapshot(), indent=1)
+
+
+def _label_text(labels, extra=None):
+    labels = dict(labels, **(extra or {}))
+    if not labels:
+        return ''
+    values = ','.join('{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                      for key, value in labels.items())
+    return '{' + values + '}'
+
+
+def to_prometheus():
+    """Everything collected so far in the Prometheus text format"""
+    data = snapshot()
+    lines = []
+    typed = set()
+    for item in data['counters']:
+        if item['name'] not in typed:
+            typed.add(item['name'])
+            lines.append(f"# TYPE {item['name']} counter")
+        lines.append(f"{item['name']}{_label_text(item['labels'])} {item['value']}")
+    for item in data['histograms']:
+        name = item['name']
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} histogram")
+        for bound, count in item['buckets'].items():
+            lines.append(f"{name}_bucket{_label_text(item['labels'], {'le': bound})} {count}")
+        lines.append(f"{name}_sum{_label_text(item['labels'])} {item['sum']}")
+        lines.append(f"{name}_count{_label_text(item['labels'])} {item['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+def dump(folder):
+    """
+    Writes metrics.json and metrics.prom into a folder.
+    :param folder: where to write them
+    :return: the two paths
+    """
+    os.makedirs(folder, exist_ok=True)
+    paths = (os.path.join(folder, 'metrics.json'), os.path.join(folder, 'metrics.prom'))
+    for path, text in zip(paths, (to_json(), to_prometheus())):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return paths
+
+
+def summary():
+    """One line for a status bar"""
+    if not ENABLED:
+        return "Metrics off"
+
+    parts = [f"Riot: {counter('riot_requests_total')} requests"]
+    rate_limited = counter('riot_rate_limited_total')
+    if rate_limited:
+        parts.append(f"{rate_limited} × 429")
+    count, total = histogram('riot_request_seconds')
+    if count:
+        parts.append(f"avg {total / count * 1000:.0f}ms")
+    ratio = cache_hit_ratio()
+    if ratio is not None:
+        parts.append(f"cache hits {ratio:.0%}")
+    rows = counter('rows_processed_total')
+    if rows:
+        parts.append(f"{rows} rows")
+    count, total = histogram('fetch_seconds')
+    if count:
+        parts.append(f"fetch {total / count:.1f}s")
+    count, total = histogram('render_seconds')
+    if count:
+        parts.append(f"render avg {total / count * 1000:.0f}ms")
+    errors = counter('errors_total')
+    if errors:
+        parts.append(f"{errors} errors")
+    return " | ".join(parts)
@@ -0,0 +1,213 @@
+"""
+    Riot ID (name#tag) <-> puuid resolution for both trackers.
+    A puuid never changes but the Riot ID on it can, so what we learn is kept
+    in the match store (riot_ids table) for RIOT_ID_TTL and then checked with
+    account-v1 again. Every stored match also teaches us its ten players, so
+    naming the players of games we have is usually free.
+    The batch resolvers look up many names or puuids at once on one event
+    loop, through the shared rate limiter.
+
+"""
+import asyncio
+import os
+from urllib.parse import quote
+
+from dotenv import load_dotenv
+
+import Metrics
+from HttpClient import make_async_session, MAX_CONCURRENCY
+from MatchStore import get_riot_id_puuid, get_riot_ids, save_riot_ids
+from RiotScheduler import riot_get, riot_get_async, PRIORITY_HIGH
+
+load_dotenv()
+
+api_key = os.environ.get('riot_api_key')
+
+RIOT_ID_TTL = 7 * 24 * 3600  # seconds before a cached name is checked with Riot again
+
+
+def _by_riot_id_path(game_name, tag_line):
+    return f"riot/account/v1/accounts/by-riot-id/{quote(game_name, safe='')}/{quote(tag_line, safe='')}"
+
+
+def _by_puuid_path(puuid):
+    return f"riot/account/v1/accounts/by-puuid/{puuid}"
+
+
+def _account_entry(account):
+    """An account-v1 response as a save_riot_ids entry, None if it isn't a whole account"""
+    if not isinstance(account, dict) or not (account.get('puuid') and account.get('gameName')
+                                             and account.get('tagLine')):
+        return None
+    return account['puuid'], account['gameName'], account['tagLine'], None
+
+
+def resolve_puuid(game_name, tag_line, key=None, max_age=RIOT_ID_TTL):
+    """
+    Gets the puuid of a Riot ID, from the cache if we saw it recently enough.
+    :param game_name: In game name
+    :param tag_line: Riot Tagline
+    :param key: the API key, defaults to riot_api_key from the environment
+    :param max_age: how old (seconds) a cached answer may be, None for any age
+    :return: the puuid, or None if Riot doesn't know the Riot ID
+    """
+    puuid = get_riot_id_puuid(game_name, tag_line, max_age)
+    if puuid is not None:
+        Metrics.incr('cache_hits_total', cache='riot_ids')
+        return puuid
+    Metrics.incr('cache_misses_total', cache='riot_ids')
+
+    response = riot_get(_by_riot_id_path(game_name, tag_line), 'account-v1.by-riot-id',
+                        key=key or api_key, priority=PRIORITY_HIGH)
+    if response.status_code != 200:
+        print(f"Riot API error {response.status_code}: {response.text}")
+        return None
+    entry = _account_entry(response.json())
+    if entry is None:
+        print("No 'puuid' in response:", response.text)
+        return None
+    save_riot_ids([entry])
+    return entry[0]
+
+
+def resolve_riot_id(puuid, key=None, max_age=RIOT_ID_TTL):
+    """
+    Gets the Riot ID of a puuid, from the cache if we saw it recently enough.
+    :param puuid: the player's puuid
+    :param key: the API key, defaults to riot_api_key from the environment
+    :param max_age: how old (seconds) a cached answer may be, None for any age
+    :return: (game name, tag line), or None if Riot doesn't know the puuid
+    """
+    found = get_riot_ids([puuid], max_age).get(puuid)
+    if found is not None:
+        Metrics.incr('cache_hits_total', cache='riot_ids')
+        return found
+    Metrics.incr('cache_misses_total', cache='riot_ids')
+
+    response = riot_get(_by_puuid_path(puuid), 'account-v1.by-puuid', key=key or api_key, priority=PRIORITY_HIGH)
+    if response.status_code != 200:
+        print(f"Riot API error {response.status_code}: {response.text}")
+        return None
+    entry = _account_entry(response.json())
+    if entry is None:
+        return None
+    save_riot_ids([entry])
+    return entry[1], entry[2]
+
+
+async def _fetch_accounts(paths, method, session, key):
+    """
+    Downloads account-v1 responses concurrently.
+    :return: dict path -> (status code, account json or None), status None if the request itself failed
+    """
+    own_session = session is None
+    if own_session:
+        session = make_async_session()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+    async def fetch(path):
+        async with semaphore:
+            try:
+                status, data = await riot_get_async(session, path, method, key=key or api_key)
+            except Exception as e:
+                print(f"Error resolving {path}: {e}")
+                return path, (None, None)
+        if status != 200:
+            if status != 404:
+                print(f"Riot API error {status} for {path}")
+            return path, (status, None)
+        return path, (status, data)
+
+    try:
+        return dict(await asyncio.gather(*(fetch(path) for path in dict.fromkeys(paths))))
+    finally:
+        if own_session:
+            await session.close()
+
+
+async def resolve_puuids_async(riot_ids, session=None, key=None, max_age=RIOT_ID_TTL):
+    """
+    Resolves many Riot IDs at once. Cached ones cost nothing, the rest are
+    looked up concurrently through the rate limiter.
+    :param riot_ids: list of (game name, tag line)
+    :param session: optional aiohttp session to share
+    :param key: the API key, defaults to riot_api_key from the environment
+    :param max_age: how old (seconds) a cached answer may be, None for any age
+    :return: (dict (game name, tag line) -> puuid or None, set of the Riot IDs whose lookup failed).
+             None without a failure means Riot doesn't know the Riot ID (404), a failed one
+             (429s or 5xx after the retries, connection errors) is worth asking again later
+    """
+    resolved = {}
+    failed = set()
+    todo = []
+    for riot_id in dict.fromkeys(riot_ids):
+        puuid = get_riot_id_puuid(*riot_id, max_age=max_age)
+        if puuid is None:
+            todo.append(riot_id)
+        resolved[riot_id] = puuid
+    Metrics.incr('cache_hits_total', len(resolved) - len(todo), cache='riot_ids')
+    Metrics.incr('cache_misses_total', len(todo), cache='riot_ids')
+
+    if todo:
+        accounts = await _fetch_accounts([_by_riot_id_path(*riot_id) for riot_id in todo],
+                                         'account-v1.by-riot-id', session, key)
+        entries = []
+        for riot_id in todo:
+            status, account = accounts[_by_riot_id_path(*riot_id)]
+            entry = _account_entry(account)
+            if entry is not None:
+                resolved[riot_id] = entry[0]
+                entries.append(entry)
+            elif status != 404:
+                failed.add(riot_id)
+        save_riot_ids(entries)
+    return resolved, failed
+
+
+async def resolve_riot_ids_async(puuids, session=None, key=None, max_age=RIOT_ID_TTL):
+    """
+    Names many players at once, ex. all ten of a match. Cached ones cost
+    nothing, the rest are looked up concurrently through the rate limiter.
+    :param puuids: list of puuids
+    :param session: optional aiohttp session to share
+    :param key: the API key, defaults to riot_api_key from the environment
+    :param max_age: how old (seconds) a cached answer may be, None for any age
+    :return: (dict puuid -> (game name, tag line) or None, set of the puuids whose lookup failed),
+             same as resolve_puuids_async
+    """
+    puuids = list(dict.fromkeys(puuids))
+    failed = set()
+    found = get_riot_ids(puuids, max_age)
+    todo = [puuid for puuid in puuids if puuid not in found]
+    Metrics.incr('cache_hits_total', len(found), cache='riot_ids')
+    Metrics.incr('cache_misses_total', len(todo), cache='riot_ids')
+
+    resolved = {puuid: found.get(puuid) for puuid in puuids}
+    if todo:
+        accounts = await _fetch_accounts([_by_puuid_path(puuid) for puuid in todo], 'account-v1.by-puuid',
+                                         session, key)
+        entries = []
+        for puuid in todo:
+            status, account = accounts[_by_puuid_path(puuid)]
+            entry = _account_entry(account)
+            if entry is not None:
+                resolved[puuid] = entry[1], entry[2]
+                entries.append(entry)
+            elif status != 404:
+                failed.add(puuid)
+        save_riot_ids(entries)
+    return resolved, failed
+
+
+def resolve_puuids(riot_ids, key=None, max_age=RIOT_ID_TTL):
+    """
+    Sync wrapper around resolve_puuids_async.
+    """
+    return asyncio.run(resolve_puuids_async(riot_ids, key=key, max_age=max_age))
+
+
+def resolve_riot_ids(puuids, key=None, max_age=RIOT_ID_TTL):
+    """
+    Sync wrapper around resolve_riot_ids_async.
+    """
+    return asyncio.run(resolve_riot_ids_async(puuids, key=key, max_age=max_age))
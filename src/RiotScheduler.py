@@ -0,0 +1,405 @@
+"""
+    Central scheduler for every Riot API call.
+    Riot limits each key per region (X-App-Rate-Limit) and per endpoint
+    (X-Method-Rate-Limit). We keep a set of buckets for both, learn the real
+    limits from the response headers, wait for a token before sending and
+    back off on 429 (Retry-After) and 5xx instead of failing the whole fetch.
+
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import aiohttp
+import requests
+from dotenv import load_dotenv
+
+import Metrics
+from HttpClient import http_get, DEFAULT_TIMEOUT
+
+load_dotenv()
+
+api_key = os.environ.get('riot_api_key')
+
+# Point this at a local stub server for testing, ex. http://127.0.0.1:8080
+RIOT_HOST = os.environ.get('riot_api_host', 'https://{region}.api.riotgames.com')
+
+# Development key limits, used until the first response tells us the real ones
+DEFAULT_APP_LIMITS = [(20, 1), (100, 120)]
+
+PRIORITY_HIGH = 0    # interactive lookups, the user is waiting on these
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2     # background backfills
+
+
+class RateBucket:
+    """
+    One limit like 20 requests per 1 second.
+    Every spent token comes back `window` seconds after it was spent, which is
+    the same thing Riot counts on their side, so a full bucket can never burst
+    past the limit.
+    """
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.spent = deque()
+
+    def _expire(self, now):
+        while self.spent and self.spent[0] + self.window <= now:
+            self.spent.popleft()
+
+    def wait_time(self, now):
+        """Seconds until a token is free, 0 if one is free now"""
+        self._expire(now)
+        if len(self.spent) < self.limit:
+            return 0.0
+        return self.spent[0] + self.window - now
+
+    def take(self, now):
+        self.spent.append(now)
+
+    def sync(self, count, now):
+        """Riot told us `count` requests were used in this window, trust the bigger number"""
+        self._expire(now)
+        while len(self.spent) < min(count, self.limit):
+            self.spent.append(now)
+
+
+def parse_rate_limit(header):
+    """
+    Parses a rate limit header like "20:1,100:120" into [(20, 1), (100, 120)]
+    :param header: the header value
+    :return: list of (count, seconds) pairs
+    """
+    pairs = []
+    if not header:
+        return pairs
+    for part in header.split(','):
+        try:
+            count, window = part.strip().split(':')
+            pairs.append((int(count), int(window)))
+        except ValueError:
+            continue
+    return pairs
+
+
+def record_response(method, status, seconds):
+    """Counts one Riot response (status 'error' for a connection error) and its latency"""
+    if not Metrics.ENABLED:
+        return
+    Metrics.incr('riot_requests_total', method=method, status=status)
+    Metrics.observe('riot_request_seconds', seconds, method=method)
+    if status == 429:
+        Metrics.incr('riot_rate_limited_total', method=method)
+
+
+class RiotScheduler:
+    """
+    Hands out request slots per region and per method.
+    Requests wait in priority order, so a user clicking "Fetch Stats" isn't stuck
+    behind a background backfill.
+    """
+    def __init__(self, max_retries=5, backoff=1.0):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._cond = threading.Condition()
+        self._app_buckets = {}      # region -> [RateBucket]
+        self._method_buckets = {}   # (region, method) -> [RateBucket]
+        self._blocked_until = {}    # region or (region, method) -> time.monotonic()
+        self._waiting = {}          # region -> heap of (priority, ticket)
+        self._async_waiters = {}    # (priority, ticket) -> (event loop, asyncio.Event) of get_async waiters
+        self._tickets = itertools.count()
+
+    def _buckets_for(self, region, method):
+        if region not in self._app_buckets:
+            self._app_buckets[region] = [RateBucket(c, w) for c, w in DEFAULT_APP_LIMITS]
+        return self._app_buckets[region] + self._method_buckets.get((region, method), [])
+
+    def reserve(self, region, method):
+        """
+        Takes a token if one is free right now, without waiting.
+        :param region: routing region (americas, europe, asia, ...)
+        :param method: name of the endpoint (ex. match-v5.match)
+        :return: 0 if the request may go, otherwise seconds to wait before asking again
+        """
+        with self._cond:
+            return self._reserve_locked(region, method)
+
+    def _reserve_locked(self, region, method):
+        now = time.monotonic()
+        wait = max(self._blocked_until.get(region, 0), self._blocked_until.get((region, method), 0)) - now
+        buckets = self._buckets_for(region, method)
+        for bucket in buckets:
+            wait = max(wait, bucket.wait_time(now))
+        if wait > 0:
+            return wait
+
+        for bucket in buckets:
+            bucket.take(now)
+        return 0.0
+
+    def _notify(self):
+        """
+        Wakes the waiters after anything that can let a request go. Callers must
+        hold _cond. Threads wake on the condition, an async waiter only has to
+        wake when it is at the front of its region's queue.
+        """
+        self._cond.notify_all()
+        for queue in self._waiting.values():
+            waiter = self._async_waiters.get(queue[0]) if queue else None
+            if waiter is not None:
+                loop, event = waiter
+                try:
+                    loop.call_soon_threadsafe(event.set)
+                except RuntimeError:
+                    pass  # its loop is closed, nothing to wake
+
+    def acquire(self, region, method, priority=PRIORITY_NORMAL):
+        """
+        Blocks until the request is allowed to go. Lower priority numbers go first.
+        :param region: routing region
+        :param method: name of the endpoint
+        :param priority: PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+        """
+        ticket = (priority, next(self._tickets))
+        with self._cond:
+            queue = self._waiting.setdefault(region, [])
+            heapq.heappush(queue, ticket)
+            try:
+                while True:
+                    wait = None
+                    if queue[0] == ticket:
+                        wait = self._reserve_locked(region, method)
+                        if wait <= 0:
+                            return
+                    self._cond.wait(timeout=wait)
+            finally:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+                self._notify()
+
+    async def acquire_async(self, region, method, priority=PRIORITY_NORMAL):
+        """
+        Async version of acquire(). Waits in the same priority queue as the
+        threads, so a PRIORITY_LOW download on an event loop still lets a
+        PRIORITY_HIGH lookup from the UI thread go first.
+        :param region: routing region
+        :param method: name of the endpoint
+        :param priority: PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+        """
+        ticket = (priority, next(self._tickets))
+        event = asyncio.Event()
+        with self._cond:
+            queue = self._waiting.setdefault(region, [])
+            heapq.heappush(queue, ticket)
+            self._async_waiters[ticket] = (asyncio.get_running_loop(), event)
+        try:
+            while True:
+                with self._cond:
+                    wait = None
+                    if queue[0] == ticket:
+                        wait = self._reserve_locked(region, method)
+                        if wait <= 0:
+                            return
+                    event.clear()
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._cond:
+                del self._async_waiters[ticket]
+                queue.remove(ticket)
+                heapq.heapify(queue)
+                self._notify()
+
+    def update_from_headers(self, region, method, headers):
+        """
+        Learns the real limits and current counts from a Riot response.
+        :param region: routing region
+        :param method: name of the endpoint
+        :param headers: the response headers
+        """
+        now = time.monotonic()
+        with self._cond:
+            for key, limit_header, count_header in (
+                    (region, 'X-App-Rate-Limit', 'X-App-Rate-Limit-Count'),
+                    ((region, method), 'X-Method-Rate-Limit', 'X-Method-Rate-Limit-Count')):
+                limits = parse_rate_limit(headers.get(limit_header))
+                if not limits:
+                    continue
+
+                store = self._app_buckets if key == region else self._method_buckets
+                current = store.get(key, [])
+                if [(b.limit, b.window) for b in current] != limits:
+                    # Keep what was already spent in a window we keep, or the first response would hand it back
+                    spent = dict((b.window, b.spent) for b in current)
+                    current = [RateBucket(c, w) for c, w in limits]
+                    for bucket in current:
+                        bucket.spent = spent.get(bucket.window, bucket.spent)
+                    store[key] = current
+
+                counts = dict((w, c) for c, w in parse_rate_limit(headers.get(count_header)))
+                for bucket in current:
+                    if bucket.window in counts:
+                        bucket.sync(counts[bucket.window], now)
+            self._notify()
+
+    def retry_delay(self, region, method, status, headers, attempt):
+        """
+        Works out how long to wait before retrying a 429 or 5xx.
+        A 429 with Retry-After blocks the whole scope (app or method) so the
+        other threads stop sending too.
+        :param status: the failed response's status code
+        :param headers: the failed response's headers
+        :param attempt: how many retries we have done already
+        :return: seconds to wait
+        """
+        retry_after = headers.get('Retry-After')
+        if status == 429 and retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                delay = self.backoff
+            limit_type = headers.get('X-Rate-Limit-Type', 'application')
+            scope = (region, method) if limit_type == 'method' else region
+            with self._cond:
+                self._blocked_until[scope] = max(self._blocked_until.get(scope, 0), time.monotonic() + delay)
+                self._notify()
+            return delay
+
+        # 429 from the underlying service or a 5xx, exponential backoff with jitter
+        return self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+
+    def get(self, url, region, method, params=None, headers=None, priority=PRIORITY_NORMAL, timeout=DEFAULT_TIMEOUT):
+        """
+        Sends a GET once the limits allow it, retrying 429/5xx and connection errors.
+        :param url: full url of the request
+        :param region: routing region
+        :param method: name of the endpoint
+        :return: the last response (may still be an error after max_retries)
+        """
+        attempt = 0
+        while True:
+            with Metrics.span('rate_limit_wait', method=method):
+                self.acquire(region, method, priority)
+            start = time.perf_counter()
+            try:
+                response = http_get(url, params=params, headers=headers, timeout=timeout)
+            except requests.RequestException:
+                record_response(method, 'error', time.perf_counter() - start)
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt))
+                attempt += 1
+                continue
+
+            record_response(method, response.status_code, time.perf_counter() - start)
+            self.update_from_headers(region, method, response.headers)
+
+            if response.status_code == 429 or response.status_code >= 500:
+                # Even the last attempt blocks the scope, the other requests have to respect Retry-After too
+                delay = self.retry_delay(region, method, response.status_code, response.headers, attempt)
+                if attempt >= self.max_retries:
+                    return response
+                if response.status_code != 429 or 'Retry-After' not in response.headers:
+                    time.sleep(delay)  # a Retry-After block is waited out in acquire()
+                attempt += 1
+                continue
+
+            return response
+
+    async def get_async(self, session, url, region, method, params=None, headers=None, priority=PRIORITY_NORMAL):
+        """
+        Async version of get() for an aiohttp session. Same buckets, headers and
+        retry rules and priority queue, but waits on the event loop so one
+        loop can keep hundreds of requests in flight.
+        :param session: the aiohttp.ClientSession
+        :param url: full url of the request
+        :param region: routing region
+        :param method: name of the endpoint
+        :param priority: PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+        :return: (status code, decoded json or None)
+        """
+        attempt = 0
+        while True:
+            with Metrics.span('rate_limit_wait', method=method):
+                await self.acquire_async(region, method, priority)
+
+            start = time.perf_counter()
+            try:
+                async with session.get(url, params=params, headers=headers) as response:
+                    self.update_from_headers(region, method, response.headers)
+                    status = response.status
+                    data = await response.json(content_type=None) if status < 400 else None
+                    response_headers = response.headers
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                record_response(method, 'error', time.perf_counter() - start)
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self.backoff * (2 ** attempt))
+                attempt += 1
+                continue
+            record_response(method, status, time.perf_counter() - start)
+
+            if status == 429 or status >= 500:
+                delay = self.retry_delay(region, method, status, response_headers, attempt)
+                if attempt >= self.max_retries:
+                    return status, data
+                if status != 429 or 'Retry-After' not in response_headers:
+                    await asyncio.sleep(delay)  # a Retry-After block is waited out in acquire_async()
+                attempt += 1
+                continue
+
+            return status, data
+
+
+scheduler = RiotScheduler()
+
+
+def riot_url(path, region='americas'):
+    """
+    Builds the full url for a Riot API path.
+    :param path: the path after the host (ex. lol/match/v5/matches/NA1_1)
+    :param region: routing region
+    :return: the url
+    """
+    return RIOT_HOST.format(region=region).rstrip('/') + '/' + path.lstrip('/')
+
+
+def riot_get(path, method, region='americas', params=None, key=None, priority=PRIORITY_NORMAL, timeout=DEFAULT_TIMEOUT):
+    """
+    Sends a Riot API request through the shared scheduler.
+    :param path: the path after the host
+    :param method: name of the endpoint, each one has its own method limit
+    :param region: routing region
+    :param params: query parameters
+    :param key: the API key, defaults to riot_api_key from the environment
+    :param priority: PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+    :return: the response
+    """
+    headers = {'X-Riot-Token': key or api_key or ''}
+    return scheduler.get(riot_url(path, region), region, method, params=params, headers=headers,
+                         priority=priority, timeout=timeout)
+
+
+async def riot_get_async(session, path, method, region='americas', params=None, key=None, priority=PRIORITY_NORMAL):
+    """
+    Sends a Riot API request on an aiohttp session through the shared scheduler.
+    :param session: the aiohttp.ClientSession
+    :param path: the path after the host
+    :param method: name of the endpoint
+    :param region: routing region
+    :param params: query parameters
+    :param key: the API key, defaults to riot_api_key from the environment
+    :param priority: PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+    :return: (status code, decoded json or None)
+    """
+    headers = {'X-Riot-Token': key or api_key or ''}
+    return await scheduler.get_async(session, riot_url(path, region), region, method, params=params, headers=headers,
+                                     priority=priority)
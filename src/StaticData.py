@@ -0,0 +1,217 @@
+"""
+    CommunityDragon static data (items, champions and perks) for the trackers.
+    The raw json is kept on disk and revalidated with If-None-Match /
+    If-Modified-Since, so a launch where nothing changed downloads nothing big.
+    It is turned into one lookup index per CommunityDragon version:
+    item id -> icon url / name / cost, champion id -> name / icon and
+    perk id -> name / icon. Match cards, item names and champion names all read
+    from the same index, which is safe to share between the preload thread and
+    the fetch thread.
+
+"""
+import json
+import os
+import threading
+
+import Metrics
+from HttpClient import http_get
+from MatchStore import DATA_DIR
+
+CDRAGON_HOST = os.environ.get('cdragon_host', 'https://raw.communitydragon.org')
+CDRAGON_ROOT = f'{CDRAGON_HOST}/latest'
+GAME_DATA = f'{CDRAGON_ROOT}/plugins/rcp-be-lol-game-data/global/default'
+VERSION_URL = f'{CDRAGON_ROOT}/content-metadata.json'
+ITEMS_URL = f'{GAME_DATA}/v1/items.json'
+CHAMPIONS_URL = f'{GAME_DATA}/v1/champion-summary.json'
+PERKS_URL = f'{GAME_DATA}/v1/perks.json'
+
+STATIC_DIR = os.path.join(DATA_DIR, 'static')
+
+_index = None
+_documents = {}  # name -> json, what the current index was built from
+_lock = threading.Lock()  # the preload thread and the fetch thread both build the index
+
+
+class StaticIndex:
+    """
+    Lookups built from one version of the static data.
+    items: item id -> {'name', 'icon', 'cost'}
+    champions: champion id -> {'name', 'icon'}
+    perks: perk id -> {'name', 'icon'}
+    """
+    def __init__(self, version=None, items=None, champions=None, perks=None):
+        self.version = version
+        self.items = items or {}
+        self.champions = champions or {}
+        self.perks = perks or {}
+
+    def item_icon(self, item_id):
+        item = self.items.get(item_id)
+        return item['icon'] if item else None
+
+    def item_name(self, item_id, default="Unknown Item"):
+        item = self.items.get(item_id)
+        return item['name'] if item else default
+
+    def champion_name(self, champion_id, default=None):
+        champion = self.champions.get(champion_id)
+        return champion['name'] if champion else default
+
+    def perk_name(self, perk_id, default=None):
+        perk = self.perks.get(perk_id)
+        return perk['name'] if perk else default
+
+
+def asset_url(path):
+    """
+    Turns a game data path into its CommunityDragon url.
+    The json paths look like "/lol-game-data/assets/ASSETS/Items/Icons2D/1001_healthpotion.png",
+    CommunityDragon urls are case-sensitive and all lowercase.
+    :param path: the path from the json
+    :return: the url, or None for an empty path
+    """
+    if not path:
+        return None
+    path = path.replace("/lol-game-data/assets/", "").lstrip('/').lower()
+    return f"{GAME_DATA}/{path}"
+
+
+def build_index(version, items_json, champions_json, perks_json=()):
+    """
+    Builds the lookups from the raw json.
+    :param version: the CommunityDragon version the json came from
+    :param items_json: items.json
+    :param champions_json: champion-summary.json
+    :param perks_json: perks.json
+    :return: the StaticIndex
+    """
+    items = {}
+    for item in items_json:
+        try:
+            items[int(item["id"])] = {
+                'name': item.get("name") or "Unknown Item",
+                'icon': asset_url(item.get("iconPath")),
+                'cost': item.get("priceTotal", 0),
+            }
+        except (ValueError, KeyError, TypeError):
+            continue
+
+    champions = {}
+    for champion in champions_json:
+        try:
+            champions[int(champion["id"])] = {
+                'name': champion["name"],
+                'icon': asset_url(champion.get("squarePortraitPath")),
+            }
+        except (ValueError, KeyError, TypeError):
+            continue
+
+    perks = {}
+    for perk in perks_json:
+        try:
+            perks[int(perk["id"])] = {
+                'name': perk["name"],
+                'icon': asset_url(perk.get("iconPath")),
+            }
+        except (ValueError, KeyError, TypeError):
+            continue
+
+    return StaticIndex(version, items, champions, perks)
+
+
+def _read_cached(name):
+    path = os.path.join(STATIC_DIR, f'{name}.json')
+    meta_path = os.path.join(STATIC_DIR, f'{name}.meta.json')
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        return data, meta
+    except (OSError, ValueError):
+        return None, {}
+
+
+def _write_cached(name, data, meta):
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    for path, content in ((os.path.join(STATIC_DIR, f'{name}.json'), data),
+                          (os.path.join(STATIC_DIR, f'{name}.meta.json'), meta)):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(content, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+
+def fetch_static_json(name, url):
+    """
+    Gets a CommunityDragon json file through the disk cache. The cached copy is
+    revalidated with its ETag / Last-Modified, a 304 costs no download. If
+    CommunityDragon can't be reached the cached copy is used as it is.
+    :param name: the cache file name (ex. items)
+    :param url: the url of the json
+    :return: (json or None, True if it changed since the cached copy)
+    """
+    cached, meta = _read_cached(name)
+
+    headers = {}
+    if cached is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    try:
+        with Metrics.span('static_download', file=name):
+            response = http_get(url, headers=headers)
+    except Exception as e:
+        print(f"Error fetching {name}: {e}")
+        Metrics.incr('errors_total', stage='static_data')
+        return cached, False
+
+    if response.status_code == 304 and cached is not None:
+        Metrics.incr('cache_hits_total', cache='static_data')
+        return cached, False
+    if response.status_code != 200:
+        print(f"CommunityDragon error {response.status_code} for {name}")
+        Metrics.incr('errors_total', stage='static_data')
+        return cached, False
+    Metrics.incr('cache_misses_total', cache='static_data')
+
+    data = response.json()
+    _write_cached(name, data, {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    })
+    return data, True
+
+
+def get_static_index(refresh=False):
+    """
+    Gets the static data index. The first call of a session revalidates the
+    cached json against CommunityDragon and builds the index, later calls
+    return it straight from memory.
+    :param refresh: revalidate again and rebuild if anything changed
+    :return: the StaticIndex (empty if there is no data at all yet, we try again next call)
+    """
+    global _index
+
+    with _lock:
+        if _index is not None and not refresh:
+            return _index
+
+        changed = False
+        for name, url in (('content-metadata', VERSION_URL), ('items', ITEMS_URL),
+                          ('champions', CHAMPIONS_URL), ('perks', PERKS_URL)):
+            data, was_changed = fetch_static_json(name, url)
+            if data is not None:
+                changed = changed or was_changed or name not in _documents
+                _documents[name] = data
+
+        if 'items' not in _documents or 'champions' not in _documents:
+            return _index or StaticIndex()
+
+        if _index is None or changed:
+            version = _documents.get('content-metadata', {}).get('version')
+            _index = build_index(version, _documents['items'], _documents['champions'],
+                                 _documents.get('perks', []))
+        return _index
@@ -1,26 +1,35 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
-from io import BytesIO
-import requests
 from dotenv import load_dotenv
-from scipy.stats import alpha
-
-from LeagueTracker import get_player_stats, get_puuid, get_images
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+from concurrent.futures import ThreadPoolExecutor
 import threading
+import queue
 import sys
 import os
+
+import Metrics
+
+# pandas, matplotlib, PIL and the HTTP stack are imported where they are first used
+# (and warmed up by preload_data once the window is up), not here. Importing them
+# up front costs seconds on every cold start before the window shows.
 load_dotenv()
 api_key = os.environ.get('riot_api_key')
 
 # -------------------------------
 # Image cache to avoid reloading
 # -------------------------------
-image_cache = {}
-player_cache = {}
+IMAGE_CACHE_SIZE = 256  # decoded icons kept in memory, the rest stay on disk
+image_cache = None  # LRUCache, see get_image_cache
+placeholder_cache = {}
+
+ICON_SIZE = (40, 40)
+ICON_GAP = 6  # pixels between item icons on a card
+ITEM_STRIP_RENDERING = True  # one composited image per card instead of a label per item
+ICON_POLL_MS = 30  # how often the Tk thread picks up downloaded icons
+ICON_WORKERS = 20  # HttpClient.MAX_WORKERS, not imported here to keep startup light
+icon_executor = ThreadPoolExecutor(max_workers=ICON_WORKERS, thread_name_prefix="icons")
+icon_queue = queue.Queue()  # (cache_key, PIL image or None) from the workers
+icon_waiting = {}  # cache_key -> labels showing a placeholder until the icon arrives
 
 
 # Function to get the correct path for bundled files
@@ -47,7 +56,9 @@ class ToolTip:
         x, y, _, _ = self.widget.bbox("insert")
         x += self.widget.winfo_rootx() + 25
         y += self.widget.winfo_rooty() + 25
+        self.show_at(x, y)
 
+    def show_at(self, x, y):
         self.tooltip = tk.Toplevel(self.widget)
         self.tooltip.wm_overrideredirect(True)
         self.tooltip.wm_geometry(f"+{x}+{y}")
@@ -71,33 +82,54 @@ class ToolTip:
             self.tooltip = None
 
 
-# -------------------------------
-# Load image from URL safely
-# -------------------------------
-def load_image_from_url(url, size=(40, 40)):
+class ItemStripToolTip(ToolTip):
     """
-    Loads an image from a URL safely. Returns a placeholder if the URL fails or is invalid.
+    Tooltip for a composited item strip, shows the name of the item under the
+    mouse by working out which icon slot the pointer is in.
     """
-    # Check cache first
-    cache_key = f"{url}_{size[0]}x{size[1]}"
-    if cache_key in image_cache:
-        return image_cache[cache_key]
-
-    try:
-        response = requests.get(url, timeout=5)
-        if response.status_code != 200:
-            return placeholder_image(size)
+    def __init__(self, widget, texts, strip_width, size=(40, 40), gap=6):
+        super().__init__(widget, "")
+        self.texts = texts
+        self.strip_width = strip_width
+        self.icon_width = size[0]
+        self.slot_width = size[0] + gap
+        self.current = None
+        self.widget.bind("<Motion>", self.on_motion)
 
-        img = Image.open(BytesIO(response.content))
-        img = img.resize(size, Image.Resampling.LANCZOS)
-        photo = ImageTk.PhotoImage(img)
+    def show_tooltip(self, _):
+        pass  # shown from on_motion, once we know which item it is
 
-        # Cache the image
-        image_cache[cache_key] = photo
-        return photo
-    except Exception as e:
-        print(f"Failed to load image: {url} -> {e}")
-        return placeholder_image(size)
+    def hide_tooltip(self, event=None):
+        super().hide_tooltip(event)
+        self.current = None
+
+    def slot_at(self, x):
+        # The label centers the strip if it is wider than it
+        x -= (self.widget.winfo_width() - self.strip_width) // 2
+        slot, offset = divmod(x, self.slot_width)
+        if x < 0 or offset >= self.icon_width or slot >= len(self.texts):
+            return None  # between two icons or outside the strip
+        return slot
+
+    def on_motion(self, event):
+        slot = self.slot_at(event.x)
+        if slot == self.current:
+            return
+        self.hide_tooltip()
+        if slot is None:
+            return
+        self.current = slot
+        self.text = self.texts[slot]
+        self.show_at(event.x_root + 15, event.y_root + 15)
+
+
+def get_image_cache():
+    """The in-memory icon cache, created on first use so startup doesn't import the image stack"""
+    global image_cache
+    if image_cache is None:
+        from ImageCache import LRUCache
+        image_cache = LRUCache(IMAGE_CACHE_SIZE)
+    return image_cache
 
 
 # -------------------------------
@@ -105,35 +137,144 @@ def load_image_from_url(url, size=(40, 40)):
 # -------------------------------
 def placeholder_image(size=(40, 40)):
     cache_key = f"placeholder_{size[0]}x{size[1]}"
-    if cache_key in image_cache:
-        return image_cache[cache_key]
+    if cache_key in placeholder_cache:
+        return placeholder_cache[cache_key]
+
+    from PIL import Image, ImageTk
 
     img = Image.new("RGBA", size, (60, 60, 60, 255))
     photo = ImageTk.PhotoImage(img)
-    image_cache[cache_key] = photo
+    placeholder_cache[cache_key] = photo
     return photo
 
 
 # -------------------------------
-# Get item name from ID
+# Background icon prefetch
 # -------------------------------
-_item_name_cache = None
+def icon_key(url, size=ICON_SIZE):
+    return f"{url}_{size[0]}x{size[1]}"
+
 
+def _load_icon(cache_key, loader, *args):
+    """Runs in the icon pool: download / disk read and decode, no Tk calls here"""
+    try:
+        img = loader(*args)
+    except Exception as e:
+        print(f"Failed to load image: {cache_key} -> {e}")
+        img = None
+    icon_queue.put((cache_key, img))
 
-def get_item_name(item_id):
-    """Returns the item name for a given item ID"""
-    global _item_name_cache
 
-    if _item_name_cache is None:
-        items_url = "https://raw.communitydragon.org/latest/plugins/rcp-be-lol-game-data/global/default/v1/items.json"
-        try:
-            items_data = requests.get(items_url, timeout=10).json()
-            _item_name_cache = {int(item["id"]): item.get("name", "Unknown Item") for item in items_data}
-        except Exception as e:
-            print(f"Error fetching item names: {e}")
-            _item_name_cache = {}
+def prefetch_icons(urls, size=ICON_SIZE):
+    """
+    Starts downloading icons in the background. Icons already in memory or
+    already on their way are skipped.
+    :param urls: the icon urls, duplicates are fine
+    :param size: (width, height)
+    """
+    from ImageCache import load_image
+
+    for url in dict.fromkeys(urls):
+        if not url:
+            continue
+        cache_key = icon_key(url, size)
+        if cache_key in get_image_cache() or cache_key in icon_waiting:
+            continue
+        icon_waiting[cache_key] = []
+        icon_executor.submit(_load_icon, cache_key, load_image, url, size)
+
+
+def prefetch_icon_files(urls, size=ICON_SIZE):
+    """
+    Downloads and resizes icons into the disk cache in the background, without
+    decoding them for Tk. The item strips are composed from these files.
+    :param urls: the icon urls, duplicates are fine
+    :param size: (width, height)
+    """
+    from ImageCache import get_resized_image
+
+    for url in dict.fromkeys(urls):
+        if url:
+            icon_executor.submit(get_resized_image, url, size)  # a failed one is tried again by its strip
+
+
+def set_icon(label, url, size=ICON_SIZE):
+    """
+    Shows an icon on a label. If it isn't loaded yet the label gets the
+    placeholder and is swapped to the real icon once the pool has it.
+    """
+    cache_key = icon_key(url, size)
+    label.icon_key = cache_key  # a recycled label only takes the icon it shows now
+    photo = get_image_cache().get(cache_key)
+    Metrics.incr('cache_misses_total' if photo is None else 'cache_hits_total', cache='icon_memory')
+    if photo is None:
+        prefetch_icons([url], size)
+        icon_waiting[cache_key].append(label)
+        photo = placeholder_image(size)
+    label.configure(image=photo)
+    label.image = photo  # Keep a reference to prevent garbage collection
+
+
+def set_item_strip(label, urls, size=ICON_SIZE, gap=ICON_GAP):
+    """
+    Shows a row of icons as one composited image on a label, built in the
+    icon pool. Same placeholder swap as set_icon.
+    :return: the strip width in pixels
+    """
+    width = len(urls) * (size[0] + gap) - gap
+    from ImageCache import load_item_strip
+
+    cache_key = "strip:" + icon_key("|".join(urls), size)
+    label.icon_key = cache_key
+    photo = get_image_cache().get(cache_key)
+    Metrics.incr('cache_misses_total' if photo is None else 'cache_hits_total', cache='icon_memory')
+    if photo is None:
+        if cache_key not in icon_waiting:
+            icon_waiting[cache_key] = []
+            icon_executor.submit(_load_icon, cache_key, load_item_strip, urls, size, gap)
+        icon_waiting[cache_key].append(label)
+        photo = placeholder_image((width, size[1]))
+    label.configure(image=photo)
+    label.image = photo
+    return width
+
+
+def drain_icon_queue():
+    """Turns finished downloads into PhotoImages on the Tk thread and swaps the placeholders"""
+    if icon_queue.empty():
+        root.after(ICON_POLL_MS, drain_icon_queue)
+        return
 
-    return _item_name_cache.get(int(item_id), "Unknown Item")
+    from PIL import ImageTk
+    try:
+        while True:
+            cache_key, img = icon_queue.get_nowait()
+            labels = icon_waiting.pop(cache_key, [])
+            if img is None:
+                continue  # the placeholder stays
+
+            photo = ImageTk.PhotoImage(img)
+            get_image_cache().put(cache_key, photo)
+            for label in labels:
+                if label.winfo_exists() and getattr(label, "icon_key", None) == cache_key:
+                    label.configure(image=photo)
+                    label.image = photo
+    except queue.Empty:
+        pass
+    root.after(ICON_POLL_MS, drain_icon_queue)
+
+
+def get_item_icon_urls(df):
+    """Every item icon url used in the dataframe, for prefetching"""
+    item_columns = [f"item{j}" for j in range(7) if f"item{j}" in df]
+    if df.empty or not item_columns:
+        return []
+    from StaticData import get_static_index
+
+    index = get_static_index()
+    item_ids = set(df[item_columns].to_numpy().ravel().tolist())
+    item_ids.discard(0)
+    return [index.item_icon(int(item_id)) for item_id in item_ids]
 
 
 # -------------------------------
@@ -144,15 +285,13 @@ def preload_data():
 
     def load():
         try:
-            # This will populate the caches
-            get_item_name(1001)  # Load item cache
-            from LeagueTracker import _item_data_cache, _character_data_cache
+            # The window is already up, import the analysis and plotting stacks meanwhile
+            import LeagueTracker  # noqa: F401
+            import Graphs  # noqa: F401
+            from StaticData import get_static_index
 
-            # Preload character data by making a dummy call
-            import pandas as pd
-            from LeagueTracker import make_it_pretty
-            dummy_df = pd.DataFrame({'champion': [1]})
-            make_it_pretty(dummy_df)
+            # Builds the item and champion lookups so the first fetch doesn't wait on them
+            get_static_index()
 
             print("Data preloaded successfully!")
         except Exception as e:
@@ -163,402 +302,178 @@ def preload_data():
 
 
 # -------------------------------
-# Create K/D Graph
+# Metric Graphs
 # -------------------------------
-def create_kd_graph(df, parent_frame):
-    """Creates a K/D ratio graph for all matches"""
-    # Clear any existing graph
-    for widget in parent_frame.winfo_children():
-        widget.destroy()
-
-    # Calculate K/D ratio for each match (handle division by zero)
-    kd_ratios = []
-    win_status = []
-    for _, row in df.iterrows():
-        deaths = row['deaths'] if row['deaths'] > 0 else 1  # Avoid division by zero
-        kd = row['kills'] / deaths
-        kd_ratios.append(kd)
-        win_status.append(row['win'])
-    win_status.reverse()
-    kd_ratios.reverse()
-
-    # Create figure with dark theme
-    fig = Figure(figsize=(5, 6), facecolor='#1c1c1c')
-    ax = fig.add_subplot(111)
-    ax.set_facecolor('#2b2b2b')
-
-    scatter_points = []
-
-    # Plot the K/D ratios
-    game_numbers = list(range(1, len(kd_ratios) + 1))
-    for i, (game_num, kd, win) in enumerate(zip(game_numbers, kd_ratios, win_status)):
-        color = '#6fff6f' if win else '#ff6f6f'
-
-        # Plot the point
-        scatter = ax.scatter(game_num, kd, s=100, c=color,
-                             edgecolors='#ffffff', linewidths=1.5, zorder=5)
-        scatter_points.append((game_num, kd, win))
-
-        # Draw line to next point if not the last point
-        if i < len(game_numbers) - 1:
-            next_color = '#6fff6f' if win_status[i + 1] else '#ff6f6f'
-            # Use gradient-like color (average of current and next)
-            ax.plot([game_num, game_numbers[i + 1]], [kd, kd_ratios[i + 1]],
-                    color=color, linewidth=2, alpha=0.6)
-    # Add a horizontal line at K/D = 1.0
-    ax.axhline(y=1.0, color='#ff6f6f', linestyle='--', linewidth=1, alpha=0.5)
-
-    highlight = ax.scatter([], [], s=200, c='yellow', alpha=0.5, zorder=10)
-
-    annot = ax.annotate("", xy=(0,0), xytext=(10,10),
-                        textcoords="offset points",
-                        bbox=dict(boxstyle="round,pad=0.5", fc="#3c3c3c", ec="#ffffff", alpha=0.9),
-                        color='#ffffff', fontsize=9, zorder=11)
-    annot.set_visible(False)
-    # Styling
-    ax.set_xlabel('Game Number\n(Oldest → Most Recent)', color='#f8f8f8', fontsize=9)
-    ax.set_ylabel('K/D Ratio', color='#f8f8f8', fontsize=10)
-    ax.set_title('K/D Performance', color='#f8f8f8', fontsize=11, fontweight='bold')
-    ax.tick_params(colors='#d0d0d0', labelsize=8)
-    ax.grid(True, alpha=0.2, color='#ffffff')
-    ax.set_xticks(game_numbers)
-
-    # Style the spines
-    for spine in ax.spines.values():
-        spine.set_edgecolor('#3c3c3c')
-
-    fig.tight_layout()
-
-    def on_hover(event):
-        if event.inaxes == ax:
-            # Find closest point
-            closest_dist = float('inf')
-            closest_point = None
-
-            for game_num, kd, win in scatter_points:
-                # Convert data coordinates to display coordinates
-                point_x, point_y = ax.transData.transform((game_num, kd))
-                mouse_x, mouse_y = event.x, event.y
-
-                dist = ((point_x - mouse_x) ** 2 + (point_y - mouse_y) ** 2) ** 0.5
-
-                if dist < 20 and dist < closest_dist:  # 20 pixel threshold
-                    closest_dist = dist
-                    closest_point = (game_num, kd, win)
-
-            if closest_point:
-                game_num, kd, win = closest_point
-                highlight.set_offsets([[game_num, kd]])
-                highlight.set_visible(True)
-
-                result = "Win" if win else "Loss"
-                annot.xy = (game_num, kd)
-                annot.set_text(f"Game {game_num}\nK/D: {kd:.2f}\n{result}")
-
-                if game_num > len(scatter_points) * 0.7:
-                    annot.set_position((-40,10))
-                else:
-                    annot.set_position((10,10))
-
-                annot.set_visible(True)
-            else:
-                highlight.set_visible(False)
-                annot.set_visible(False)
-
-            fig.canvas.draw_idle()
-
-    # Embed in tkinter
-    canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-    canvas.mpl_connect('motion_notify_event', on_hover)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill="both", expand=True)
+def create_metric_graph(df, parent_frame, metric, series=None):
+    """
+    Creates a per-game line graph of any metric, points and segments colored by win / loss.
+    :param df: the dataframe of the user
+    :param parent_frame: the graph frame
+    :param metric: a key of Graphs.METRICS (kd, damage, cs, gold, vision, damage_taken), or a
+                   dict like its values ({'value': column or function, 'ylabel', 'title', 'label'})
+    :param series: (x, y, win) already computed by prepare_results, computed from df if None
+    """
+    from Graphs import METRICS, PointHover, metric_series, build_metric_figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
-# -------------------------------
-# Damage Graph
-# -------------------------------
-def create_damage_graph(df, parent_frame):
-    """Creates a damage dealt graph for all matches"""
     # Clear any existing graph
     for widget in parent_frame.winfo_children():
         widget.destroy()
 
-    # Get damage data
-    damage_data = []
-    win_status = []
-    for _, row in df.iterrows():
-        damage_data.append(row['total_damage_dealt'])
-        win_status.append(row['win'])
-
-    damage_data.reverse()
-    win_status.reverse()
-
-    # Create figure with dark theme
-    fig = Figure(figsize=(5, 6), facecolor='#1c1c1c')
-    ax = fig.add_subplot(111)
-    ax.set_facecolor('#2b2b2b')
-
-    scatter_points = []
-    # Plot the damage with colors based on win/loss
-    game_numbers = list(range(1, len(damage_data) + 1))
-
-    # Plot each point with appropriate color
-    for i, (game_num, damage, win) in enumerate(zip(game_numbers, damage_data, win_status)):
-        color = '#6fff6f' if win else '#ff6f6f'
-
-        # Plot the point
-        scatter = ax.plot(game_num, damage, marker='o', markersize=8,
-                color=color, markerfacecolor=color, markeredgecolor='#ffffff',
-                markeredgewidth=1.5)
-        scatter_points.append((game_num, damage, win))
-        # Draw line to next point if not the last point
-        if i < len(game_numbers) - 1:
-            ax.plot([game_num, game_numbers[i + 1]], [damage, damage_data[i + 1]],
-                    color=color, linewidth=2, alpha=0.6)
-
-    highlight = ax.scatter([], [], s=200, c='yellow', alpha=0.5, zorder=10)
-
-    annot = ax.annotate("", xy=(0, 0), xytext=(10, 10),
-                        textcoords="offset points",
-                        bbox=dict(boxstyle="round,pad=0.5", fc="#3c3c3c", ec="#ffffff", alpha=0.9),
-                        color='#ffffff', fontsize=9, zorder=11)
-    annot.set_visible(False)
-
-    # Styling
-    ax.set_xlabel('Game Number\n(Oldest → Most Recent)', color='#f8f8f8', fontsize=9)
-    ax.set_ylabel('Damage to Champions', color='#f8f8f8', fontsize=10)
-    ax.set_title('Damage Performance', color='#f8f8f8', fontsize=11, fontweight='bold')
-    ax.tick_params(colors='#d0d0d0', labelsize=8)
-    ax.grid(True, alpha=0.2, color='#ffffff')
-
-    # Set x-axis to show integer game numbers
-    ax.set_xticks(game_numbers)
-
-    # Style the spines
-    for spine in ax.spines.values():
-        spine.set_edgecolor('#3c3c3c')
-
-    fig.tight_layout()
-
-    def on_hover(event):
-        if event.inaxes == ax:
-            # Find closest point
-            closest_dist = float('inf')
-            closest_point = None
-
-            for game_num, kd, win in scatter_points:
-                # Convert data coordinates to display coordinates
-                point_x, point_y = ax.transData.transform((game_num, kd))
-                mouse_x, mouse_y = event.x, event.y
-
-                dist = ((point_x - mouse_x) ** 2 + (point_y - mouse_y) ** 2) ** 0.5
-
-                if dist < 20 and dist < closest_dist:  # 20 pixel threshold
-                    closest_dist = dist
-                    closest_point = (game_num, kd, win)
-
-            if closest_point:
-                game_num, kd, win = closest_point
-                highlight.set_offsets([[game_num, kd]])
-                highlight.set_visible(True)
-
-                result = "Win" if win else "Loss"
-                annot.xy = (game_num, kd)
-                annot.set_text(f"Game {game_num}\nDMG: {kd:.2f}\n{result}")
-
-                if game_num > len(scatter_points) * 0.7:
-                    annot.set_position((-40,10))
-                else:
-                    annot.set_position((10,10))
-
-                annot.set_visible(True)
-            else:
-                highlight.set_visible(False)
-                annot.set_visible(False)
+    spec = METRICS[metric] if isinstance(metric, str) else metric
+    x, y, win = series if series is not None else metric_series(df, spec['value'])
+    fig, ax = build_metric_figure(x, y, win, spec['ylabel'], spec['title'], spec.get('reference'))
+    hover = PointHover(fig, ax, x, y, win, spec.get('label', spec['ylabel']), spec.get('fmt', '.2f'))
 
-            fig.canvas.draw_idle()
     # Embed in tkinter
     canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-    canvas.mpl_connect('motion_notify_event', on_hover)
+    hover.connect(canvas)
     canvas.draw()
     canvas.get_tk_widget().pack(fill="both", expand=True)
 
 
-# -------------------------------
-# Create Creep Score Graph
-# -------------------------------
-def create_creep_graph(df, parent_frame):
-    for widget in parent_frame.winfo_children():
-        widget.destroy()
+def create_kd_graph(df, parent_frame, series=None):
+    """Creates a K/D ratio graph for all matches"""
+    create_metric_graph(df, parent_frame, 'kd', series)
 
-    # Get damage data
-    minion_data = []
-    win_status = []
-    for _, row in df.iterrows():
-        minion_data.append(row['minions'])
-        win_status.append(row['win'])
-    minion_data.reverse()
-    win_status.reverse()
-
-    fig = Figure(figsize=(5, 6), facecolor='#1c1c1c')
-    ax = fig.add_subplot(111)
-    ax.set_facecolor('#2b2b2b')
-    scatter_points = []
-    # Plot the CS with colors based on win/loss
-    game_numbers = list(range(1, len(minion_data) + 1))
-
-    # Plot each point with appropriate color
-    for i, (game_num, damage, win) in enumerate(zip(game_numbers, minion_data, win_status)):
-        color = '#6fff6f' if win else '#ff6f6f'
-
-        # Plot the point
-        scatter = ax.plot(game_num, damage, marker='o', markersize=8,
-                color=color, markerfacecolor=color, markeredgecolor='#ffffff',
-                markeredgewidth=1.5)
-        scatter_points.append((game_num, damage, win))
-        # Draw line to next point if not the last point
-        if i < len(game_numbers) - 1:
-            ax.plot([game_num, game_numbers[i + 1]], [damage, minion_data[i + 1]],
-                    color=color, linewidth=2, alpha=0.6)
-    highlight = ax.scatter([], [], s=200, c='yellow', alpha=0.5, zorder=10)
-
-    annot = ax.annotate("", xy=(0, 0), xytext=(10, 10),
-                        textcoords="offset points",
-                        bbox=dict(boxstyle="round,pad=0.5", fc="#3c3c3c", ec="#ffffff", alpha=0.9),
-                        color='#ffffff', fontsize=9, zorder=11)
-    annot.set_visible(False)
-    # Styling
-    ax.set_xlabel('Game Number\n(Oldest → Most Recent)', color='#f8f8f8', fontsize=9)
-    ax.set_ylabel('Creep Score', color='#f8f8f8', fontsize=10)
-    ax.set_title('CS per Game', color='#f8f8f8', fontsize=11, fontweight='bold')
-    ax.tick_params(colors='#d0d0d0', labelsize=8)
-    ax.grid(True, alpha=0.2, color='#ffffff')
-
-    # Set x-axis to show integer game numbers
-    ax.set_xticks(game_numbers)
-
-    # Style the spines
-    for spine in ax.spines.values():
-        spine.set_edgecolor('#3c3c3c')
-
-    fig.tight_layout()
-
-    def on_hover(event):
-        if event.inaxes == ax:
-            # Find closest point
-            closest_dist = float('inf')
-            closest_point = None
-
-            for game_num, kd, win in scatter_points:
-                # Convert data coordinates to display coordinates
-                point_x, point_y = ax.transData.transform((game_num, kd))
-                mouse_x, mouse_y = event.x, event.y
-
-                dist = ((point_x - mouse_x) ** 2 + (point_y - mouse_y) ** 2) ** 0.5
-
-                if dist < 20 and dist < closest_dist:  # 20 pixel threshold
-                    closest_dist = dist
-                    closest_point = (game_num, kd, win)
-
-            if closest_point:
-                game_num, kd, win = closest_point
-                highlight.set_offsets([[game_num, kd]])
-                highlight.set_visible(True)
-
-                result = "Win" if win else "Loss"
-                annot.xy = (game_num, kd)
-                annot.set_text(f"Game {game_num}\nCS: {kd:.2f}\n{result}")
-
-                if game_num > len(scatter_points) * 0.7:
-                    annot.set_position((-40, 10))
-                else:
-                    annot.set_position((10, 10))
-
-                annot.set_visible(True)
-            else:
-                highlight.set_visible(False)
-                annot.set_visible(False)
 
-            fig.canvas.draw_idle()
+def create_damage_graph(df, parent_frame, series=None):
+    """Creates a damage dealt graph for all matches"""
+    create_metric_graph(df, parent_frame, 'damage', series)
 
-    # Embed in tkinter
-    canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-    canvas.mpl_connect('motion_notify_event', on_hover)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill="both", expand=True)
+
+def create_creep_graph(df, parent_frame, series=None):
+    """Creates a creep score graph for all matches"""
+    create_metric_graph(df, parent_frame, 'cs', series)
 
 
 # -------------------------------
 # Most Common Bought Item
 # -------------------------------
 
-def common_item_graph(df, parent_frame):
+def common_item_graph(df, parent_frame, items=None):
     """
     Creating a horizontal bar graph for frequency of items bought
     :param df: the dataframe of the user
     :param parent_frame: the graph frame
+    :param items: (ids, names, counts) already computed by prepare_results, counted from df if None
     :return: The bar graph
     """
+    from Graphs import build_item_figure, item_frequencies
+    from StaticData import get_static_index
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
     for widget in parent_frame.winfo_children():
         widget.destroy()
-    items ={}
-    for _, row in df.iterrows():
-        for i in range(7):
-            try:
-                item_id = int(row[f'item{i}'])
-                if item_id != 0:
-                    if item_id in items:
-                        items[item_id] += 1
-                    else:
-                        items[item_id] = 1
-            except (KeyError, ValueError, TypeError):
-                continue
-    #Now we sort them by frequency
-    sorted_items = sorted(items.items(), key=lambda  x: x[1], reverse=True)[:15]
-    if not sorted_items:
+
+    if items is None:
+        items = item_frequencies(df, get_static_index())
+    _, item_names, frequencies = items
+    if not frequencies:
         # No items found
         label = ttk.Label(parent_frame, text="No items found", style="TLabel")
         label.pack(pady=20)
         return
 
-    item_ids = [item[0] for item in sorted_items]
-    frequencies = [item[1] for item in sorted_items]
-    item_names = [get_item_name(item_id) for item_id in item_ids]
+    fig, _ = build_item_figure(item_names, frequencies)
 
-    # Truncate long names
-    item_names = [name[:20] + '...' if len(name) > 20 else name for name in item_names]
+    # Embed in tkinter
+    canvas = FigureCanvasTkAgg(fig, master=parent_frame)
+    canvas.draw()
+    canvas.get_tk_widget().pack(fill="both", expand=True)
 
-    # Create figure with dark theme
-    fig = Figure(figsize=(5, 6), facecolor='#1c1c1c')
-    ax = fig.add_subplot(111)
-    ax.set_facecolor('#2b2b2b')
 
-    # Create bar chart
-    bars = ax.barh(range(len(item_names)), frequencies, color='#6fff6f', edgecolor='#ffffff', linewidth=1)
+# -------------------------------
+# Display Data (fetch thread)
+# -------------------------------
+GRAPH_METRICS = ('kd', 'damage', 'cs')  # the metric graphs with a tab
 
-    # Styling
-    ax.set_yticks(range(len(item_names)))
-    ax.set_yticklabels(item_names, color='#f8f8f8', fontsize=8)
-    ax.set_xlabel('Times Purchased', color='#f8f8f8', fontsize=10)
-    ax.set_title('Most Bought Items', color='#f8f8f8', fontsize=11, fontweight='bold')
-    ax.tick_params(colors='#d0d0d0', labelsize=8)
-    ax.grid(True, alpha=0.2, color='#ffffff', axis='x')
 
-    # Add value labels on bars
-    for i, (bar, freq) in enumerate(zip(bars, frequencies)):
-        ax.text(freq + 0.1, i, str(freq), va='center', color='#f8f8f8', fontsize=8)
+def prepare_results(df, name, tag):
+    """
+    Does all the dataframe work for display_results: graph series, item counts
+    with names, card rows with their icons. Runs in the fetch thread, so the Tk
+    thread only renders and never waits on the static data.
+    :param df: the dataframe from get_player_stats
+    :param name: summoner name
+    :param tag: tagline
+    :return: dict of render-ready data
+    """
+    from Graphs import summarize_matches
+    from StaticData import get_static_index
 
-    for spine in ax.spines.values():
-        spine.set_edgecolor('#3c3c3c')
+    index = get_static_index()
+    results = summarize_matches(df, index, GRAPH_METRICS)
 
-    # Invert y-axis so highest is on top
-    ax.invert_yaxis()
+    rows = df.to_dict("records")
+    for row in rows:
+        row["items"] = [(index.item_icon(item_id), index.item_name(item_id)) for item_id in get_item_ids(row)]
 
-    fig.tight_layout()
+    results.update({
+        'df': df,
+        'key': (name, tag, tuple(df["match_id"])),
+        'rows': rows,
+        'icon_urls': get_item_icon_urls(df),
+    })
+    return results
 
-    # Embed in tkinter
-    canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill="both", expand=True)
+
+def render_graph(results, tab, graph):
+    """Draws one graph tab from prepare_results output"""
+    with Metrics.span('render', part=f'graph_{graph}'):
+        if graph == 'items':
+            common_item_graph(results['df'], tab, results['items'])
+        else:
+            create_metric_graph(results['df'], tab, graph, results['series'][graph])
+
+
+# -------------------------------
+# Lazy Graph Tabs
+# -------------------------------
+graph_tabs = {}  # tab path -> graph name for render_graph, filled in with the tabs
+graph_results = None  # the prepare_results output the graphs are for
+graph_key = None  # (name, tag, match ids) of graph_results
+rendered_tabs = set()  # tab paths already drawn for graph_results
+
+
+def show_graphs(results):
+    """
+    Points the graph tabs at new results. Nothing is drawn here, only the
+    selected tab gets drawn now and the others on their first selection.
+    If the key is the same as what is on display, the drawn graphs are kept.
+    :param results: the prepare_results output
+    """
+    global graph_results, graph_key
+
+    graph_results = results
+    key = results['key']
+    if key != graph_key:
+        graph_key = key
+        rendered_tabs.clear()
+        # Show a temporary loading message in graphs
+        for tab_path in graph_tabs:
+            tab = root.nametowidget(tab_path)
+            for widget in tab.winfo_children():
+                widget.destroy()
+            ttk.Label(tab, text="Generating graph...", style="Header.TLabel").pack(pady=20)
+    render_selected_graph()
+
+
+def render_selected_graph(event=None):
+    """Draws the selected tab's graph if it isn't drawn yet (bound to <<NotebookTabChanged>>)"""
+    tab_path = notebook.select()
+    if graph_results is None or tab_path not in graph_tabs or tab_path in rendered_tabs:
+        return
+    rendered_tabs.add(tab_path)
+
+    results, key = graph_results, graph_key
+
+    def render():
+        if key == graph_key:  # a newer fetch may have replaced the data meanwhile
+            render_graph(results, root.nametowidget(tab_path), graph_tabs[tab_path])
+
+    # Short delay so the loading message shows first
+    root.after(50, render)
 
 
 # -------------------------------
@@ -577,34 +492,37 @@ def fetch_data():
     fetch_btn.config(state="disabled", text="Loading...")
     root.update_idletasks()  # Force UI update
 
+    @Metrics.timed('fetch')
     def fetch_thread():
         try:
-            # Check cache first
-            cache_key = f"{name}#{tag}_{matches}"
-            if cache_key in player_cache:
-                df = player_cache[cache_key]
-                print(f"Loaded from cache: {cache_key}")
-            else:
-                puuid = get_puuid(gameName=name, tagLine=tag, api_key=api_key)
-                if not puuid:
-                    root.after(0, lambda: messagebox.showerror("Error", "Player not found"))
-                    root.after(0, lambda: fetch_btn.config(state="normal", text="Fetch Stats"))
-                    return
-
-                df = get_player_stats(puuid, match_count=int(matches))
+            # Only loaded now (if preload_data hasn't already), the window doesn't need it
+            from LeagueTracker import get_player_stats
+            from RiotIds import resolve_puuid
+
+            # Known Riot IDs (searched before, or seen in a stored match) skip the account lookup
+            puuid = resolve_puuid(name, tag, key=api_key)
+            if not puuid:
+                root.after(0, lambda: messagebox.showerror("Error", "Player not found"))
+                root.after(0, lambda: fetch_btn.config(state="normal", text="Fetch Stats"))
+                return
 
-                # Cache the result
-                player_cache[cache_key] = df
+            # Only games newer than the last sync are downloaded, the rest comes from disk
+            df = get_player_stats(puuid, match_count=int(matches), incremental=True)
 
             if df.empty:
                 root.after(0, lambda: messagebox.showinfo("No Data", "No matches found."))
                 root.after(0, lambda: fetch_btn.config(state="normal", text="Fetch Stats"))
                 return
 
+            # All the dataframe work happens here, the main thread only draws
+            with Metrics.span('prepare_results'):
+                results = prepare_results(df, name, tag)
+
             # Update UI in main thread
-            root.after(0, lambda: display_results(df, name, tag))
+            root.after(0, lambda: display_results(results, name, tag))
 
         except Exception as e:
+            Metrics.incr('errors_total', stage='fetch')
             root.after(0, lambda: messagebox.showerror("Error", str(e)))
         finally:
             root.after(0, lambda: fetch_btn.config(state="normal", text="Fetch Stats"))
@@ -614,72 +532,36 @@ def fetch_data():
     thread.start()
 
 
-def display_results(df, name, tag):
-    """Display the fetched results"""
-    # Clear old results
-    for widget in results_frame.winfo_children():
-        widget.destroy()
-
-    ttk.Label(results_frame, text=f"Stats for {name}#{tag}", style="Header.TLabel").pack(pady=5)
-
-    # Show a temporary loading message in graphs
-    for tab in [kd_tab, damage_tab, cs_tab, item_tab]:
-        for widget in tab.winfo_children():
-            widget.destroy()
-        ttk.Label(tab, text="Generating graph...", style="Header.TLabel").pack(pady=20)
-
-    root.update_idletasks()
+def display_results(results, name, tag):
+    """Display the fetched results (prepare_results output)"""
+    results_header.config(text=f"Stats for {name}#{tag}")
 
-    # Create graphs one by one with UI updates in between
-    def create_graphs_sequentially():
-        create_kd_graph(df, kd_tab)
-        root.update_idletasks()
+    # Graphs are drawn when their tab is first shown, and kept if this is the same data again
+    show_graphs(results)
 
-        create_damage_graph(df, damage_tab)
-        root.update_idletasks()
+    # Start every icon download at once, the cards show placeholders until they arrive
+    if not ITEM_STRIP_RENDERING:
+        prefetch_icons(results['icon_urls'])
 
-        create_creep_graph(df, cs_tab)
-        root.update_idletasks()
+    # Only the cards in view are built, the list recycles them while scrolling
+    match_list.set_rows(results['rows'])
 
-        common_item_graph(df, item_tab)
-        root.update_idletasks()
-
-    # Run graph creation after a short delay to let UI update
-    root.after(100, create_graphs_sequentially)
-
-    # Display each match card
-    for _, row in df.iterrows():
-        create_match_card(row)
+    # Strips are composed per card in the pool from the disk cache. Fill it for the
+    # whole result after the visible cards' strips, so scrolling finds their icons on disk
+    if ITEM_STRIP_RENDERING:
+        prefetch_icon_files(results['icon_urls'])
 
 
 # -------------------------------
-# Create Match Card
+# Match Cards (virtualized list)
 # -------------------------------
-def create_match_card(row):
-    card = ttk.Frame(results_frame, style="Card.TFrame", padding=10)
-    card.pack(fill="x", pady=5)
-
-    # Header row
-    header = ttk.Frame(card, style="Card.TFrame")
-    header.pack(fill="x", pady=3)
-
-    ttk.Label(header, text=f"{row['role']} | {row['champion']}", style="Bold.TLabel").pack(side="left")
+CARD_HEIGHT = 110  # every card sits on a fixed row of this many pixels
+CARD_GAP = 10
+CARD_BUFFER = 3  # cards kept built above and below the viewport
 
-    kda = f"{row['kills']}/{row['deaths']}/{row['assists']}"
-    ttk.Label(header, text=f"K/D/A: {kda}", style="TLabel").pack(side="left", padx=10)
 
-    result_text = "✅ Win" if row["win"] else "❌ Loss"
-    ttk.Label(header, text=result_text, style="Win.TLabel" if row["win"] else "Loss.TLabel").pack(side="right")
-
-    # --- Items row ---
-    item_frame = ttk.Frame(card, style="Card.TFrame")
-    item_frame.pack(pady=5)
-
-    # Store images in a list attached to the frame to prevent garbage collection
-    if not hasattr(item_frame, 'item_images'):
-        item_frame.item_images = []
-
-    # Get all non-zero item IDs in order
+def get_item_ids(row):
+    """All non-zero item IDs of a match, in order"""
     item_ids = []
     for j in range(7):
         try:
@@ -688,124 +570,289 @@ def create_match_card(row):
                 item_ids.append(item_val)
         except (KeyError, ValueError, TypeError):
             continue
+    return item_ids
+
+
+class MatchCard:
+    """
+    A card widget that gets reused for whichever match scrolls into view.
+    The widgets are built once, show() only reconfigures them.
+    """
+    def __init__(self, parent):
+        self.frame = ttk.Frame(parent, style="Card.TFrame", padding=10)
+
+        # Header row
+        header = ttk.Frame(self.frame, style="Card.TFrame")
+        header.pack(fill="x", pady=3)
+        self.title = ttk.Label(header, style="Bold.TLabel")
+        self.title.pack(side="left")
+        self.kda = ttk.Label(header, style="TLabel")
+        self.kda.pack(side="left", padx=10)
+        self.result = ttk.Label(header)
+        self.result.pack(side="right")
+
+        # --- Items row ---
+        self.item_frame = ttk.Frame(self.frame, style="Card.TFrame")
+        self.item_frame.pack(pady=5)
+        self.message = ttk.Label(self.item_frame, style="TLabel")
+        if ITEM_STRIP_RENDERING:
+            self.strip = ttk.Label(self.item_frame)
+            self.strip_tooltip = ItemStripToolTip(self.strip, [], 0, ICON_SIZE, ICON_GAP)
+        else:
+            self.item_labels = [ttk.Label(self.item_frame) for _ in range(7)]
+            self.item_tooltips = [ToolTip(lbl, "") for lbl in self.item_labels]
+
+        self.window = parent.create_window(0, 0, window=self.frame, anchor="nw",
+                                           height=CARD_HEIGHT - CARD_GAP)
+
+    def show(self, row):
+        self.title.configure(text=f"{row['role']} | {row['champion']}")
+        self.kda.configure(text=f"K/D/A: {row['kills']}/{row['deaths']}/{row['assists']}")
+        if row["win"]:
+            self.result.configure(text="✅ Win", style="Win.TLabel")
+        else:
+            self.result.configure(text="❌ Loss", style="Loss.TLabel")
+
+        for widget in self.item_frame.winfo_children():
+            widget.pack_forget()
+
+        # (icon url, name) per item, looked up in prepare_results
+        items = row["items"]
+        if not items:
+            self.message.configure(text="No items built.")
+            self.message.pack(side="left", padx=5)
+            return
 
-    if not item_ids:
-        ttk.Label(item_frame, text="No items built.", style="TLabel").pack(side="left", padx=5)
-    else:
         try:
-            item_urls = get_images(row)
+            items = [(url, name) for url, name in items if url]
+            if not items:
+                return
 
-            # Now match URLs to item IDs
-            for i, url in enumerate(item_urls):
-                if not url:
-                    continue
+            if ITEM_STRIP_RENDERING:
+                # One label and one image for all the items, the tooltip hit-tests the slot
+                self.strip_tooltip.hide_tooltip()
+                width = set_item_strip(self.strip, [url for url, _ in items])
+                self.strip_tooltip.texts = [name for _, name in items]
+                self.strip_tooltip.strip_width = width
+                self.strip.pack(side="left", padx=3)
+            else:
+                for lbl, tooltip, (url, name) in zip(self.item_labels, self.item_tooltips, items):
+                    # Never blocks, the icon pool fills it in
+                    tooltip.hide_tooltip()
+                    set_icon(lbl, url)
+                    tooltip.text = name
+                    lbl.pack(side="left", padx=3)
+        except Exception as e:
+            print(f"Error getting item images: {e}")
+            self.message.configure(text="Items unavailable")
+            self.message.pack(side="left", padx=5)
 
-                # Get the corresponding item ID
-                item_id = item_ids[i] if i < len(item_ids) else None
 
-                img = load_image_from_url(url, size=(40, 40))
-                lbl = ttk.Label(item_frame, image=img)
-                lbl.pack(side="left", padx=3)
+class MatchList:
+    """
+    Scrollable list of match cards where only the rows in the viewport (plus
+    CARD_BUFFER on each side) have a card. Cards scrolled out of view go back
+    to a pool and are rebound to the rows scrolling in, so the number of
+    widgets doesn't depend on the number of matches.
+    """
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.rows = []
+        self.visible = {}  # row index -> card
+        self.pool = []  # cards not bound to a row
+
+    def set_rows(self, rows):
+        """
+        Shows a new list of matches from the top.
+        :param rows: list of row dicts, newest first
+        """
+        for card in self.visible.values():
+            self._release(card)
+        self.visible = {}
+        self.rows = rows
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), len(rows) * CARD_HEIGHT))
+        self.canvas.yview_moveto(0)
+        self.refresh()
+
+    def _release(self, card):
+        self.canvas.itemconfigure(card.window, state="hidden")
+        self.pool.append(card)
+
+    def refresh(self):
+        """Binds cards to the rows in view, called whenever the view moves"""
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(int(top // CARD_HEIGHT) - CARD_BUFFER, 0)
+        last = min(int(bottom // CARD_HEIGHT) + CARD_BUFFER + 1, len(self.rows))
+        wanted = range(first, last)
+
+        for i in [i for i in self.visible if i not in wanted]:
+            self._release(self.visible.pop(i))
+
+        width = self.canvas.winfo_width()
+        new_rows = [i for i in wanted if i not in self.visible]
+        if not new_rows:
+            return
+        with Metrics.span('render', part='cards'):
+            for i in new_rows:
+                card = self.pool.pop() if self.pool else MatchCard(self.canvas)
+                card.show(self.rows[i])
+                self.canvas.coords(card.window, 0, i * CARD_HEIGHT)
+                self.canvas.itemconfigure(card.window, state="normal", width=width)
+                self.visible[i] = card
+
+    def on_resize(self, event):
+        for card in self.visible.values():
+            self.canvas.itemconfigure(card.window, width=event.width)
+        self.canvas.configure(scrollregion=(0, 0, event.width, len(self.rows) * CARD_HEIGHT))
+        self.refresh()
 
-                # Add tooltip with item name
-                if item_id:
-                    item_name = get_item_name(item_id)
-                    ToolTip(lbl, item_name)
 
-                # Keep a reference to prevent garbage collection
-                item_frame.item_images.append(img)
-        except Exception as e:
-            print(f"Error getting item images: {e}")
-            ttk.Label(item_frame, text="Items unavailable", style="TLabel").pack(side="left", padx=5)
+# -------------------------------
+# Status Bar (metrics)
+# -------------------------------
+STATUS_POLL_MS = 1000
+
+
+def update_status_bar():
+    """Shows the fetch pipeline metrics (Metrics.summary) at the bottom of the window"""
+    status_bar.config(text=Metrics.summary())
+    root.after(STATUS_POLL_MS, update_status_bar)
+
+
+def dump_metrics(event=None):
+    """Writes metrics.json and metrics.prom next to the match store (double-click the status bar)"""
+    from MatchStore import DATA_DIR
+    try:
+        json_path, _ = Metrics.dump(DATA_DIR)
+    except OSError as e:
+        print(f"Failed to write metrics: {e}")
+        return
+    status_bar.config(text=f"Metrics written to {os.path.dirname(json_path)}")
 
 
 # -------------------------------
 # UI Setup
 # -------------------------------
-root = tk.Tk()
-root.title("Sabre Tracker")
-root.geometry("900x600")
-icon_image = tk.PhotoImage(file="src/icon.png")
-try:
-    icon_image = tk.PhotoImage(file=resource_path("src/icon.png"))
-    root.iconphoto(False, icon_image)
-except:
-    pass  # If icon fails, just continue without it
-style = ttk.Style()
-style.theme_use("clam")
-
-# Custom ttk styles
-style.configure("TFrame", background="#1c1c1c")
-style.configure("Card.TFrame", background="#2b2b2b", relief="groove")
-style.configure("Header.TLabel", background="#1c1c1c", foreground="#f8f8f8", font=("Segoe UI", 14, "bold"))
-style.configure("Bold.TLabel", background="#2b2b2b", foreground="#e0e0e0", font=("Segoe UI", 11, "bold"))
-style.configure("TLabel", background="#2b2b2b", foreground="#d0d0d0", font=("Segoe UI", 10))
-style.configure("Win.TLabel", background="#2b2b2b", foreground="#6fff6f", font=("Segoe UI", 10, "bold"))
-style.configure("Loss.TLabel", background="#2b2b2b", foreground="#ff6f6f", font=("Segoe UI", 10, "bold"))
-style.configure("TButton", padding=6, relief="flat", background="#3c3c3c", foreground="#ffffff")
-
-# Input area
-input_frame = ttk.Frame(root, padding=10)
-input_frame.pack(fill="x")
-
-ttk.Label(input_frame, text="Summoner Name:").pack(side="left")
-name_entry = ttk.Entry(input_frame, width=15)
-name_entry.pack(side="left", padx=5)
-
-ttk.Label(input_frame, text="Tagline:").pack(side="left")
-tag_entry = ttk.Entry(input_frame, width=10)
-tag_entry.pack(side="left", padx=5)
-
-ttk.Label(input_frame, text="Matches:").pack(side="left")
-match_entry = ttk.Entry(input_frame, width=5)
-match_entry.pack(side="left", padx=5)
-
-fetch_btn = ttk.Button(input_frame, text="Fetch Stats", command=fetch_data)
-fetch_btn.pack(side="left", padx=10)
-
-# Main content area - split between match cards (left) and graph (right)
-content_frame = ttk.Frame(root)
-content_frame.pack(fill="both", expand=True)
-
-# Scrollable Results (Left side)
-container = ttk.Frame(content_frame)
-canvas = tk.Canvas(container, bg="#1c1c1c", highlightthickness=0)
-scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
-results_frame = ttk.Frame(canvas)
-
-results_frame.bind(
-    "<Configure>",
-    lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-)
-
-canvas.create_window((0, 0), window=results_frame, anchor="nw")
-canvas.configure(yscrollcommand=scrollbar.set)
-
-container.pack(side="left", fill="both", expand=True)
-canvas.pack(side="left", fill="both", expand=True)
-scrollbar.pack(side="right", fill="y")
-
-# Graph frame with tabs (Right side)
-graph_container = ttk.Frame(content_frame, style="TFrame")
-graph_container.pack(side="right", fill="both", padx=10, pady=10)
-
-# Create notebook (tabs) for different graphs
-notebook = ttk.Notebook(graph_container)
-notebook.pack(fill="both", expand=True)
-
-# Create tabs
-kd_tab = ttk.Frame(notebook, style="TFrame")
-damage_tab = ttk.Frame(notebook, style="TFrame")
-cs_tab = ttk.Frame(notebook, style="TFrame")
-item_tab = ttk.Frame(notebook, style="TFrame")
-
-# Add tabs to notebook
-notebook.add(kd_tab, text="K/D")
-notebook.add(damage_tab, text="Damage")
-notebook.add(cs_tab, text="CS")
-notebook.add(item_tab, text="Items")
-
-# Preload data when app starts
-preload_data()
-
-root.mainloop()
\ No newline at end of file
+def build_ui():
+    """Builds the window. Only tkinter is needed up to here, so it shows right away."""
+    global root, name_entry, tag_entry, match_entry, fetch_btn, results_header, canvas, scrollbar, match_list
+    global notebook, kd_tab, damage_tab, cs_tab, item_tab, status_bar
+
+    root = tk.Tk()
+    root.title("Sabre Tracker")
+    root.geometry("900x600")
+    try:
+        icon_image = tk.PhotoImage(file=resource_path("src/icon.png"))
+        root.iconphoto(False, icon_image)
+        root.icon_image = icon_image  # Keep a reference to prevent garbage collection
+    except tk.TclError:
+        pass  # If icon fails, just continue without it
+    style = ttk.Style()
+    style.theme_use("clam")
+
+    # Custom ttk styles
+    style.configure("TFrame", background="#1c1c1c")
+    style.configure("Card.TFrame", background="#2b2b2b", relief="groove")
+    style.configure("Header.TLabel", background="#1c1c1c", foreground="#f8f8f8", font=("Segoe UI", 14, "bold"))
+    style.configure("Bold.TLabel", background="#2b2b2b", foreground="#e0e0e0", font=("Segoe UI", 11, "bold"))
+    style.configure("TLabel", background="#2b2b2b", foreground="#d0d0d0", font=("Segoe UI", 10))
+    style.configure("Win.TLabel", background="#2b2b2b", foreground="#6fff6f", font=("Segoe UI", 10, "bold"))
+    style.configure("Loss.TLabel", background="#2b2b2b", foreground="#ff6f6f", font=("Segoe UI", 10, "bold"))
+    style.configure("TButton", padding=6, relief="flat", background="#3c3c3c", foreground="#ffffff")
+    style.configure("Status.TLabel", background="#1c1c1c", foreground="#909090", font=("Segoe UI", 9))
+
+    # Input area
+    input_frame = ttk.Frame(root, padding=10)
+    input_frame.pack(fill="x")
+
+    ttk.Label(input_frame, text="Summoner Name:").pack(side="left")
+    name_entry = ttk.Entry(input_frame, width=15)
+    name_entry.pack(side="left", padx=5)
+
+    ttk.Label(input_frame, text="Tagline:").pack(side="left")
+    tag_entry = ttk.Entry(input_frame, width=10)
+    tag_entry.pack(side="left", padx=5)
+
+    ttk.Label(input_frame, text="Matches:").pack(side="left")
+    match_entry = ttk.Entry(input_frame, width=5)
+    match_entry.pack(side="left", padx=5)
+
+    fetch_btn = ttk.Button(input_frame, text="Fetch Stats", command=fetch_data)
+    fetch_btn.pack(side="left", padx=10)
+
+    # Status bar (bottom), packed before the content so it keeps its row when the window shrinks
+    status_bar = ttk.Label(root, text=Metrics.summary(), style="Status.TLabel", padding=(10, 2))
+    status_bar.pack(side="bottom", fill="x")
+    status_bar.bind("<Double-Button-1>", dump_metrics)
+
+    # Main content area - split between match cards (left) and graph (right)
+    content_frame = ttk.Frame(root)
+    content_frame.pack(fill="both", expand=True)
+
+    # Scrollable Results (Left side)
+    container = ttk.Frame(content_frame)
+    results_header = ttk.Label(container, text="", style="Header.TLabel")
+    canvas = tk.Canvas(container, bg="#1c1c1c", highlightthickness=0)
+    scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
+    match_list = MatchList(canvas)
+
+    def on_results_scroll(first, last):
+        scrollbar.set(first, last)
+        match_list.refresh()
+
+    canvas.configure(yscrollcommand=on_results_scroll)
+    canvas.bind("<Configure>", match_list.on_resize)
+
+    container.pack(side="left", fill="both", expand=True)
+    results_header.pack(side="top", pady=5)
+    canvas.pack(side="left", fill="both", expand=True)
+    scrollbar.pack(side="right", fill="y")
+
+    # Graph frame with tabs (Right side)
+    graph_container = ttk.Frame(content_frame, style="TFrame")
+    graph_container.pack(side="right", fill="both", padx=10, pady=10)
+
+    # Create notebook (tabs) for different graphs
+    notebook = ttk.Notebook(graph_container)
+    notebook.pack(fill="both", expand=True)
+
+    # Create tabs
+    kd_tab = ttk.Frame(notebook, style="TFrame")
+    damage_tab = ttk.Frame(notebook, style="TFrame")
+    cs_tab = ttk.Frame(notebook, style="TFrame")
+    item_tab = ttk.Frame(notebook, style="TFrame")
+
+    # Add tabs to notebook
+    notebook.add(kd_tab, text="K/D")
+    notebook.add(damage_tab, text="Damage")
+    notebook.add(cs_tab, text="CS")
+    notebook.add(item_tab, text="Items")
+
+    graph_tabs.update({
+        str(kd_tab): 'kd',
+        str(damage_tab): 'damage',
+        str(cs_tab): 'cs',
+        str(item_tab): 'items',
+    })
+    notebook.bind("<<NotebookTabChanged>>", render_selected_graph)
+    return root
+
+
+def main():
+    build_ui()
+
+    # Preload data once the window is showing
+    root.after(100, preload_data)
+
+    # Pick up icons from the background pool
+    root.after(ICON_POLL_MS, drain_icon_queue)
+
+    # Keep the metrics in the status bar current
+    root.after(STATUS_POLL_MS, update_status_bar)
+
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,20 @@
 # -*- mode: python ; coding: utf-8 -*-
+# One-folder build: a one-file exe unpacks every library to a temp folder on each
+# launch, which was most of the cold start. Build with `pyinstaller TrackerUI.spec`
+# and ship dist/TrackerUI/.
 
 
 a = Analysis(
     ['TrackerUI.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('icon.png', 'src')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # Not used by the app, only pulled in through optional imports of pandas / matplotlib
+    excludes=['scipy', 'IPython', 'PyQt5', 'PyQt6', 'PySide2', 'PySide6'],
     noarchive=False,
     optimize=0,
 )
@@ -19,16 +23,13 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='TrackerUI',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=False,  # UPX'd libraries are decompressed again on every launch
     console=True,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -36,3 +37,12 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='TrackerUI',
+)
@@ -5,19 +5,21 @@
 
 """
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 import os
+from RiotIds import resolve_riot_id
+from RiotScheduler import riot_get, PRIORITY_HIGH
 
 load_dotenv()
 api_key = os.environ.get('riot_api_key')
 
 
 def get_name_from_puuid(puuid=None, api_key= None):
-    link = f'https://americas.api.riotgames.com/riot/account/v1/accounts/by-puuid/{puuid}?api_key={api_key}'
-
-    response = requests.get(link)
-    gameNam = response.json()['gameName']
+    # Remembered in the match store, only asks Riot for names we haven't seen lately
+    riot_id = resolve_riot_id(puuid, key=api_key)
+    if riot_id is None:
+        return None
+    gameNam, _ = riot_id
     return f'{gameNam}'
 
 def get_puuid(summonerId=None, gameName=None, tagLine=None, api_key=None):
@@ -29,11 +31,13 @@ def get_puuid(summonerId=None, gameName=None, tagLine=None, api_key=None):
     :return: the puuid
     """
     if summonerId is not None:
-        link = f"https://americas.api.riotgames.com/lol/summoner/v4/summoners/{summonerId}?api_key={api_key}"
+        path = f"lol/summoner/v4/summoners/{summonerId}"
+        method = 'summoner-v4.by-id'
     else:
-        link = f"https://americas.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{gameName}/{tagLine}?api_key={api_key}"
+        path = f"riot/account/v1/accounts/by-riot-id/{gameName}/{tagLine}"
+        method = 'account-v1.by-riot-id'
 
-    response = requests.get(link)
+    response = riot_get(path, method, key=api_key, priority=PRIORITY_HIGH)
 
     # If response isn't 200 OK, handle gracefully
     if response.status_code != 200:
@@ -48,10 +52,9 @@ def get_puuid(summonerId=None, gameName=None, tagLine=None, api_key=None):
     return data["puuid"]
 
 def get_match_history(puuid=None,start=0, count=5):
-    root_url = f'https://americas.api.riotgames.com/'
     endpoint = f'val/match/v5/matches/by-puuid/{puuid}/ids'
-    query_params = f'?start={start}&count={count}'
-    response = requests.get(root_url + endpoint + query_params +"&api_key=" + api_key)
+    response = riot_get(endpoint, 'val-match-v5.ids', params={'start': start, 'count': count},
+                        key=api_key, priority=PRIORITY_HIGH)
 
     return response.json()
 
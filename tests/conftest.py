@@ -0,0 +1,32 @@
+"""
+    Shared setup for the tests: one stub Riot server (benchmarks/stub_server.py)
+    and a throwaway data folder for the whole session. The trackers read their
+    hosts and data folder at import, so this runs before any of them is imported.
+
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from stub_server import StubServer  # noqa: E402
+
+_server = StubServer().start()
+os.environ.update(_server.environ())
+os.environ['sabre_data_dir'] = tempfile.mkdtemp(prefix='sabre_tests_')
+
+
+@pytest.fixture
+def stub():
+    """The stub server, with latency, 429 injection, unknown names and broken matches reset after the test"""
+    yield _server
+    _server.latency = 0.0
+    _server.error_rate = 0.0
+    _server.retry_after = 0.1
+    _server.unknown_names.clear()
+    _server.broken_matches.clear()
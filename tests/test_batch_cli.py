@@ -0,0 +1,75 @@
+"""
+    BatchCLI progress handling against the stub server.
+
+"""
+import pandas as pd
+
+import BatchCLI
+import RiotScheduler
+
+
+def run(tmp_path, players, *args, roster='players.txt'):
+    player_file = tmp_path / roster
+    player_file.write_text('\n'.join(players) + '\n', encoding='utf-8')
+    output = str(tmp_path / 'out.parquet')
+    return BatchCLI.main([str(player_file), '-o', output, *args]), output
+
+
+def test_failed_lookup_is_retried_and_unknown_id_is_not(stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(RiotScheduler.scheduler, 'max_retries', 1)
+    stub.error_rate = 1.0
+    stub.retry_after = 0.01
+    stub.unknown_names.add('BatchNobody')
+
+    code, output = run(tmp_path, ['BatchDown#NA1'], '-n', '3')
+    assert code == 1
+    assert BatchCLI.load_progress(output + '.progress.json')['BatchDown#NA1']['status'] == 'error'
+
+    stub.error_rate = 0.0
+    code, output = run(tmp_path, ['BatchDown#NA1', 'BatchNobody#NA1'], '-n', '3')
+    assert code == 0
+    progress = BatchCLI.load_progress(output + '.progress.json')
+    assert progress['BatchDown#NA1']['status'] == 'done'
+    assert progress['BatchNobody#NA1']['status'] == 'not_found'
+
+
+def test_changed_match_count_fetches_again(stub, tmp_path):
+    code, output = run(tmp_path, ['BatchCount#NA1'], '-n', '3')
+    assert code == 0 and len(pd.read_parquet(output)) == 3
+
+    code, output = run(tmp_path, ['BatchCount#NA1'], '-n', '5')
+    assert code == 0 and len(pd.read_parquet(output)) == 5
+    assert BatchCLI.load_progress(output + '.progress.json')['BatchCount#NA1']['match_count'] == 5
+
+    code, output = run(tmp_path, ['BatchCount#NA1'], '-n', '2')
+    assert code == 0 and len(pd.read_parquet(output)) == 2
+
+
+def test_player_with_failed_matches_is_fetched_again(stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(RiotScheduler.scheduler, 'max_retries', 0)
+    stub.broken_matches.update({stub.match_id('bench-BatchPartial', 1), stub.match_id('bench-BatchPartial', 3)})
+
+    code, output = run(tmp_path, ['BatchPartial#NA1', 'BatchWhole#NA1'], '-n', '5')
+    assert code == 1
+    progress = BatchCLI.load_progress(output + '.progress.json')
+    assert progress['BatchPartial#NA1']['status'] == 'error'
+    assert progress['BatchWhole#NA1']['status'] == 'done'  # the other player isn't held up
+
+    stub.broken_matches.clear()
+    code, output = run(tmp_path, ['BatchPartial#NA1', 'BatchWhole#NA1'], '-n', '5')
+    assert code == 0
+    assert BatchCLI.load_progress(output + '.progress.json')['BatchPartial#NA1']['rows'] == 5
+    assert pd.read_parquet(output).groupby('riot_id', observed=True).size().to_dict() == {
+        'BatchPartial#NA1': 5, 'BatchWhole#NA1': 5}
+
+
+def test_output_only_has_the_players_of_this_run(stub, tmp_path):
+    code, output = run(tmp_path, ['BatchRosterA#NA1', 'BatchRosterB#NA1'], '-n', '2', roster='a.txt')
+    assert code == 0 and set(pd.read_parquet(output)['riot_id']) == {'BatchRosterA#NA1', 'BatchRosterB#NA1'}
+
+    code, output = run(tmp_path, ['BatchRosterC#NA1'], '-n', '2', roster='b.txt')
+    assert code == 0 and set(pd.read_parquet(output)['riot_id']) == {'BatchRosterC#NA1'}
+
+    # Nobody left to fetch, the output still goes back to this roster
+    code, output = run(tmp_path, ['BatchRosterB#NA1'], '-n', '2', roster='a.txt')
+    assert code == 0 and set(pd.read_parquet(output)['riot_id']) == {'BatchRosterB#NA1'}
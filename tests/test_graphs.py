@@ -0,0 +1,28 @@
+"""
+    Graph hover on a headless (Agg) canvas.
+
+"""
+import gc
+
+import numpy as np
+from matplotlib.backend_bases import MouseEvent
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from Graphs import PointHover, build_metric_figure
+
+
+def test_hover_annotates_the_point_under_the_mouse():
+    x = np.arange(1, 6)
+    y = np.array([1.0, 0.5, 3.0, 2.0, 1.5])
+    win = np.array([False, True, True, False, True])
+    fig, ax = build_metric_figure(x, y, win, 'K/D Ratio', 'K/D Performance', 1.0)
+    canvas = FigureCanvasAgg(fig)
+    PointHover(fig, ax, x, y, win, 'K/D').connect(canvas)
+    gc.collect()  # nothing but the canvas holds the hover now, like in create_metric_graph
+
+    canvas.draw()
+    mouse_x, mouse_y = ax.transData.transform((3, 3.0))
+    MouseEvent('motion_notify_event', canvas, mouse_x, mouse_y)._process()
+
+    annotations = [text.get_text() for text in ax.texts]
+    assert "Game 3\nK/D: 3.00\nWin" in annotations
@@ -0,0 +1,17 @@
+"""
+    Icon loading against the stub server.
+
+"""
+from ImageCache import load_item_strip
+
+
+def test_strip_keeps_the_other_icons_when_one_fails(stub):
+    good = f'{stub.url}/latest/game/assets/items/icons2d/1001_boots.png'
+    not_an_image = f'{stub.url}/latest/plugins/rcp-be-lol-game-data/global/default/v1/items.json'
+
+    strip = load_item_strip([good, not_an_image, good], size=(40, 40), gap=6)
+
+    assert strip.size == (3 * 40 + 2 * 6, 40)
+    assert strip.getpixel((20, 20)) == (180, 120, 40, 255)  # the stub's icon
+    assert strip.getpixel((46 + 20, 20)) == (60, 60, 60, 255)  # the gray placeholder
+    assert strip.getpixel((92 + 20, 20)) == (180, 120, 40, 255)
@@ -0,0 +1,74 @@
+"""
+    Incremental refresh (get_player_stats(..., incremental=True)) against the stub server.
+    Every test uses its own puuid, the stub makes up a history for any of them.
+
+"""
+import os
+
+from FrameStore import FRAMES_ROOT, load_player_frame
+from LeagueTracker import get_player_stats
+
+
+def history(stub, puuid, first, count):
+    """matchIds of the stub games first .. first + count - 1, newest first"""
+    return [stub.match_id(puuid, i) for i in range(first, first + count)]
+
+
+def test_refresh_after_one_game_costs_two_requests(stub):
+    puuid = 'bench-RefreshOne'
+    get_player_stats(puuid, match_count=20, incremental=True)
+    stub.play(puuid, 1)
+
+    before = stub.stats['requests']
+    df = get_player_stats(puuid, match_count=20, incremental=True)
+
+    assert stub.stats['requests'] - before == 2  # the id list and the new match
+    assert list(df['match_id']) == history(stub, puuid, -1, 20)
+
+
+def test_refresh_after_many_games_leaves_no_gap(stub):
+    puuid = 'bench-RefreshGap'
+    get_player_stats(puuid, match_count=20, incremental=True)
+    stub.play(puuid, 100)
+
+    df = get_player_stats(puuid, match_count=20, incremental=True)
+    assert list(df['match_id']) == history(stub, puuid, -100, 20)
+    # The old games can't be joined up with the new ones, they must not stay in the stored frame
+    assert list(load_player_frame(puuid)['match_id']) == history(stub, puuid, -100, 20)
+
+    df = get_player_stats(puuid, match_count=40, incremental=True)
+    assert list(df['match_id']) == history(stub, puuid, -100, 40)
+    assert list(df['match_id']) == list(get_player_stats(puuid, match_count=40)['match_id'])
+
+
+def test_full_fetch_that_misses_the_stored_games_replaces_them(stub):
+    puuid = 'bench-FullGap'
+    get_player_stats(puuid, match_count=10)
+    stub.play(puuid, 50)
+
+    get_player_stats(puuid, match_count=10)
+    assert list(load_player_frame(puuid)['match_id']) == history(stub, puuid, -50, 10)
+
+
+def test_full_fetch_that_overlaps_the_stored_games_extends_them(stub):
+    puuid = 'bench-FullOverlap'
+    get_player_stats(puuid, match_count=10)
+    stub.play(puuid, 5)
+
+    get_player_stats(puuid, match_count=10)
+    assert list(load_player_frame(puuid)['match_id']) == history(stub, puuid, -5, 15)
+
+
+def test_refresh_only_rewrites_months_with_new_games(stub):
+    puuid = 'bench-RefreshMonths'
+    get_player_stats(puuid, match_count=300, incremental=True)  # an hour apart, spans September and October
+    player_dir = os.path.join(FRAMES_ROOT, f'puuid={puuid}')
+    files = {month: os.path.join(player_dir, month, 'data.parquet') for month in os.listdir(player_dir)}
+    assert set(files) == {'month=2025-09', 'month=2025-10'}
+    written = {month: os.stat(path).st_mtime_ns for month, path in files.items()}
+
+    stub.play(puuid, 1)
+    get_player_stats(puuid, match_count=300, incremental=True)
+    assert os.stat(files['month=2025-09']).st_mtime_ns == written['month=2025-09']
+    assert os.stat(files['month=2025-10']).st_mtime_ns != written['month=2025-10']
+    assert len(load_player_frame(puuid)) == 301
@@ -0,0 +1,81 @@
+"""
+    Match history paging, backfill and what can be built from stored matches
+    alone, against the stub server. Every test uses its own puuid.
+
+"""
+from stub_server import NEWEST_GAME
+
+from LeagueTracker import (backfill_match_history, build_participant_frame, extract_participant_records,
+                           get_participant_table, get_player_stats, get_stored_player_stats, iter_match_ids,
+                           make_it_pretty)
+from MatchStore import get_match, get_stored_match_ids, missing_participant_match_ids
+
+HOUR = 3600
+
+
+def history(stub, puuid, first, count):
+    """matchIds of the stub games first .. first + count - 1, newest first"""
+    return [stub.match_id(puuid, i) for i in range(first, first + count)]
+
+
+def test_iter_match_ids_pages_past_the_100_id_cap(stub):
+    puuid = 'bench-Paging'
+    before = stub.stats['requests']
+    assert list(iter_match_ids(puuid, max_count=250)) == history(stub, puuid, 0, 250)
+    assert stub.stats['requests'] - before == 3
+
+
+def test_iter_match_ids_stops_at_the_stored_games(stub):
+    puuid = 'bench-StopAtStored'
+    get_player_stats(puuid, match_count=10)
+    stub.play(puuid, 3)
+
+    assert list(iter_match_ids(puuid, stop_at_stored=True)) == history(stub, puuid, -3, 3)
+
+
+def test_backfill_stores_the_time_range_once(stub):
+    puuid = 'bench-Backfill'
+    newest = NEWEST_GAME // 1000
+    start_time, end_time = newest - 24 * HOUR, newest - 10 * HOUR  # games 10 to 24
+
+    assert backfill_match_history(puuid, start_time=start_time, end_time=end_time) == 15
+    assert get_stored_match_ids(puuid) == history(stub, puuid, 10, 15)
+
+    before = stub.stats['requests']
+    assert backfill_match_history(puuid, start_time=start_time, end_time=end_time) == 0
+    assert stub.stats['requests'] - before == 1  # just the id page
+
+
+def test_stored_player_stats_need_no_requests(stub):
+    puuid = 'bench-StoredStats'
+    newest = NEWEST_GAME // 1000
+    backfill_match_history(puuid, start_time=newest - 7 * HOUR)
+    get_stored_player_stats(puuid, match_count=1)  # loads the static data for the champion names
+
+    before = stub.stats['requests']
+    df = get_stored_player_stats(puuid)
+    assert list(df['match_id']) == history(stub, puuid, 0, 8)
+    assert list(get_stored_player_stats(puuid, match_count=3)['match_id']) == history(stub, puuid, 0, 3)
+    assert stub.stats['requests'] == before
+
+
+def test_participant_table_matches_the_match_json(stub):
+    puuid = 'bench-Participants'
+    newest = NEWEST_GAME // 1000
+    get_player_stats(puuid, match_count=3)  # rows stored while the frame is built
+    backfill_match_history(puuid, start_time=newest - 5 * HOUR, end_time=newest - 3 * HOUR)  # stored without rows
+    match_ids = history(stub, puuid, 0, 6)
+    assert missing_participant_match_ids(match_ids) == history(stub, puuid, 3, 3)
+
+    table = get_participant_table(puuid=puuid)
+    assert missing_participant_match_ids(match_ids) == []
+    assert list(table['match_id'].unique()) == match_ids
+    assert (table.groupby('match_id', observed=True).size() == 10).all()
+    assert set(table.loc[table['puuid'] == puuid, 'match_id']) == set(match_ids)
+
+    # The stored rows give the same table as parsing the match json again
+    def from_json(ids):
+        return make_it_pretty(build_participant_frame(
+            [record for mid in ids for record in extract_participant_records(get_match(mid))]))
+    assert table.equals(from_json(match_ids))
+    assert get_participant_table(match_ids=match_ids[:2]).equals(from_json(match_ids[:2]))
@@ -0,0 +1,44 @@
+"""
+    Riot ID <-> puuid resolution against the stub server.
+
+"""
+import RiotScheduler
+from LeagueTracker import get_player_stats
+from RiotIds import resolve_puuid, resolve_puuids, resolve_riot_id, resolve_riot_ids
+
+
+def test_resolve_riot_ids_caches_what_it_learns(stub):
+    puuids = ['bench-NameA', 'bench-NameB']
+    resolved, failed = resolve_riot_ids(puuids + ['bench-NameA'])
+    assert resolved == {'bench-NameA': ('NameA', 'NA1'), 'bench-NameB': ('NameB', 'NA1')}
+    assert failed == set()
+
+    before = stub.stats['requests']
+    assert resolve_riot_ids(puuids)[0] == resolved
+    assert resolve_riot_id('bench-NameA') == ('NameA', 'NA1')
+    assert resolve_puuid('NameB', 'NA1') == 'bench-NameB'  # the other direction comes from the same rows
+    assert stub.stats['requests'] == before
+
+
+def test_players_of_stored_matches_are_named_without_requests(stub):
+    get_player_stats('bench-NamedByMatch', match_count=1)
+
+    # The stub's games are older than RIOT_ID_TTL, so only a caller that takes any age gets them for free
+    before = stub.stats['requests']
+    assert resolve_riot_ids(['bench-NamedByMatch'], max_age=None)[0] == {'bench-NamedByMatch': ('NamedByMatch', 'NA1')}
+    assert stub.stats['requests'] == before
+
+
+def test_failed_lookups_are_told_apart_from_unknown_ones(stub, monkeypatch):
+    monkeypatch.setattr(RiotScheduler.scheduler, 'max_retries', 0)
+    stub.unknown_names.add('NameUnknown')
+    resolved, failed = resolve_puuids([('NameUnknown', 'NA1')])
+    assert resolved == {('NameUnknown', 'NA1'): None} and failed == set()
+
+    stub.error_rate = 1.0
+    stub.retry_after = 0.01
+    resolved, failed = resolve_riot_ids(['bench-NameDown'])
+    assert resolved == {'bench-NameDown': None} and failed == {'bench-NameDown'}
+
+    stub.error_rate = 0.0
+    assert resolve_riot_ids(['bench-NameDown']) == ({'bench-NameDown': ('NameDown', 'NA1')}, set())
@@ -0,0 +1,97 @@
+"""
+    RiotScheduler against the stub server: Retry-After blocks, limits learned
+    from the headers and the priority queue. Every test gets its own scheduler,
+    so nothing learned here leaks into the shared one.
+
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from HttpClient import make_async_session
+from RiotScheduler import RiotScheduler, riot_url, PRIORITY_HIGH, PRIORITY_LOW
+
+REGION = 'americas'
+METHOD = 'match-v5.match'
+URL = riot_url('lol/match/v5/matches/NA1_bench-Scheduler_0', REGION)
+
+
+def test_retry_after_blocks_the_region_until_it_passes(stub):
+    scheduler = RiotScheduler(max_retries=0, backoff=0.01)
+    stub.error_rate = 1.0
+    stub.retry_after = 0.5
+
+    assert scheduler.get(URL, REGION, METHOD).status_code == 429
+    # The whole region waits, not just the method that got the 429
+    assert scheduler.reserve(REGION, 'account-v1.by-riot-id') > 0.3
+
+    stub.error_rate = 0.0
+    start = time.monotonic()
+    assert scheduler.get(URL, REGION, METHOD).status_code == 200
+    assert time.monotonic() - start >= 0.3
+
+
+def test_retried_429_succeeds_after_the_block(stub):
+    scheduler = RiotScheduler(max_retries=5, backoff=0.01)
+    stub.error_rate = 1.0
+    stub.retry_after = 0.3
+    threading.Timer(0.1, setattr, (stub, 'error_rate', 0.0)).start()
+
+    start = time.monotonic()
+    assert scheduler.get(URL, REGION, METHOD).status_code == 200
+    assert time.monotonic() - start >= 0.3
+
+
+def test_limits_are_learned_from_the_headers(stub, monkeypatch):
+    monkeypatch.setattr(stub, 'app_limit', '3:1,50:120')
+    scheduler = RiotScheduler()
+
+    scheduler.get(URL, REGION, METHOD)
+    assert [(b.limit, b.window) for b in scheduler._app_buckets[REGION]] == [(3, 1), (50, 120)]
+
+    start = time.monotonic()
+    for _ in range(3):
+        assert scheduler.get(URL, REGION, METHOD).status_code == 200
+    # Two tokens were left, the third request waits for the first one to come back
+    assert time.monotonic() - start >= 0.8
+
+
+@pytest.mark.parametrize('low_async', [False, True])
+def test_high_priority_overtakes_a_waiting_low_one(stub, monkeypatch, low_async):
+    """One request a second, a low priority request queued first still goes after a high one, sync or async"""
+    monkeypatch.setattr(stub, 'app_limit', '1:1')
+    scheduler = RiotScheduler()
+    scheduler.get(URL, REGION, METHOD)  # learns the limit and spends the token
+    done = []
+
+    async def get_async(priority, name):
+        session = make_async_session()
+        try:
+            status, _ = await scheduler.get_async(session, URL, REGION, METHOD, priority=priority)
+        finally:
+            await session.close()
+        assert status == 200
+        done.append(name)
+
+    def get_sync(priority, name):
+        assert scheduler.get(URL, REGION, METHOD, priority=priority).status_code == 200
+        done.append(name)
+
+    def low():
+        if low_async:
+            asyncio.run(get_async(PRIORITY_LOW, 'low'))
+        else:
+            get_sync(PRIORITY_LOW, 'low')
+
+    thread = threading.Thread(target=low)
+    thread.start()
+    time.sleep(0.2)  # low is queued
+    if low_async:
+        get_sync(PRIORITY_HIGH, 'high')
+    else:
+        asyncio.run(get_async(PRIORITY_HIGH, 'high'))
+    thread.join()
+
+    assert done == ['high', 'low']